@@ -0,0 +1,219 @@
+"""
+Headless command-line interface to the functions/ engines
+
+Nothing here (or in what it imports) may pull in tkinter, tkinterdnd2
+or PIL, so the toolkit can be scripted on machines without a display.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from functions.bios_image import BiosImage
+
+# Engines are imported inside each command so a run only loads what it uses
+
+
+def expand_inputs(paths):
+    """Return files as given plus the images found in any folders"""
+    from functions.me_clean_batch import find_images
+    
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(find_images([path]))
+        else:
+            files.append(path)
+    return files
+
+
+def open_image(path):
+    """Map an image, printing the error and returning None on failure"""
+    try:
+        return BiosImage(path)
+    except (OSError, ValueError) as e:
+        print(f"{path}: error: {e}", file=sys.stderr)
+        return None
+
+
+def cmd_analyze(args):
+    from functions.image_analysis import describe_analysis, describe_regions, load_analysis
+    from functions.me_analysis import analyze_image_me, describe_me
+    
+    failed = 0
+    reports = {}
+    for path in expand_inputs(args.files):
+        image = open_image(path)
+        if image is None:
+            failed += 1
+            continue
+        try:
+            started = time.perf_counter()
+            analysis = load_analysis(image)
+            if args.json:
+                reports[path] = analysis
+                continue
+            
+            generation, file_system = describe_analysis(analysis)
+            print(path)
+            print(f"  Type: {describe_regions(analysis)}")
+            print(f"  Generation: {generation}")
+            print(f"  File System: {file_system}")
+            found = analyze_image_me(image)
+            me_lines = describe_me(found[1], found[0]) if found else describe_me(None)
+            for line in me_lines:
+                print(f"  {line}")
+            for name, offsets in analysis["dmi"].items():
+                print(f"  {name}: {', '.join(f'0x{offset:X}' for offset in offsets[:4])}")
+            print(f"  Firmware volumes: {len(analysis['volumes'])}")
+            for offset, _, _, _, error in analysis["volumes"]:
+                if error:
+                    print(f"  FV 0x{offset:X}: {error}")
+            cached = " (cached)" if image.cache.get("analysis_cached") else ""
+            print(f"  Analyzed in {(time.perf_counter() - started) * 1000:.1f} ms{cached}")
+        except Exception as e:
+            print(f"{path}: error: {e}", file=sys.stderr)
+            failed += 1
+        finally:
+            image.close()
+    
+    if args.json:
+        json.dump(reports, sys.stdout, indent=2)
+        print()
+    return 1 if failed else 0
+
+
+def cmd_hash(args):
+    from functions.image_hashing import format_rate, get_hashing_service
+    
+    service = get_hashing_service()
+    failed = 0
+    for path in expand_inputs(args.files):
+        image = open_image(path)
+        if image is None:
+            failed += 1
+            continue
+        try:
+            hashes = service.hash_image(image).result()
+        except OSError as e:
+            print(f"{path}: error: {e}", file=sys.stderr)
+            failed += 1
+            continue
+        finally:
+            image.close()
+        # Same layout as sha256sum, so the output can be checked with `sha256sum -c`
+        print(f"{hashes.sha256}  {path}")
+        if args.verbose:
+            print(f"  BLAKE2 tree: {hashes.blake2} ({len(hashes.chunks)} chunks, "
+                  f"{format_rate(hashes.bytes_per_second)})", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def cmd_clean(args):
+    from functions.me_clean_batch import FINISHED_STATES, STATE_FAILED, MECleanBatch, describe_batch
+    
+    paths = expand_inputs(args.files)
+    if not paths:
+        print("No images to clean", file=sys.stderr)
+        return 1
+    
+    def report(job):
+        if job.state in FINISHED_STATES:
+            print(f"{job.state:9} {job.path}: {job.detail}", flush=True)
+    
+    batch = MECleanBatch(paths, max_workers=args.jobs, on_update=report)
+    batch.run()
+    print(describe_batch(batch), file=sys.stderr)
+    return 1 if any(job.state == STATE_FAILED for job in batch.jobs) else 0
+
+
+def cmd_dmi_copy(args):
+    from functions.hp_dmi_functions import (
+        BatchItem, DMIError, copy_dmi, describe_batch_outcome, describe_copy_result, read_batch_csv, run_dmi_batch
+    )
+    
+    try:
+        items = read_batch_csv(args.csv) if args.csv else []
+    except (DMIError, OSError, UnicodeDecodeError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    if args.source:
+        if not args.targets:
+            print("error: dmi-copy needs at least one target", file=sys.stderr)
+            return 2
+        items += [BatchItem(args.source, target, None) for target in expand_inputs(args.targets)]
+    if args.output:
+        if len(items) != 1:
+            print("error: --output only applies to a single target", file=sys.stderr)
+            return 2
+        items[0] = items[0]._replace(output_path=args.output)
+    if not items:
+        print("error: give a source and targets, or --csv", file=sys.stderr)
+        return 2
+    
+    if len(items) == 1:
+        # A single copy takes milliseconds; skip the process pool start-up
+        item = items[0]
+        source, target = open_image(item.source_path), open_image(item.target_path)
+        if source is None or target is None:
+            return 1
+        try:
+            for message, _ in describe_copy_result(copy_dmi(source, target, item.output_path)):
+                print(message)
+        except DMIError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 1
+        finally:
+            source.close()
+            target.close()
+        return 0
+    
+    outcomes = run_dmi_batch(
+        items, lambda outcome: print(describe_batch_outcome(outcome)[0], flush=True), args.jobs
+    )
+    failed = sum(1 for outcome in outcomes if outcome.error)
+    print(f"{len(outcomes) - failed} copied, {failed} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="BIOS toolkit command line. Run without arguments to start the GUI."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    analyze = commands.add_parser("analyze", help="Summarize images (descriptor, ME, DMI, volumes)")
+    analyze.add_argument("files", nargs="+", help="Image files or folders")
+    analyze.add_argument("--json", action="store_true", help="Print the raw analysis as JSON")
+    analyze.set_defaults(handler=cmd_analyze)
+    
+    clean = commands.add_parser("clean", help="Clean the ME region into '<name>_cleaned.bin'")
+    clean.add_argument("files", nargs="+", help="Image files or folders")
+    clean.add_argument("-j", "--jobs", type=int, help="Images cleaned in parallel (default: one per CPU)")
+    clean.set_defaults(handler=cmd_clean)
+    
+    dmi_copy = commands.add_parser("dmi-copy", help="Copy HP DMI data from a source into targets")
+    dmi_copy.add_argument("source", nargs="?", help="Source image")
+    dmi_copy.add_argument("targets", nargs="*", help="Target images or folders")
+    dmi_copy.add_argument("--csv", help="CSV of source,target[,output] pairs")
+    dmi_copy.add_argument("-o", "--output", help="Output path (single target only)")
+    dmi_copy.add_argument("-j", "--jobs", type=int, help="Worker processes (default: one per CPU)")
+    dmi_copy.set_defaults(handler=cmd_dmi_copy)
+    
+    hash_parser = commands.add_parser("hash", help="Print SHA-256 digests (sha256sum format)")
+    hash_parser.add_argument("files", nargs="+", help="Image files or folders")
+    hash_parser.add_argument("-v", "--verbose", action="store_true", help="Also print BLAKE2 and throughput")
+    hash_parser.set_defaults(handler=cmd_hash)
+    return parser
+
+
+def run(argv=None):
+    """Run one CLI command; returns the process exit code"""
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except KeyboardInterrupt:
+        return 130
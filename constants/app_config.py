@@ -2,6 +2,8 @@
 Application configuration constants
 """
 
+import os
+
 class AppConfig:
     # Window settings
     WINDOW_WIDTH = 840
@@ -30,4 +32,47 @@ class AppConfig:
     SLIDESHOW_INTERVAL = 2500  # 2500ms auto-change interval
     SLIDESHOW_WIDTH = 840      # Full window width
     SLIDESHOW_HEIGHT = 380     # Reduced height to allow more footer spacing
-    SLIDESHOW_BORDER_RADIUS = 16  # Rounded corners
\ No newline at end of file
+    SLIDESHOW_BORDER_RADIUS = 16  # Rounded corners
+    
+    # Cache settings
+    CACHE_DIR = os.path.join(os.path.expanduser("~"), ".bios_toolkit", "cache")
+    SECTION_CACHE_MEMORY_BYTES = 256 * 1024 * 1024  # Inflated UEFI sections kept in RAM
+    SECTION_CACHE_DISK_BYTES = 1024 * 1024 * 1024   # Spill limit for evicted sections
+    PARSE_CACHE_MAX_BYTES = 64 * 1024 * 1024        # Persistent parse results (JSON)
+    OUTPUT_WRITE_MODE = "copy"                      # "copy": clone + dirty blocks, "patch": <output>.bpatch file
+    BATCH_MAX_WORKERS = None                        # Workers for batch jobs (None: one per CPU)
+    ME_BATCH_MEMORY_BUDGET = 2 * 1024 ** 3          # Image bytes a batch may have in flight at once
+    TASK_MAX_WORKERS = None                         # Workers for console tasks (None: one per CPU)
+    PROCESS_MAX_WORKERS = None                      # Worker processes for CPU-heavy jobs (None: one per CPU)
+    JOB_QUEUE_DIR = os.path.join(os.path.expanduser("~"), ".bios_toolkit", "queues")
+    JOB_QUEUE_MAX_PARALLEL = 1                      # Queued BUILD jobs run at once per station
+    JOB_QUEUE_HISTORY = 50                          # Finished jobs kept in a station's queue list
+    
+    # Diagnostics
+    STARTUP_TIMING_ENV = "BIOS_TOOLKIT_TIMING"      # Set to 1 to print the cold start time
+    
+    # Console and UI update settings
+    CONSOLE_MAX_LINES = 5000                        # Lines kept by console panels (oldest dropped)
+    CONSOLE_FLUSH_MS = 16                           # Console output is written at most once per frame
+    UI_DISPATCH_MS = 10                             # How often the Tk loop runs worker results
+    UI_DISPATCH_BUDGET_MS = 8                       # Max time per run before yielding to redraws
+    
+    # External tools (ME Analyzer, UEFIExtract, flashrom)
+    TOOLS_DIR = os.path.join(os.path.expanduser("~"), ".bios_toolkit", "tools")  # Searched before PATH
+    ME_ANALYZER_NAMES = ("MEA.exe", "MEA", "MEA.py")
+    ME_ANALYZER_ARGS = ("-skip",)                   # Skip ME Analyzer's interactive prompts
+    TOOL_TIMEOUT_SECONDS = 600                      # A tool run is killed after this long
+    TOOL_IDLE_TIMEOUT_SECONDS = 120                 # ... or after this long without output
+    TOOL_BATCH_LINES = 500                          # Output lines handed over per batch
+    TOOL_BATCH_SECONDS = 0.05                       # Longest wait before a partial batch is sent
+    TOOL_MAX_PENDING_LINES = 5000                   # Lines waiting for the console before the tool is paused
+    TOOL_MAX_LINE_CHARS = 4096                      # Longer output lines are cut
+    TOOL_TAIL_LINES = 200                           # Last output lines kept for the result
+    
+    # SPI chip reads (flashrom)
+    FLASHROM_NAMES = ("flashrom", "flashrom.exe")
+    FLASHROM_PROGRAMMER = "ch341a_spi"              # e.g. "dummy:emulate=W25Q128FV,image=dump.bin" for testing
+    FLASH_READ_COUNT = 3                            # Reads per chip; differing bytes are majority-voted
+    FLASH_READ_DIR = os.path.join(os.path.expanduser("~"), "BIOS Reads")
+    FLASH_KEEP_READS = False                        # Keep the individual reads next to the consensus image
+    FLASH_VOTE_CHUNK_SIZE = 1024 * 1024             # Bytes compared per step
\ No newline at end of file
@@ -2,8 +2,6 @@
 Application functions and business logic
 """
 
-import tkinter as tk
-from tkinter import messagebox
 
 class AppFunctions:
     def __init__(self):
@@ -11,20 +9,25 @@ class AppFunctions:
     
     def show_hello_world(self):
         """Display a hello world message"""
+        from tkinter import messagebox
         messagebox.showinfo("Hello", "Hello World!")
     
     def show_custom_message(self, title, message):
         """Display a custom message dialog"""
+        from tkinter import messagebox
         messagebox.showinfo(title, message)
     
     def show_error(self, message):
         """Display an error message"""
+        from tkinter import messagebox
         messagebox.showerror("Error", message)
     
     def show_warning(self, message):
         """Display a warning message"""
+        from tkinter import messagebox
         messagebox.showwarning("Warning", message)
     
     def ask_yes_no(self, title, question):
         """Ask a yes/no question and return the result"""
+        from tkinter import messagebox
         return messagebox.askyesno(title, question)
\ No newline at end of file
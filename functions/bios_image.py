@@ -0,0 +1,139 @@
+"""
+Memory-mapped BIOS image session shared by every screen
+"""
+
+import hashlib
+import mmap
+import os
+
+
+class BiosImage:
+    """A BIOS/SPI dump mapped read-only into memory
+    
+    The file is mapped once when it is selected; every consumer works on
+    zero-copy memoryview slices of that mapping instead of re-reading it.
+    """
+    
+    def __init__(self, filepath):
+        self.filepath = os.path.abspath(filepath)
+        self.filename = os.path.basename(filepath)
+        
+        stat = os.stat(self.filepath)
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime_ns
+        
+        if self.size == 0:
+            raise ValueError(f"{self.filename} is empty")
+        
+        with open(self.filepath, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        self.closed = False
+        self.content_hash = None  # SHA-256 hex digest, computed on first request
+        self.cache = {}  # Parse results derived from this image (layout, signatures, ...)
+    
+    def view(self):
+        """Return a memoryview of the whole image"""
+        return self._view
+    
+    def region(self, offset, length=None):
+        """Return a zero-copy memoryview of [offset, offset + length)"""
+        if length is None:
+            length = self.size - offset
+        if offset < 0 or length < 0 or offset + length > self.size:
+            raise ValueError(
+                f"Region 0x{offset:X}+0x{length:X} is outside the image (0x{self.size:X} bytes)"
+            )
+        return self._view[offset:offset + length]
+    
+    def read(self, offset, length):
+        """Return a small region as bytes (for header parsing)"""
+        return bytes(self.region(offset, length))
+    
+    def sha256(self):
+        """Return the SHA-256 hex digest of the image contents"""
+        if self.content_hash is None:
+            digest = hashlib.sha256()
+            chunk_size = 4 * 1024 * 1024
+            for offset in range(0, self.size, chunk_size):
+                digest.update(self._view[offset:offset + chunk_size])
+            self.content_hash = digest.hexdigest()
+        return self.content_hash
+    
+    def is_stale(self):
+        """Check whether the file on disk changed since it was mapped"""
+        try:
+            stat = os.stat(self.filepath)
+        except OSError:
+            return True
+        return stat.st_size != self.size or stat.st_mtime_ns != self.mtime
+    
+    def close(self):
+        """Release the mapping"""
+        if self.closed:
+            return
+        self.closed = True
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # A consumer still holds a slice; the mapping is released once it is dropped
+            pass
+    
+    def __len__(self):
+        return self.size
+    
+    def __repr__(self):
+        return f"<BiosImage {self.filename} ({self.size} bytes)>"
+
+
+class BiosImageSession:
+    """Keeps one BiosImage per file so all screens share the same mapping
+    
+    Every open() is paired with a release(); a file stays mapped while
+    any screen still holds it.
+    """
+    
+    def __init__(self):
+        self.images = {}
+        self.holders = {}  # Path -> number of open() calls not yet released
+    
+    def open(self, filepath):
+        """Return the mapped image for filepath, mapping it on first use"""
+        key = os.path.abspath(filepath)
+        image = self.images.get(key)
+        if image is None or image.closed or image.is_stale():
+            if image is not None:
+                image.close()
+            image = BiosImage(key)
+            self.images[key] = image
+        self.holders[key] = self.holders.get(key, 0) + 1
+        return image
+    
+    def get(self, filepath):
+        """Return the already mapped image for filepath, or None"""
+        if not filepath:
+            return None
+        image = self.images.get(os.path.abspath(filepath))
+        if image is None or image.closed:
+            return None
+        return image
+    
+    def release(self, filepath):
+        """Drop one hold on a file, unmapping it once no screen holds it"""
+        key = os.path.abspath(filepath)
+        holders = self.holders.get(key, 0) - 1
+        if holders > 0:
+            self.holders[key] = holders
+            return
+        self.holders.pop(key, None)
+        image = self.images.pop(key, None)
+        if image is not None:
+            image.close()
+    
+    def close_all(self):
+        """Unmap every image (on application exit)"""
+        for image in self.images.values():
+            image.close()
+        self.images.clear()
+        self.holders.clear()
@@ -0,0 +1,238 @@
+"""
+Intel Flash Descriptor (IFD) parser with a cached region map
+"""
+
+import struct
+from collections import OrderedDict, namedtuple
+
+FLASH_DESCRIPTOR_SIGNATURE = 0x0FF0A55A
+DESCRIPTOR_SIZE = 0x1000
+
+# FLREG indices as defined by the descriptor
+REGION_DESCRIPTOR = 0
+REGION_BIOS = 1
+REGION_ME = 2
+REGION_GBE = 3
+REGION_PDR = 4
+REGION_DEVEXP = 5
+REGION_BIOS2 = 6
+REGION_MICROCODE = 7
+REGION_EC = 8
+REGION_DEVEXP2 = 9
+REGION_IE = 10
+REGION_10GBE0 = 11
+REGION_10GBE1 = 12
+REGION_PTT = 15
+
+MAX_REGIONS = 16
+
+REGION_NAMES = {
+    REGION_DESCRIPTOR: "Descriptor",
+    REGION_BIOS: "BIOS",
+    REGION_ME: "ME",
+    REGION_GBE: "GbE",
+    REGION_PDR: "PDR",
+    REGION_DEVEXP: "DevExp",
+    REGION_BIOS2: "BIOS2",
+    REGION_MICROCODE: "Microcode",
+    REGION_EC: "EC",
+    REGION_DEVEXP2: "DevExp2",
+    REGION_IE: "IE",
+    REGION_10GBE0: "10GbE0",
+    REGION_10GBE1: "10GbE1",
+    REGION_PTT: "PTT",
+}
+
+# FLCOMP read clock frequency: 20 MHz only exists on IFD v1 (pre-Skylake)
+SPI_FREQUENCY_20MHZ = 0
+
+
+class FlashRegion(namedtuple("FlashRegion", "index name base limit")):
+    """A used FLREG entry; limit is inclusive"""
+    
+    __slots__ = ()
+    
+    @property
+    def size(self):
+        return self.limit - self.base + 1
+
+
+# Layouts memoized by descriptor bytes and image size, shared by every consumer
+_LAYOUT_CACHE_SIZE = 32
+_layout_cache = OrderedDict()
+
+
+class FlashDescriptorError(Exception):
+    """Raised when a descriptor is present but malformed"""
+
+
+class FlashLayout:
+    """Decoded descriptor: region table plus the map/component sections"""
+    
+    __slots__ = (
+        "descriptor_offset", "version", "flmap0", "flmap1", "flmap2",
+        "fcba", "frba", "fmba", "fpsba", "component_count", "region_count",
+        "pch_strap_length", "flcomp", "component_sizes", "regions", "_by_name",
+    )
+    
+    def __init__(self):
+        self.regions = [None] * MAX_REGIONS
+        self._by_name = {}
+    
+    def region(self, region_type):
+        """Return the FlashRegion for an index or name, or None when unused"""
+        if isinstance(region_type, int):
+            return self.regions[region_type]
+        return self._by_name.get(region_type.lower())
+    
+    def has_region(self, region_type):
+        """Check whether a region is present in the image"""
+        return self.region(region_type) is not None
+    
+    def used_regions(self):
+        """Return the present regions in flash order"""
+        return sorted((r for r in self.regions if r), key=lambda r: r.base)
+    
+    def total_flash_size(self):
+        """Return the flash size declared by the component section"""
+        return sum(self.component_sizes)
+    
+    def _add_region(self, region):
+        self.regions[region.index] = region
+        self._by_name[region.name.lower()] = region
+    
+    def __repr__(self):
+        names = ", ".join(r.name for r in self.used_regions())
+        return f"<FlashLayout IFD v{self.version}: {names}>"
+
+
+def find_descriptor(data):
+    """Return the offset of the descriptor signature, or -1"""
+    for offset in (0x10, 0x0):
+        if len(data) >= offset + 4 and struct.unpack_from("<I", data, offset)[0] == FLASH_DESCRIPTOR_SIGNATURE:
+            return offset
+    return -1
+
+
+def _component_size(density):
+    """Convert an FLCOMP density field to bytes"""
+    if density == 0xF:
+        return 0
+    return (512 * 1024) << density
+
+
+def parse_flash_descriptor(data, image_size=None):
+    """Parse the flash descriptor at the start of data
+    
+    data only needs to cover the first 4 KB; image_size is the full dump
+    size used to clip regions of truncated dumps. Returns a FlashLayout,
+    or None when the image has no descriptor (e.g. a BIOS-region-only dump).
+    """
+    if image_size is None:
+        image_size = len(data)
+    
+    signature_offset = find_descriptor(data)
+    if signature_offset < 0:
+        return None
+    if len(data) < DESCRIPTOR_SIZE:
+        raise FlashDescriptorError("Image is smaller than a flash descriptor")
+    
+    layout = FlashLayout()
+    layout.descriptor_offset = signature_offset
+    layout.flmap0, layout.flmap1, layout.flmap2 = struct.unpack_from("<III", data, signature_offset + 4)
+    
+    layout.fcba = (layout.flmap0 & 0xFF) << 4
+    layout.component_count = ((layout.flmap0 >> 8) & 0x3) + 1
+    layout.frba = ((layout.flmap0 >> 16) & 0xFF) << 4
+    layout.region_count = ((layout.flmap0 >> 24) & 0x7) + 1
+    layout.fmba = (layout.flmap1 & 0xFF) << 4
+    layout.fpsba = ((layout.flmap1 >> 16) & 0xFF) << 4
+    layout.pch_strap_length = (layout.flmap1 >> 24) & 0xFF
+    
+    if not (0 < layout.frba < DESCRIPTOR_SIZE and layout.fcba < DESCRIPTOR_SIZE):
+        raise FlashDescriptorError(f"Invalid FLMAP0 0x{layout.flmap0:08X}")
+    
+    # Component section
+    layout.flcomp = struct.unpack_from("<I", data, layout.fcba)[0]
+    read_frequency = (layout.flcomp >> 17) & 0x7
+    layout.version = 1 if read_frequency == SPI_FREQUENCY_20MHZ else 2
+    
+    if layout.version == 1:
+        densities = (layout.flcomp & 0x7, (layout.flcomp >> 3) & 0x7)
+    else:
+        densities = (layout.flcomp & 0xF, (layout.flcomp >> 4) & 0xF)
+    layout.component_sizes = tuple(
+        _component_size(d) for d in densities[:layout.component_count]
+    )
+    
+    # Region section: stop at the next section so garbage is never decoded
+    region_limit = MAX_REGIONS if layout.version == 2 else 5
+    section_end = min(
+        (base for base in (layout.fcba, layout.fmba, layout.fpsba) if base > layout.frba),
+        default=DESCRIPTOR_SIZE
+    )
+    region_limit = min(region_limit, (section_end - layout.frba) // 4)
+    
+    for index in range(region_limit):
+        flreg = struct.unpack_from("<I", data, layout.frba + index * 4)[0]
+        base = (flreg & 0x7FFF) << 12
+        limit = (((flreg >> 16) & 0x7FFF) << 12) | 0xFFF
+        if flreg == 0xFFFFFFFF or base > limit:
+            continue  # Unused region
+        if base >= image_size:
+            continue  # Region points past a truncated dump
+        name = REGION_NAMES.get(index, f"Region{index}")
+        layout._add_region(FlashRegion(index, name, base, min(limit, image_size - 1)))
+    
+    if not layout.has_region(REGION_DESCRIPTOR):
+        layout._add_region(FlashRegion(REGION_DESCRIPTOR, "Descriptor", 0, DESCRIPTOR_SIZE - 1))
+    
+    return layout
+
+
+def get_flash_layout(image):
+    """Return the FlashLayout for a BiosImage, parsing at most once per descriptor
+    
+    The memo is keyed on the 4 KB descriptor and the image size, which
+    is all the layout depends on, so no full-image hash is needed.
+    """
+    if "flash_layout" in image.cache:
+        return image.cache["flash_layout"]
+    
+    descriptor = bytes(image.region(0, min(image.size, DESCRIPTOR_SIZE)))
+    key = (descriptor, image.size)
+    if key in _layout_cache:
+        _layout_cache.move_to_end(key)
+        layout = _layout_cache[key]
+    else:
+        layout = parse_flash_descriptor(descriptor, image.size)
+        _layout_cache[key] = layout
+        if len(_layout_cache) > _LAYOUT_CACHE_SIZE:
+            _layout_cache.popitem(last=False)
+    
+    image.cache["flash_layout"] = layout
+    return layout
+
+
+def get_region_view(image, region_type):
+    """Return a zero-copy memoryview of a region, or None when it is absent"""
+    layout = get_flash_layout(image)
+    if layout is None:
+        return None
+    region = layout.region(region_type)
+    if region is None:
+        return None
+    return image.region(region.base, region.size)
+
+
+def describe_layout(layout):
+    """Return (generation, file_system) strings for the status panels"""
+    if layout is None:
+        return "No ME region", "No descriptor (region dump)"
+    
+    me_region = layout.region(REGION_ME)
+    if me_region:
+        generation = f"ME region {me_region.size // 1024} KB (IFD v{layout.version})"
+    else:
+        generation = f"No ME region (IFD v{layout.version})"
+    return generation, "Intel Flash Descriptor"
@@ -0,0 +1,224 @@
+"""
+SPI chip reads through flashrom with multi-read majority voting
+"""
+
+import os
+import time
+from collections import Counter, namedtuple
+
+from constants.app_config import AppConfig
+from functions.bios_image import BiosImage
+from functions.task_engine import raise_if_cancelled
+from functions.tool_runner import find_tool, run_tool
+
+# Differing bytes closer than this are reported as one unstable region
+REGION_MERGE_GAP = 64
+# Regions listed in a report; the rest are only counted
+MAX_REPORTED_REGIONS = 200
+
+UnstableRegion = namedtuple("UnstableRegion", "offset length differing unresolved")
+VoteResult = namedtuple("VoteResult", "output_path size reads differing unresolved regions region_count elapsed")
+
+_numpy = None
+
+
+def _load_numpy():
+    """Import numpy on first use; returns None when it is not installed"""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+
+class FlashReadError(Exception):
+    """A chip read failed or the reads cannot be compared"""
+
+
+def flashrom_command(programmer, output_path, chip=None):
+    """Return the flashrom argv for one read, e.g. programmer 'ch341a_spi' or 'dummy:emulate=W25Q128FV'"""
+    flashrom = find_tool(AppConfig.FLASHROM_NAMES)
+    if flashrom is None:
+        raise FlashReadError(f"flashrom not found (looked in PATH and {AppConfig.TOOLS_DIR})")
+    args = flashrom + ["-p", programmer, "-r", output_path]
+    if chip:
+        args += ["-c", chip]
+    return args
+
+
+def read_flash(programmer, output_path, reads=None, chip=None, on_lines=None, on_progress=None, cancel=None):
+    """Read the chip several times and write the byte-wise majority to output_path
+    
+    flashrom output streams to on_lines(lines); on_progress(read, reads)
+    is called before each read. The individual reads are deleted once the
+    vote is written (kept if FLASH_KEEP_READS). Returns a VoteResult.
+    """
+    reads = max(1, reads or AppConfig.FLASH_READ_COUNT)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    base = os.path.splitext(output_path)[0]
+    read_paths = []
+    try:
+        for number in range(1, reads + 1):
+            raise_if_cancelled(cancel)
+            if on_progress:
+                on_progress(number, reads)
+            path = f"{base}.read{number}.bin"
+            read_paths.append(path)
+            result = run_tool(flashrom_command(programmer, path, chip), on_lines, cancel=cancel)
+            if result.returncode or not os.path.isfile(path):
+                last = result.tail[-1] if result.tail else "no output"
+                raise FlashReadError(f"Read {number} failed (flashrom exit code {result.returncode}): {last}")
+        return vote_reads(read_paths, output_path, cancel)
+    finally:
+        if not AppConfig.FLASH_KEEP_READS:
+            for path in read_paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+def vote_reads(paths, output_path, cancel=None, chunk_size=None):
+    """Write the byte-wise majority of several reads of one chip; returns a VoteResult
+    
+    Chunks where every read agrees (almost all of them) are copied as
+    they are; only differing bytes are voted. A byte without a strict
+    majority keeps the first read's value and counts as unresolved.
+    """
+    started = time.perf_counter()
+    chunk_size = chunk_size or AppConfig.FLASH_VOTE_CHUNK_SIZE
+    images = []
+    try:
+        for path in paths:
+            images.append(BiosImage(path))
+        size = images[0].size
+        if any(image.size != size for image in images):
+            sizes = ", ".join(f"{image.filename}: {image.size}" for image in images)
+            raise FlashReadError(f"Reads differ in size ({sizes})")
+        
+        vote = _vote_chunk_numpy if _load_numpy() else _vote_chunk
+        views = [image.view() for image in images]
+        regions = _RegionCollector()
+        temp_path = f"{output_path}.tmp"
+        try:
+            with open(temp_path, "wb") as out:
+                for start in range(0, size, chunk_size):
+                    raise_if_cancelled(cancel)
+                    chunks = [view[start:start + chunk_size] for view in views]
+                    if all(chunk == chunks[0] for chunk in chunks[1:]):
+                        out.write(chunks[0])  # memcmp fast path: the reads agree
+                        continue
+                    data, groups = vote(chunks)
+                    out.write(data)
+                    for first, last, differing, unresolved in groups:
+                        regions.add(start + first, start + last, differing, unresolved)
+            os.replace(temp_path, output_path)
+            regions.store()
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+    finally:
+        for image in images:
+            image.close()
+    
+    return VoteResult(output_path, size, len(paths), regions.differing, regions.unresolved,
+                      regions.regions, regions.count, time.perf_counter() - started)
+
+
+def _vote_chunk_numpy(chunks):
+    """Vote one chunk with numpy; returns (bytes, groups of differing bytes)"""
+    np = _numpy
+    reads = np.stack([np.frombuffer(chunk, dtype=np.uint8) for chunk in chunks])
+    differs = np.flatnonzero((reads != reads[0]).any(axis=0))
+    columns = reads[:, differs]
+    # votes[r, i]: how many reads agree with read r at differing byte i
+    votes = (columns[:, None, :] == columns[None, :, :]).sum(axis=1)
+    best = votes.argmax(axis=0)
+    winners = columns[best, np.arange(len(differs))]
+    majority = votes.max(axis=0) * 2 > len(chunks)
+    data = reads[0].copy()
+    data[differs] = np.where(majority, winners, reads[0, differs])
+    
+    # Runs of differing bytes less than REGION_MERGE_GAP apart, as (first, last, count, unresolved)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(differs) >= REGION_MERGE_GAP) + 1))
+    ends = np.append(starts[1:], len(differs))
+    unresolved = np.add.reduceat((~majority).astype(np.int64), starts)
+    groups = zip(differs[starts].tolist(), differs[ends - 1].tolist(), (ends - starts).tolist(), unresolved.tolist())
+    return data.tobytes(), list(groups)
+
+
+def _vote_chunk(chunks):
+    """Pure-Python vote of one chunk (numpy not installed)"""
+    data = bytearray(chunks[0])
+    groups = []
+    for offset, values in enumerate(zip(*chunks)):
+        if values.count(values[0]) == len(values):
+            continue
+        value, count = Counter(values).most_common(1)[0]
+        resolved = count * 2 > len(values)
+        if resolved:
+            data[offset] = value
+        if groups and offset - groups[-1][1] < REGION_MERGE_GAP:
+            group = groups[-1]
+            group[1] = offset
+        else:
+            group = [offset, offset, 0, 0]
+            groups.append(group)
+        group[2] += 1
+        group[3] += not resolved
+    return bytes(data), groups
+
+
+class _RegionCollector:
+    """Merges differing-byte groups into at most MAX_REPORTED_REGIONS regions (the rest are counted)"""
+    
+    def __init__(self):
+        self.regions = []
+        self.count = 0
+        self.differing = 0
+        self.unresolved = 0
+        self.last = None  # [first, last, differing, unresolved] of the newest region
+    
+    def add(self, first, last, differing, unresolved):
+        self.differing += differing
+        self.unresolved += unresolved
+        if self.last is not None and first - self.last[1] < REGION_MERGE_GAP:
+            # Continues across a chunk boundary
+            self.last[1] = last
+            self.last[2] += differing
+            self.last[3] += unresolved
+        else:
+            self.store()
+            self.last = [first, last, differing, unresolved]
+            self.count += 1
+    
+    def store(self):
+        if self.last is not None and len(self.regions) < MAX_REPORTED_REGIONS:
+            first, last, differing, unresolved = self.last
+            self.regions.append(UnstableRegion(first, last - first + 1, differing, unresolved))
+        self.last = None
+
+
+def describe_vote(result, max_regions=10):
+    """Return console lines summarising a VoteResult"""
+    lines = [f"Compared {result.reads} reads of {result.size / (1024 * 1024):.1f} MB "
+             f"in {result.elapsed:.2f} s"]
+    if not result.differing:
+        lines.append("✅ All reads identical")
+    else:
+        lines.append(f"⚠️ {result.differing} unstable byte(s) in {result.region_count} region(s), "
+                     f"{result.unresolved} without a majority")
+        for region in result.regions[:max_regions]:
+            note = f", {region.unresolved} unresolved" if region.unresolved else ""
+            lines.append(f"  0x{region.offset:08X}-0x{region.offset + region.length - 1:08X}: "
+                         f"{region.differing} byte(s){note}")
+        if result.region_count > max_regions:
+            lines.append(f"  ... {result.region_count - max_regions} more region(s)")
+    lines.append(f"Consensus image: {result.output_path}")
+    return lines
@@ -2,21 +2,509 @@
 HP DMI specific functions
 """
 
-import tkinter as tk
-from tkinter import messagebox
+import csv
+import os
+import struct
+import time
+import uuid
+from collections import namedtuple
+
+from constants.app_config import AppConfig
+from functions.bios_image import BiosImage
+from functions.image_writer import ImageWriteError, PatchedImage, describe_write
+from functions.signature_scanner import FIRMWARE_SIGNATURES, get_scanner
+from functions.task_engine import raise_if_cancelled
+
+# $DMI block: signature, table length, checksum, revision, then SMBIOS structures
+DMI_SIGNATURE = FIRMWARE_SIGNATURES["HP_DMI"]
+DMI_HEADER = struct.Struct("<4sHBB")
+DMI_MAX_TABLE = 0x4000
+
+SMBIOS_SYSTEM_INFO = 1
+SMBIOS_OEM_STRINGS = 11
+SMBIOS_END_OF_TABLE = 127
+
+# Formatted-area offsets holding string references, per structure type (SMBIOS 3.x)
+SMBIOS_STRING_FIELDS = {
+    0: (0x04, 0x05, 0x08),
+    1: (0x04, 0x05, 0x06, 0x07, 0x19, 0x1A),
+    2: (0x04, 0x05, 0x06, 0x07, 0x08, 0x0A),
+    3: (0x04, 0x05, 0x06, 0x07, 0x08),
+}
+
+# HP publishes the feature byte as an OEM string with this prefix
+FEATURE_BYTE_PREFIX = "FBYTE#"
+
+DMI_FIELDS = ("serial", "uuid", "sku", "product", "feature_byte")
+FIELD_LABELS = {
+    "serial": "Serial Number",
+    "uuid": "UUID",
+    "sku": "SKU",
+    "product": "Product Name",
+    "feature_byte": "Feature Byte",
+}
+
+DMICopyResult = namedtuple("DMICopyResult", "write source target_before changed warnings elapsed")
+BatchItem = namedtuple("BatchItem", "source_path target_path output_path")
+BatchOutcome = namedtuple("BatchOutcome", "item result error")
+
+
+class DMIError(Exception):
+    """Raised when a DMI block is missing or cannot be updated"""
+
+
+class DMIRecord:
+    """Identity fields of one board"""
+    
+    __slots__ = DMI_FIELDS
+    
+    def __init__(self, serial=None, uuid=None, sku=None, product=None, feature_byte=None):
+        self.serial = serial
+        self.uuid = uuid
+        self.sku = sku
+        self.product = product
+        self.feature_byte = feature_byte
+    
+    def items(self):
+        return [(name, getattr(self, name)) for name in DMI_FIELDS]
+    
+    def __eq__(self, other):
+        return isinstance(other, DMIRecord) and self.items() == other.items()
+    
+    def __repr__(self):
+        return f"<DMIRecord serial={self.serial!r} product={self.product!r}>"
+
+
+class SMBIOSStructure:
+    """One SMBIOS structure: formatted area plus its string set"""
+    
+    __slots__ = ("type", "formatted", "strings")
+    
+    def __init__(self, formatted, strings):
+        self.type = formatted[0]
+        self.formatted = bytearray(formatted)
+        self.strings = strings
+    
+    def get_string(self, offset):
+        """Return the string referenced by the byte at offset, or None"""
+        if offset >= len(self.formatted):
+            return None
+        index = self.formatted[offset]
+        if index == 0 or index > len(self.strings):
+            return None
+        return self.strings[index - 1]
+    
+    def set_string(self, offset, value):
+        """Point the byte at offset at value, adding the string if needed
+        
+        A string is only rewritten in place when no other field of the
+        structure refers to it (fields may share an index); otherwise, and
+        for types whose string fields are unknown, value is appended.
+        """
+        if offset >= len(self.formatted):
+            raise DMIError(f"Type {self.type} structure has no field at 0x{offset:X}")
+        index = self.formatted[offset]
+        if index == 0 or index > len(self.strings) or self.is_shared(offset):
+            self.strings.append(value)
+            self.formatted[offset] = len(self.strings)
+        else:
+            self.strings[index - 1] = value
+    
+    def is_shared(self, offset):
+        """Return True if another string field may point at the same string as offset"""
+        fields = SMBIOS_STRING_FIELDS.get(self.type)
+        if fields is None:
+            return True
+        index = self.formatted[offset]
+        return any(other != offset and other < len(self.formatted) and self.formatted[other] == index
+                   for other in fields)
+    
+    def to_bytes(self):
+        if not self.strings:
+            return bytes(self.formatted) + b"\x00\x00"
+        encoded = b"".join(s.encode("latin-1") + b"\x00" for s in self.strings)
+        return bytes(self.formatted) + encoded + b"\x00"
+
+
+class DMIBlock:
+    """A located $DMI block; offset is the image offset of the signature"""
+    
+    __slots__ = ("offset", "table_length", "capacity", "revision", "structures")
+    
+    def __init__(self, offset, table_length, capacity, revision, structures):
+        self.offset = offset
+        self.table_length = table_length
+        self.capacity = capacity
+        self.revision = revision
+        self.structures = structures
+    
+    def find(self, structure_type):
+        return next((s for s in self.structures if s.type == structure_type), None)
+    
+    def table_bytes(self):
+        return b"".join(s.to_bytes() for s in self.structures)
+
+
+def parse_structures(table):
+    """Split an SMBIOS table into SMBIOSStructure objects"""
+    structures = []
+    position = 0
+    while position + 4 <= len(table):
+        length = table[position + 1]
+        if length < 4 or position + length > len(table):
+            raise DMIError(f"Bad SMBIOS structure at +0x{position:X}")
+        formatted = bytes(table[position:position + length])
+        end = bytes(table[position + length:]).find(b"\x00\x00")
+        if end < 0:
+            raise DMIError(f"Unterminated SMBIOS strings at +0x{position:X}")
+        raw = bytes(table[position + length:position + length + end])
+        strings = [s.decode("latin-1") for s in raw.split(b"\x00")] if raw else []
+        structures.append(SMBIOSStructure(formatted, strings))
+        position += length + end + 2
+        if formatted[0] == SMBIOS_END_OF_TABLE:
+            break
+    return structures
+
+
+def table_checksum(header_without_checksum, table):
+    """8-bit checksum making header plus table sum to zero"""
+    return (0x100 - ((sum(header_without_checksum) + sum(table)) & 0xFF)) & 0xFF
+
+
+def dmi_offsets(image):
+    """Return $DMI signature offsets from the image's signature index
+    
+    Uses the cached image analysis when it is loaded, otherwise scans
+    once and memoizes the result on the image.
+    """
+    analysis = image.cache.get("analysis")
+    if analysis is not None:
+        return analysis["dmi"].get("HP_DMI", [])
+    offsets = image.cache.get("hp_dmi_offsets")
+    if offsets is None:
+        offsets = get_scanner(("HP_DMI",)).scan_all(image)["HP_DMI"]
+        image.cache["hp_dmi_offsets"] = offsets
+    return offsets
+
+
+def read_dmi_block(data, offsets):
+    """Return the first valid DMIBlock among candidate offsets in data"""
+    for offset in offsets:
+        if offset + DMI_HEADER.size > len(data):
+            continue
+        signature, table_length, checksum, revision = DMI_HEADER.unpack_from(data, offset)
+        start = offset + DMI_HEADER.size
+        if signature != DMI_SIGNATURE or not 4 <= table_length <= DMI_MAX_TABLE or start + table_length > len(data):
+            continue
+        table = data[start:start + table_length]
+        header = DMI_HEADER.pack(signature, table_length, 0, revision)
+        if table_checksum(header, table) != checksum:
+            continue
+        try:
+            structures = parse_structures(table)
+        except DMIError:
+            continue
+        
+        # Erased (0xFF) bytes after the table are free space for growth
+        capacity = table_length
+        limit = min(len(data), start + DMI_MAX_TABLE)
+        while start + capacity < limit and data[start + capacity] == 0xFF:
+            capacity += 1
+        return DMIBlock(offset, table_length, capacity, revision, structures)
+    return None
+
+
+def read_dmi_record(block):
+    """Extract the identity fields from a DMIBlock"""
+    record = DMIRecord()
+    system = block.find(SMBIOS_SYSTEM_INFO)
+    if system is not None:
+        record.product = system.get_string(0x05)
+        record.serial = system.get_string(0x07)
+        if len(system.formatted) >= 0x18:
+            record.uuid = str(uuid.UUID(bytes_le=bytes(system.formatted[0x08:0x18])))
+        record.sku = system.get_string(0x19)
+    oem = block.find(SMBIOS_OEM_STRINGS)
+    if oem is not None:
+        record.feature_byte = next((s[len(FEATURE_BYTE_PREFIX):] for s in oem.strings
+                                    if s.startswith(FEATURE_BYTE_PREFIX)), None)
+    return record
+
+
+def apply_dmi_record(block, record):
+    """Write record's fields into block's structures; returns warnings"""
+    warnings = []
+    system = block.find(SMBIOS_SYSTEM_INFO)
+    if system is None:
+        raise DMIError("Target DMI block has no System Information structure")
+    for name, offset in (("product", 0x05), ("serial", 0x07), ("sku", 0x19)):
+        value = getattr(record, name)
+        if not value:
+            continue  # SMBIOS strings cannot be empty
+        try:
+            system.set_string(offset, value)
+        except DMIError as e:
+            warnings.append(f"{name}: {e}")
+    if record.uuid is not None:
+        if len(system.formatted) >= 0x18:
+            system.formatted[0x08:0x18] = uuid.UUID(record.uuid).bytes_le
+        else:
+            warnings.append("uuid: target System Information structure is too short")
+    
+    if record.feature_byte is not None:
+        oem = block.find(SMBIOS_OEM_STRINGS)
+        value = FEATURE_BYTE_PREFIX + record.feature_byte
+        if oem is None:
+            warnings.append("feature_byte: target has no OEM strings structure")
+        else:
+            for index, string in enumerate(oem.strings):
+                if string.startswith(FEATURE_BYTE_PREFIX):
+                    oem.strings[index] = value
+                    break
+            else:
+                oem.strings.append(value)
+                oem.formatted[4] = len(oem.strings)  # OEM string count
+    return warnings
+
+
+def write_dmi_block(target, block):
+    """Serialize block back into a PatchedImage, fixing length and checksum"""
+    table = block.table_bytes()
+    if len(table) > block.capacity:
+        raise DMIError(f"New DMI table ({len(table)} bytes) does not fit the {block.capacity}-byte block")
+    header = DMI_HEADER.pack(DMI_SIGNATURE, len(table), 0, block.revision)
+    header = DMI_HEADER.pack(DMI_SIGNATURE, len(table), table_checksum(header, table), block.revision)
+    
+    start = block.offset + DMI_HEADER.size
+    target.write(block.offset, header)
+    target.write(start, table)
+    if len(table) < block.table_length:
+        target.fill(start + len(table), block.table_length - len(table), 0xFF)
+    block.table_length = len(table)
+
+
+def default_output_path(target_path):
+    """Return '<name>_dmi.bin' next to the target image"""
+    root, ext = os.path.splitext(target_path)
+    return f"{root}_dmi{ext or '.bin'}"
+
+
+def read_source_record(source_image):
+    """Return the DMIRecord of a BiosImage, raising DMIError if it has none"""
+    block = read_dmi_block(source_image.view(), dmi_offsets(source_image))
+    if block is None:
+        raise DMIError(f"No valid $DMI block in {source_image.filename}")
+    return read_dmi_record(block)
+
+
+def stamp_dmi(record, target_path, output_path=None, target_offsets=None):
+    """Write record into a copy of the image at target_path; returns a DMICopyResult
+    
+    The target is patched on its own copy-on-write mapping and saved
+    through the dirty-block writer. target_offsets are the $DMI offsets
+    from the signature index; they are scanned from the mapping when
+    not given.
+    """
+    started = time.perf_counter()
+    output_path = output_path or default_output_path(target_path)
+    try:
+        with PatchedImage(target_path) as target:
+            with target.view() as target_view:
+                if target_offsets is None:
+                    target_offsets = get_scanner(("HP_DMI",)).scan_all(target_view)["HP_DMI"]
+                target_block = read_dmi_block(target_view, target_offsets)
+            if target_block is None:
+                raise DMIError(f"No valid $DMI block in {os.path.basename(target_path)}")
+            before = read_dmi_record(target_block)
+            warnings = apply_dmi_record(target_block, record)
+            write_dmi_block(target, target_block)
+            written = target.save(output_path)
+    except (ImageWriteError, OSError) as e:
+        raise DMIError(str(e)) from None
+    
+    changed = [name for name, value in record.items() if value and value != getattr(before, name)]
+    return DMICopyResult(written, record, before, changed, warnings, time.perf_counter() - started)
+
+
+def copy_dmi(source_image, target_image, output_path=None):
+    """Copy the HP DMI identity from source_image into a copy of target_image
+    
+    Both arguments are BiosImage objects, so both blocks are found
+    through their signature index.
+    """
+    started = time.perf_counter()
+    record = read_source_record(source_image)
+    result = stamp_dmi(record, target_image.filepath, output_path, dmi_offsets(target_image))
+    return result._replace(elapsed=time.perf_counter() - started)
+
+
+def read_batch_csv(csv_path):
+    """Return BatchItems from a CSV of source,target[,output] rows
+    
+    A header row is skipped; relative paths are resolved against the
+    CSV's directory. Two rows that would write the same output file
+    are rejected.
+    """
+    base = os.path.dirname(os.path.abspath(csv_path))
+    items = []
+    outputs = {}
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        for line_number, row in enumerate(csv.reader(f), 1):
+            row = [cell.strip() for cell in row]
+            if not any(row) or row[0].startswith("#"):
+                continue
+            if line_number == 1 and row[0].lower() == "source":
+                continue
+            if len(row) < 2 or not row[0] or not row[1]:
+                raise DMIError(f"{os.path.basename(csv_path)}:{line_number}: expected source,target[,output]")
+            paths = [os.path.join(base, cell) if cell else None for cell in row[:3]]
+            item = BatchItem(paths[0], paths[1], paths[2] if len(paths) > 2 else None)
+            first = outputs.setdefault(batch_output_key(item), line_number)
+            if first != line_number:
+                raise DMIError(f"{os.path.basename(csv_path)}:{line_number}: "
+                               f"writes the same output as line {first}")
+            items.append(item)
+    return items
+
+
+def batch_output_key(item):
+    """Return the normalised path a BatchItem writes to"""
+    output_path = item.output_path or default_output_path(item.target_path)
+    return os.path.normcase(os.path.abspath(output_path))
+
+
+def run_dmi_batch(items, on_result=None, max_workers=None, cancel=None):
+    """Copy DMI data for many source/target pairs on a process pool
+    
+    Each distinct source is read once here; the records are sent to the
+    workers, which map and patch their own targets. on_result(outcome)
+    is called with a BatchOutcome as each file finishes. Returns the
+    outcomes in completion order. An item writing the same output file
+    as an earlier one fails instead of racing it. Once cancel is set,
+    targets not yet started are dropped and TaskCancelled is raised
+    without waiting for the running ones.
+    """
+    # Deferred: the process pool machinery is only needed for batches
+    import multiprocessing
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    from functions.process_pool import CANCEL_POLL_SECONDS
+    
+    outcomes = []
+    
+    def finish(outcome):
+        outcomes.append(outcome)
+        if on_result:
+            on_result(outcome)
+    
+    records = {}
+    for source_path in dict.fromkeys(item.source_path for item in items):
+        raise_if_cancelled(cancel)
+        try:
+            source_image = BiosImage(source_path)
+        except (OSError, ValueError) as e:
+            records[source_path] = DMIError(str(e))
+            continue
+        try:
+            records[source_path] = read_source_record(source_image)
+        except DMIError as e:
+            records[source_path] = e
+        finally:
+            source_image.close()
+    
+    jobs = []
+    outputs = set()
+    for item in items:
+        key = batch_output_key(item)
+        if key in outputs:
+            finish(BatchOutcome(item, None, "Same output file as an earlier target"))
+        elif not isinstance(records[item.source_path], DMIRecord):
+            finish(BatchOutcome(item, None, str(records[item.source_path])))
+        else:
+            outputs.add(key)
+            jobs.append(item)
+    if not jobs:
+        return outcomes
+    
+    workers = min(len(jobs), max_workers or AppConfig.BATCH_MAX_WORKERS or os.cpu_count() or 1)
+    # spawn: never fork a process that owns a Tk interpreter and worker threads
+    context = multiprocessing.get_context("spawn")
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    try:
+        futures = {
+            pool.submit(stamp_dmi, records[item.source_path], item.target_path, item.output_path): item
+            for item in jobs
+        }
+        pending = set(futures)
+        while pending:
+            raise_if_cancelled(cancel)
+            done, pending = wait(pending, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = futures[future]
+                try:
+                    finish(BatchOutcome(item, future.result(), None))
+                except Exception as e:
+                    finish(BatchOutcome(item, None, str(e) or type(e).__name__))
+    except BaseException:
+        # Not a with block: its exit would wait for the running workers
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+    return outcomes
+
+
+def describe_record(label, record):
+    """Return console lines for a DMIRecord"""
+    lines = [f"{label}:"]
+    for name, value in record.items():
+        lines.append(f"  {FIELD_LABELS[name]}: {value if value is not None else '-'}")
+    return lines
+
+
+def describe_copy_result(result):
+    """Return (message, type) console lines for a DMICopyResult"""
+    lines = [(line, "normal") for line in describe_record("Source DMI", result.source)]
+    if result.changed:
+        changes = ", ".join(FIELD_LABELS[name] for name in result.changed)
+        lines.append((f"Updated: {changes}", "normal"))
+    else:
+        lines.append(("Target already carries the source DMI data", "normal"))
+    lines.append(("DMI table checksum recomputed", "normal"))
+    for warning in result.warnings:
+        lines.append((f"⚠️ {warning}", "error"))
+    lines.append((describe_write(result.write), "success"))
+    lines.append((f"✅ DMI Copy completed in {result.elapsed * 1000:.1f} ms", "success"))
+    return lines
+
+
+def describe_batch_outcome(outcome):
+    """Return a (message, type) console line for one BatchOutcome"""
+    name = os.path.basename(outcome.item.target_path)
+    if outcome.error:
+        return f"❌ {name}: {outcome.error}", "error"
+    result = outcome.result
+    changes = ", ".join(FIELD_LABELS[field] for field in result.changed) or "already up to date"
+    warned = f", {len(result.warnings)} warning(s)" if result.warnings else ""
+    return f"✅ {name} → {os.path.basename(result.write.output_path)}: {changes}{warned} ({result.elapsed * 1000:.0f} ms)", "success"
+
 
 class HPDMIFunctions:
     def __init__(self):
         pass
     
-    def read_dmi_info(self):
-        """Read DMI information"""
-        messagebox.showinfo("HP DMI", "Reading DMI information from HP system...")
+    def read_dmi_info(self, bios_image):
+        """Read DMI information; returns a DMIRecord or None"""
+        block = read_dmi_block(bios_image.view(), dmi_offsets(bios_image))
+        return read_dmi_record(block) if block else None
+    
+    def write_dmi_data(self, source_image, target_image, output_path=None):
+        """Write the source's DMI data into a copy of the target; returns a DMICopyResult"""
+        return copy_dmi(source_image, target_image, output_path)
     
-    def write_dmi_data(self):
-        """Write DMI data"""
-        messagebox.showinfo("DMI Write", "Writing DMI data to system...")
+    def batch_copy(self, items, on_result=None, cancel=None):
+        """Run a batch of BatchItems on the process pool; returns BatchOutcomes"""
+        return run_dmi_batch(items, on_result, cancel=cancel)
     
     def backup_dmi(self):
         """Backup DMI information"""
-        messagebox.showinfo("DMI Backup", "Creating DMI backup...")
\ No newline at end of file
+        from tkinter import messagebox
+        messagebox.showinfo("DMI Backup", "Creating DMI backup...")
@@ -0,0 +1,158 @@
+"""
+Image summary shared by the status panels, backed by the parse-result cache
+"""
+
+import struct
+
+from functions.flash_descriptor import REGION_ME, FlashDescriptorError, get_flash_layout
+from functions.image_hashing import get_hashing_service
+from functions.me_analysis import analyze_me_region
+from functions.parse_cache import get_parse_cache
+from functions.process_pool import get_process_backend
+from functions.signature_scanner import get_scanner
+from functions.task_engine import raise_if_cancelled
+from functions.uefi_volume import UEFIParseError, get_firmware_volumes
+
+# Bump whenever analyze_image() output changes; old cache entries are dropped
+PARSER_VERSION = 3
+
+DMI_MARKERS = ("HP_DMI", "SMBIOS", "SM", "SM3")
+
+
+def analyze_image(image, cancel=None):
+    """Parse a BiosImage into a JSON-serialisable summary
+    
+    Keys: size, descriptor (version + regions, None for region dumps,
+    or an error string), me (region, version, sku, svn, fpt table), dmi (marker
+    offsets) and volumes (offset, file system guid, size, file count,
+    parse error or None). A volume that fails to parse keeps its error
+    instead of failing the whole summary.
+    """
+    analysis = {
+        "size": image.size,
+        "descriptor": None,
+        "me": None,
+        "dmi": {},
+        "volumes": [],
+    }
+    
+    try:
+        layout = get_flash_layout(image)
+    except FlashDescriptorError as e:
+        layout = None
+        analysis["descriptor"] = {"error": str(e)}
+    if layout is not None:
+        analysis["descriptor"] = {
+            "version": layout.version,
+            "regions": [list(region) for region in layout.used_regions()],
+        }
+        if layout.has_region(REGION_ME):
+            analysis["me"] = _analyze_me(image, layout.region(REGION_ME))
+    
+    # One pass over the image for every DMI anchor
+    dmi = get_scanner(DMI_MARKERS).scan_all(image, cancel=cancel)
+    analysis["dmi"] = {name: offsets for name, offsets in dmi.items() if offsets}
+    
+    for volume in get_firmware_volumes(image, cancel):
+        raise_if_cancelled(cancel)
+        try:
+            file_count, error = len(volume.files), volume.error
+        except (UEFIParseError, struct.error, ValueError) as e:
+            file_count, error = None, str(e)
+        analysis["volumes"].append([volume.offset, volume.fs_guid, volume.length, file_count, error])
+    return analysis
+
+
+def _analyze_me(image, region):
+    """Return the ME part of the summary"""
+    info = analyze_me_region(image.region(region.base, region.size))
+    return {
+        "region": [region.base, region.limit],
+        "version": info.version_string,
+        "sku": info.sku,
+        "svn": info.svn,
+        "fpt": [list(entry) for entry in info.partitions],
+        "warnings": list(info.warnings),
+    }
+
+
+def load_analysis(image, cancel=None, offload=False):
+    """Return the summary for a BiosImage, from the persistent cache when possible
+    
+    The result is kept in image.cache, so panels sharing the image pay
+    for the lookup once; image.cache["analysis_cached"] records whether
+    it came from disk. With offload, a cache miss is parsed in a worker
+    process so the GUI keeps its frame rate during the pure-Python parse.
+    """
+    if "analysis" in image.cache:
+        return image.cache["analysis"]
+    
+    cache = get_parse_cache()
+    digest = image.sha256()
+    analysis = cache.get(digest, PARSER_VERSION)
+    image.cache["analysis_cached"] = analysis is not None
+    if analysis is None:
+        if offload:
+            analysis = get_process_backend().run(analyze_image, image, cancel=cancel)
+        else:
+            analysis = analyze_image(image, cancel)
+        cache.put(digest, PARSER_VERSION, analysis)
+    
+    image.cache["analysis"] = analysis
+    return analysis
+
+
+def prepare_image_async(image, progress=None, done=None, cancel=None):
+    """Hash an image on the worker pool, then analyze it in a worker process
+    
+    progress(bytes_done, total, bytes_per_second) and done(analysis, error)
+    are called from worker threads; callers marshal them to the UI. Once
+    cancel is set, done receives a TaskCancelled error.
+    """
+    def finished(future):
+        try:
+            future.result()
+            raise_if_cancelled(cancel)
+            analysis = load_analysis(image, cancel, offload=True)
+        except Exception as e:
+            if done:
+                done(None, e)
+            return
+        if done:
+            done(analysis, None)
+    
+    future = get_hashing_service().hash_image(image, progress, cancel)
+    future.add_done_callback(finished)
+    return future
+
+
+def describe_analysis(analysis):
+    """Return (generation, file_system) strings for the status panels"""
+    descriptor = analysis.get("descriptor")
+    if descriptor is None:
+        return "No ME region", "No descriptor (region dump)"
+    if "error" in descriptor:
+        return "Unknown", f"Invalid descriptor ({descriptor['error']})"
+    
+    me = analysis.get("me")
+    ifd = f"IFD v{descriptor['version']}"
+    if not me:
+        generation = f"No ME region ({ifd})"
+    elif me["version"]:
+        sku = f" {me['sku']}" if me.get("sku") else ""
+        generation = f"ME {me['version']}{sku} ({ifd})"
+    else:
+        base, limit = me["region"]
+        generation = f"ME region {(limit - base + 1) // 1024} KB ({ifd})"
+    return generation, "Intel Flash Descriptor"
+
+
+def describe_regions(analysis):
+    """Return the image type string used by the utility console"""
+    descriptor = analysis.get("descriptor")
+    if descriptor is None:
+        return "BIOS Region Dump"
+    if "error" in descriptor:
+        return "BIOS Binary (invalid descriptor)"
+    regions = ", ".join(region[1] for region in descriptor["regions"])
+    return f"Full SPI Image, IFD v{descriptor['version']} ({regions})"
@@ -0,0 +1,179 @@
+"""
+Chunked image hashing on a worker pool with throughput reporting
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from functions.task_engine import TaskCancelled, raise_if_cancelled
+
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+BLAKE2_DIGEST_SIZE = 16
+
+ChunkDigest = namedtuple("ChunkDigest", "index offset length sha256 blake2")
+
+
+class ImageHashes:
+    """Whole-image SHA-256 plus per-chunk SHA-256/BLAKE2 digests
+    
+    blake2 is a fast fingerprint of the whole image: the BLAKE2b of the
+    concatenated chunk BLAKE2 digests, so it only matches for the same
+    chunk size.
+    """
+    
+    __slots__ = ("size", "chunk_size", "sha256", "blake2", "chunks", "elapsed")
+    
+    def __init__(self, size, chunk_size, sha256, chunks, elapsed=0.0):
+        self.size = size
+        self.chunk_size = chunk_size
+        self.sha256 = sha256
+        self.chunks = chunks
+        self.elapsed = elapsed
+        tree = hashlib.blake2b(digest_size=BLAKE2_DIGEST_SIZE)
+        for chunk in chunks:
+            tree.update(bytes.fromhex(chunk.blake2))
+        self.blake2 = tree.hexdigest()
+    
+    @property
+    def bytes_per_second(self):
+        return self.size / self.elapsed if self.elapsed else 0.0
+    
+    def changed_chunks(self, other):
+        """Return indexes of chunks whose content differs from other
+        
+        Chunks past the end of the shorter image count as changed.
+        """
+        if self.chunk_size != other.chunk_size:
+            raise ValueError("Cannot compare hashes taken with different chunk sizes")
+        changed = []
+        for index in range(max(len(self.chunks), len(other.chunks))):
+            if index >= len(self.chunks) or index >= len(other.chunks):
+                changed.append(index)
+            elif self.chunks[index].blake2 != other.chunks[index].blake2 or \
+                    self.chunks[index].sha256 != other.chunks[index].sha256:
+                changed.append(index)
+        return changed
+    
+    def __repr__(self):
+        return f"<ImageHashes sha256={self.sha256[:16]}... {len(self.chunks)} chunks>"
+
+
+def hash_chunk(data, index, offset, length):
+    """Return the ChunkDigest of data[offset:offset + length]"""
+    view = data[offset:offset + length]
+    try:
+        return ChunkDigest(
+            index, offset, length,
+            hashlib.sha256(view).hexdigest(),
+            hashlib.blake2b(view, digest_size=BLAKE2_DIGEST_SIZE).hexdigest(),
+        )
+    finally:
+        view.release()
+
+
+class HashingService:
+    """Hashes images on a shared thread pool
+    
+    hashlib releases the GIL on large buffers, so the per-chunk digests
+    really run in parallel. The whole-image SHA-256 is inherently
+    sequential; it runs on the coordinating thread alongside the pool
+    and drives the progress callback.
+    """
+    
+    def __init__(self, max_workers=None, chunk_size=HASH_CHUNK_SIZE):
+        self.max_workers = max_workers or min(8, os.cpu_count() or 2)
+        self.chunk_size = chunk_size
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hash")
+    
+    def hash_image(self, image, progress=None, cancel=None):
+        """Hash a BiosImage in the background; returns a Future of ImageHashes
+        
+        progress(bytes_done, total_bytes, bytes_per_second) is called from
+        the hashing thread. Results are stored in image.cache["hashes"]
+        and image.content_hash, so repeat calls finish immediately. Setting
+        the cancel token stops hashing after the current chunk; the future
+        then fails with TaskCancelled.
+        """
+        future = Future()
+        hashes = image.cache.get("hashes")
+        if hashes is not None:
+            future.set_result(hashes)
+            return future
+        
+        thread = threading.Thread(
+            target=self._run, args=(image, progress, cancel, future), name="hash-coordinator", daemon=True
+        )
+        thread.start()
+        return future
+    
+    def _run(self, image, progress, cancel, future):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(self._hash(image, progress, cancel))
+        except Exception as e:
+            future.set_exception(e)
+    
+    def _hash(self, image, progress, cancel):
+        started = time.perf_counter()
+        data = image.view()
+        size = len(data)
+        chunk_size = self.chunk_size
+        
+        jobs = [
+            self.executor.submit(hash_chunk, data, index, offset, min(chunk_size, size - offset))
+            for index, offset in enumerate(range(0, size, chunk_size))
+        ]
+        
+        whole = hashlib.sha256()
+        try:
+            for offset in range(0, size, chunk_size):
+                raise_if_cancelled(cancel)
+                view = data[offset:offset + chunk_size]
+                whole.update(view)
+                view.release()
+                if progress:
+                    done = min(offset + chunk_size, size)
+                    elapsed = time.perf_counter() - started
+                    progress(done, size, done / elapsed if elapsed else 0.0)
+        except TaskCancelled:
+            for job in jobs:
+                job.cancel()  # Chunks already running finish; queued ones never start
+            raise
+        
+        chunks = [job.result() for job in jobs]
+        hashes = ImageHashes(size, chunk_size, whole.hexdigest(), chunks, time.perf_counter() - started)
+        image.content_hash = hashes.sha256
+        image.cache["hashes"] = hashes
+        return hashes
+    
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+
+def format_rate(bytes_per_second):
+    """Format a throughput for the status panels"""
+    return f"{bytes_per_second / (1024 * 1024):.0f} MB/s"
+
+
+def format_hash_progress(done, total, bytes_per_second):
+    """Return a one-line hashing status such as 'Hashing 45% (812 MB/s)'"""
+    percent = done * 100 // total if total else 100
+    return f"Hashing {percent}% ({format_rate(bytes_per_second)})"
+
+
+_default_service = None
+_default_service_lock = threading.Lock()
+
+
+def get_hashing_service():
+    """Return the process-wide hashing service"""
+    global _default_service
+    with _default_service_lock:
+        if _default_service is None:
+            _default_service = HashingService()
+        return _default_service
@@ -0,0 +1,279 @@
+"""
+Patched output images: dirty-block tracking, sparse copies and binary patches
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+from collections import namedtuple
+
+from constants.app_config import AppConfig
+from functions.task_engine import TaskCancelled, raise_if_cancelled
+
+DIRTY_BLOCK_SIZE = 4096
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Linux FICLONE ioctl (btrfs, XFS, bcachefs reflinks)
+FICLONE = 0x40049409
+
+PATCH_MAGIC = b"BIOSPAT1"
+# Patch files never carry an image extension, so one cannot be flashed by mistake
+PATCH_EXTENSION = ".bpatch"
+PATCH_HEADER = struct.Struct("<8sQ32s32sI")
+PATCH_RECORD = struct.Struct("<QI")
+
+WRITE_MODE_COPY = "copy"
+WRITE_MODE_PATCH = "patch"
+
+WriteResult = namedtuple("WriteResult", "output_path method bytes_written")
+
+
+class ImageWriteError(Exception):
+    """Raised when a patched image or patch file cannot be written"""
+
+
+class PatchedImage:
+    """Copy-on-write mapping of a source image that tracks dirty blocks
+    
+    The source is mapped with ACCESS_COPY, so untouched pages are shared
+    with the page cache and only written pages are copied. save() clones
+    the source (reflink or copy_file_range when the filesystem allows)
+    and then writes only the dirty blocks; save_patch() writes a compact
+    binary patch instead.
+    """
+    
+    def __init__(self, source_path, block_size=DIRTY_BLOCK_SIZE):
+        self.source_path = source_path
+        self.block_size = block_size
+        self.mapping = None
+        self.dirty_blocks = set()
+        self.bytes_modified = 0
+    
+    def __enter__(self):
+        self.open()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def __len__(self):
+        return len(self.mapping)
+    
+    def open(self):
+        """Map the source image copy-on-write"""
+        with open(self.source_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ImageWriteError("Cannot patch an empty file")
+            self.mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    
+    def close(self):
+        if self.mapping is not None:
+            self.mapping.close()
+            self.mapping = None
+    
+    def view(self):
+        """Return a memoryview of the (patched) image; release it when done"""
+        return memoryview(self.mapping)
+    
+    def write(self, offset, data):
+        """Patch bytes in the mapping; unchanged writes do not dirty blocks"""
+        end = offset + len(data)
+        if offset < 0 or end > len(self.mapping):
+            raise ImageWriteError(f"Write at 0x{offset:X} is outside the image")
+        if self.mapping[offset:end] == data:
+            return
+        self.mapping[offset:end] = data
+        self.bytes_modified += len(data)
+        self.dirty_blocks.update(range(offset // self.block_size, (end - 1) // self.block_size + 1))
+    
+    def fill(self, offset, length, value=0xFF, block=64 * 1024, cancel=None):
+        """Fill a range with one byte value through a bounded buffer"""
+        end = min(offset + length, len(self.mapping))
+        pattern = bytes([value]) * min(block, max(end - offset, 0))
+        position = offset
+        while position < end:
+            raise_if_cancelled(cancel)
+            size = min(len(pattern), end - position)
+            self.write(position, pattern[:size])
+            position += size
+    
+    def dirty_ranges(self):
+        """Return merged (offset, length) ranges of dirty blocks"""
+        ranges = []
+        for index in sorted(self.dirty_blocks):
+            start = index * self.block_size
+            if ranges and ranges[-1][0] + ranges[-1][1] == start:
+                ranges[-1][1] += self.block_size
+            else:
+                ranges.append([start, self.block_size])
+        size = len(self.mapping)
+        return [(start, min(length, size - start)) for start, length in ranges]
+    
+    def save(self, output_path, mode=None, cancel=None):
+        """Write the patched image; returns a WriteResult
+        
+        mode is WRITE_MODE_COPY (sparse clone plus dirty blocks) or
+        WRITE_MODE_PATCH (binary patch at patch_path_for(output_path));
+        defaults to AppConfig.OUTPUT_WRITE_MODE. The WriteResult holds
+        the path actually written. A cancelled save removes its
+        temporary file and raises TaskCancelled.
+        """
+        mode = mode or AppConfig.OUTPUT_WRITE_MODE
+        if mode == WRITE_MODE_PATCH:
+            return self.save_patch(patch_path_for(output_path), cancel)
+        if mode != WRITE_MODE_COPY:
+            raise ImageWriteError(f"Unknown write mode {mode!r}")
+        
+        temp_path = f"{output_path}.tmp"
+        try:
+            method = clone_file(self.source_path, temp_path, cancel)
+            written = 0
+            with open(temp_path, "r+b") as f, self.view() as view:
+                for start, length in self.dirty_ranges():
+                    raise_if_cancelled(cancel)
+                    f.seek(start)
+                    f.write(view[start:start + length])
+                    written += length
+            os.replace(temp_path, output_path)
+        except TaskCancelled:
+            _remove(temp_path)
+            raise
+        except OSError as e:
+            _remove(temp_path)
+            raise ImageWriteError(f"Cannot write {output_path}: {e}") from None
+        return WriteResult(output_path, method, written)
+    
+    def save_patch(self, patch_path, cancel=None):
+        """Write only the dirty blocks as a binary patch; returns a WriteResult"""
+        ranges = self.dirty_ranges()
+        with open(self.source_path, "rb") as f:
+            source_digest = _file_sha256(f)
+        with self.view() as view:
+            output_digest = hashlib.sha256(view).digest()
+            
+            temp_path = f"{patch_path}.tmp"
+            try:
+                with open(temp_path, "wb") as f:
+                    f.write(PATCH_HEADER.pack(PATCH_MAGIC, len(view), source_digest, output_digest, len(ranges)))
+                    for start, length in ranges:
+                        raise_if_cancelled(cancel)
+                        f.write(PATCH_RECORD.pack(start, length))
+                        f.write(view[start:start + length])
+                    written = f.tell()
+                os.replace(temp_path, patch_path)
+            except TaskCancelled:
+                _remove(temp_path)
+                raise
+            except OSError as e:
+                _remove(temp_path)
+                raise ImageWriteError(f"Cannot write {patch_path}: {e}") from None
+        return WriteResult(patch_path, WRITE_MODE_PATCH, written)
+
+
+def patch_path_for(output_path):
+    """Return the patch file written instead of output_path: '<output>.bpatch'"""
+    if output_path.lower().endswith(PATCH_EXTENSION):
+        return output_path
+    return output_path + PATCH_EXTENSION
+
+
+def clone_file(source_path, output_path, cancel=None):
+    """Copy a file as cheaply as the platform allows; returns the method used
+    
+    Tries a reflink (shares extents, no data copied), then
+    copy_file_range (in-kernel, server-side on NFS 4.2/SMB3), then a
+    plain copy. The copies check cancel between chunks.
+    """
+    with open(source_path, "rb") as src, open(output_path, "wb") as dst:
+        try:
+            import fcntl
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return "reflink"
+        except (ImportError, OSError):
+            pass
+        
+        if hasattr(os, "copy_file_range"):
+            remaining = os.fstat(src.fileno()).st_size
+            try:
+                while remaining > 0:
+                    raise_if_cancelled(cancel)
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), min(remaining, COPY_CHUNK_SIZE))
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                if remaining == 0:
+                    return "copy_file_range"
+            except OSError:
+                pass
+            # Start over with a plain copy
+            src.seek(0)
+            dst.seek(0)
+            dst.truncate()
+        
+        for chunk in iter(lambda: src.read(COPY_CHUNK_SIZE), b""):
+            raise_if_cancelled(cancel)
+            dst.write(chunk)
+        return "copy"
+
+
+def apply_patch(source_path, patch_path, output_path):
+    """Rebuild an output image from its source and a binary patch"""
+    with open(patch_path, "rb") as patch:
+        header = patch.read(PATCH_HEADER.size)
+        if len(header) != PATCH_HEADER.size:
+            raise ImageWriteError("Truncated patch header")
+        magic, size, source_digest, output_digest, count = PATCH_HEADER.unpack(header)
+        if magic != PATCH_MAGIC:
+            raise ImageWriteError("Not a BIOS patch file")
+        with open(source_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size != size or _file_sha256(f) != source_digest:
+                raise ImageWriteError("Patch was made for a different source image")
+        
+        temp_path = f"{output_path}.tmp"
+        try:
+            clone_file(source_path, temp_path)
+            with open(temp_path, "r+b") as out:
+                for _ in range(count):
+                    record = patch.read(PATCH_RECORD.size)
+                    if len(record) != PATCH_RECORD.size:
+                        raise ImageWriteError("Truncated patch record")
+                    start, length = PATCH_RECORD.unpack(record)
+                    data = patch.read(length)
+                    if len(data) != length or start + length > size:
+                        raise ImageWriteError("Corrupt patch record")
+                    out.seek(start)
+                    out.write(data)
+                out.seek(0)
+                if _file_sha256(out) != output_digest:
+                    raise ImageWriteError("Patched image does not match the expected hash")
+            os.replace(temp_path, output_path)
+        except (OSError, ImageWriteError) as e:
+            _remove(temp_path)
+            if isinstance(e, ImageWriteError):
+                raise
+            raise ImageWriteError(f"Cannot write {output_path}: {e}") from None
+    return output_path
+
+
+def describe_write(result):
+    """Return a console line describing how an output was written"""
+    name = os.path.basename(result.output_path)
+    size = f"{result.bytes_written / 1024:.0f} KB"
+    if result.method == WRITE_MODE_PATCH:
+        return f"Saved patch: {name} ({size})"
+    return f"Saved: {name} ({result.method}, {size} of changes written)"
+
+
+def _file_sha256(f):
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    return digest.digest()
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,269 @@
+"""
+Persistent FIFO job queue for one station (screen)
+"""
+
+import json
+import os
+import threading
+import time
+
+from constants.app_config import AppConfig
+from functions.me_clean_batch import FINISHED_STATES, STATE_CANCELLED, STATE_DONE, STATE_FAILED, STATE_QUEUED
+from functions.me_clean_functions import clean_me_image, describe_clean_result
+from functions.task_engine import TaskCancelled, get_task_engine
+
+STATE_RUNNING = "Running"
+
+BUILD_STATION = "me_clean_auto"
+
+JOURNAL_VERSION = 1
+
+
+class QueuedJob:
+    """One queued image and its current state"""
+    
+    __slots__ = ("id", "path", "state", "detail", "result", "task")
+    
+    def __init__(self, job_id, path, state=STATE_QUEUED, detail=""):
+        self.id = job_id
+        self.path = path
+        self.state = state
+        self.detail = detail
+        self.result = None  # Report lines of a finished run
+        self.task = None
+    
+    @property
+    def filename(self):
+        return os.path.basename(self.path)
+    
+    @property
+    def finished(self):
+        return self.state in FINISHED_STATES
+
+
+class JobQueue:
+    """FIFO of jobs for one station, persisted to a small JSON journal
+    
+    run_job(job, cancel) runs on the task engine and returns report
+    lines; up to max_parallel jobs run at once, in queue order, and
+    waiting jobs can be moved or removed. Every change is written to
+    JOB_QUEUE_DIR/<name>.json (temp file + rename), so after a restart
+    waiting and interrupted jobs run again and the last finished ones
+    are still listed. on_change() and on_finished(job) are called from
+    worker threads as well as the caller's; a view can attach() them
+    after the queue has started.
+    """
+    
+    def __init__(self, name, run_job, max_parallel=None, journal_dir=None, on_change=None, on_finished=None):
+        self.name = name
+        self.run_job = run_job
+        self.max_parallel = max(1, max_parallel or AppConfig.JOB_QUEUE_MAX_PARALLEL)
+        self.journal_path = os.path.join(journal_dir or AppConfig.JOB_QUEUE_DIR, f"{name}.json")
+        self.on_change = on_change
+        self.on_finished = on_finished
+        self.lock = threading.RLock()
+        self.jobs = []
+        self.next_id = 1
+        self.started = False
+        self.load()
+    
+    def load(self):
+        """Restore the journal; jobs that were running are queued again in place"""
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                journal = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            return  # Unreadable journal: start with an empty queue
+        if not isinstance(journal, dict) or journal.get("version") != JOURNAL_VERSION:
+            return
+        for entry in journal.get("jobs", []):
+            try:
+                job = QueuedJob(int(entry["id"]), entry["path"], entry.get("state", STATE_QUEUED),
+                                entry.get("detail", ""))
+            except (KeyError, TypeError, ValueError):
+                continue
+            if not job.finished:
+                job.state, job.detail = STATE_QUEUED, ""
+            self.jobs.append(job)
+            self.next_id = max(self.next_id, job.id + 1)
+    
+    def save(self):
+        """Write the journal (best effort; a failed write keeps the previous one)"""
+        with self.lock:
+            entries = [{"id": job.id, "path": job.path, "state": job.state, "detail": job.detail}
+                       for job in self.jobs]
+        temp_path = f"{self.journal_path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": JOURNAL_VERSION, "jobs": entries}, f, indent=1)
+            os.replace(temp_path, self.journal_path)
+        except (OSError, TypeError, ValueError):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+    
+    def snapshot(self):
+        """Return the jobs in queue order (a copy, safe to iterate on any thread)"""
+        with self.lock:
+            return list(self.jobs)
+    
+    @property
+    def is_busy(self):
+        with self.lock:
+            return any(not job.finished for job in self.jobs)
+    
+    def attach(self, on_change=None, on_finished=None):
+        """Set the change and finished callbacks (a view opened after start())"""
+        with self.lock:
+            self.on_change = on_change
+            self.on_finished = on_finished
+    
+    def start(self):
+        """Begin running jobs (restored ones included)"""
+        self.started = True
+        self.pump()
+    
+    def add(self, path):
+        """Append an image to the end of the queue; returns the QueuedJob"""
+        with self.lock:
+            job = QueuedJob(self.next_id, os.path.abspath(path))
+            self.next_id += 1
+            self.jobs.append(job)
+        self.changed()
+        self.pump()
+        return job
+    
+    def pending_job(self, path):
+        """Return the waiting or running job for path, if any"""
+        path = os.path.abspath(path)
+        with self.lock:
+            return next((job for job in self.jobs if job.path == path and not job.finished), None)
+    
+    def position(self, job):
+        """Return how many jobs run or wait ahead of a queued job"""
+        with self.lock:
+            ahead = 0
+            for other in self.jobs:
+                if other is job:
+                    return ahead
+                if not other.finished:
+                    ahead += 1
+        return ahead
+    
+    def move(self, job_id, offset):
+        """Move a waiting job up (offset < 0) or down among the waiting jobs"""
+        with self.lock:
+            slots = [index for index, job in enumerate(self.jobs) if job.state == STATE_QUEUED]
+            waiting = [self.jobs[index] for index in slots]
+            current = next((i for i, job in enumerate(waiting) if job.id == job_id), None)
+            if current is None:
+                return False
+            target = min(max(current + offset, 0), len(waiting) - 1)
+            if target == current:
+                return False
+            waiting.insert(target, waiting.pop(current))
+            for index, job in zip(slots, waiting):
+                self.jobs[index] = job
+        self.changed()
+        return True
+    
+    def remove(self, job_id):
+        """Drop a waiting or finished job; a running one is cancelled instead"""
+        with self.lock:
+            job = next((job for job in self.jobs if job.id == job_id), None)
+            if job is None:
+                return False
+            if job.task is not None:
+                job.task.cancel()  # Ends as Cancelled at its next chunk
+                return True
+            self.jobs.remove(job)
+        self.changed()
+        return True
+    
+    def clear_finished(self):
+        """Drop every finished job from the list"""
+        with self.lock:
+            self.jobs = [job for job in self.jobs if not job.finished]
+        self.changed()
+    
+    def pump(self):
+        """Start waiting jobs, in order, while fewer than max_parallel run"""
+        if not self.started:
+            return
+        started = False
+        with self.lock:
+            running = sum(1 for job in self.jobs if job.task is not None)
+            for job in self.jobs:
+                if running >= self.max_parallel:
+                    break
+                if job.state != STATE_QUEUED:
+                    continue
+                job.state, job.detail = STATE_RUNNING, ""
+                job.task = get_task_engine().submit(self.run, job, name=f"{self.name} queue")
+                running += 1
+                started = True
+        if started:
+            self.changed()
+    
+    def run(self, task, job):
+        started = time.perf_counter()
+        result = None
+        try:
+            result = self.run_job(job, task.token)
+            state, detail = STATE_DONE, f"{time.perf_counter() - started:.1f} s"
+        except TaskCancelled:
+            state, detail = STATE_CANCELLED, ""
+        except Exception as e:
+            state, detail = STATE_FAILED, str(e) or type(e).__name__
+        
+        with self.lock:
+            job.state, job.detail, job.result = state, detail, result
+            job.task = None
+            self.trim_history()
+        self.changed()
+        if self.on_finished:
+            self.on_finished(job)
+        self.pump()
+    
+    def trim_history(self):
+        """Keep only the newest JOB_QUEUE_HISTORY finished jobs (call with the lock held)"""
+        finished = [job for job in self.jobs if job.finished]
+        excess = len(finished) - AppConfig.JOB_QUEUE_HISTORY
+        if excess > 0:
+            dropped = set(map(id, finished[:excess]))
+            self.jobs = [job for job in self.jobs if id(job) not in dropped]
+    
+    def changed(self):
+        self.save()
+        if self.on_change:
+            self.on_change()
+
+
+def run_build_job(job, cancel):
+    """BUILD runner: clean the ME region into '<name>_cleaned.bin' and return report lines
+    
+    Errors propagate so the queue marks the job Failed.
+    """
+    started = time.perf_counter()
+    result = clean_me_image(job.path, cancel=cancel)
+    lines = describe_clean_result(result)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    lines.append(f"✅ BUILD completed in {elapsed_ms:.0f} ms")
+    return lines
+
+
+_build_queues = {}
+_build_queues_lock = threading.Lock()
+
+
+def get_build_queue(station=BUILD_STATION):
+    """Return the shared BUILD queue of a station (restored from its journal, not started)"""
+    with _build_queues_lock:
+        queue = _build_queues.get(station)
+        if queue is None:
+            queue = _build_queues[station] = JobQueue(station, run_build_job)
+        return queue
@@ -0,0 +1,380 @@
+"""
+Intel ME region analyzer: $FPT partition table, $CPD directories and $MN2 manifests
+"""
+
+import struct
+import zlib
+from collections import namedtuple
+
+from functions.flash_descriptor import REGION_ME, FlashDescriptorError, get_flash_layout
+from functions.signature_scanner import get_scanner
+
+FPT_SIGNATURE = b"$FPT"
+CPD_SIGNATURE = b"$CPD"
+MN2_SIGNATURE = b"$MN2"
+
+# $FPT is preceded by a 16-byte ROM bypass vector on most images
+ROM_BYPASS_SIZE = 0x10
+FPT_HEADER_SIZE = 0x20
+FPT_ENTRY_SIZE = 0x20
+FPT_MAX_ENTRIES = 64
+FPT_HEADER_VERSION_21 = 0x21  # CSME 12+: CRC32 instead of an 8-bit sum
+
+CPD_ENTRY_SIZE = 0x18
+CPD_MAX_ENTRIES = 256
+
+# $MN2 sits 0x1C bytes into the manifest header
+MN2_HEADER_OFFSET = 0x1C
+MANIFEST_HEADER_SIZE = 0x30
+INTEL_VENDOR_ID = 0x8086
+
+# Manifest extension holding the FW SKU attributes (CSE only)
+EXT_FW_SKU = 0x0C
+MAX_EXTENSIONS = 64
+
+SKU_TYPE_NAMES = {0: "Corporate", 1: "Consumer", 2: "Slim"}
+SKU_PLATFORM_NAMES = {0: "H", 1: "LP", 2: "N"}
+
+FptHeader = namedtuple(
+    "FptHeader", "offset rom_bypass entry_count header_version header_length checksum checksum_valid fitc_version"
+)
+CpdEntry = namedtuple("CpdEntry", "name offset length compressed")
+CodePartition = namedtuple("CodePartition", "name offset header_version entries checksum_valid")
+Manifest = namedtuple("Manifest", "partition offset version svn sku platform")
+
+
+class FptEntry(namedtuple("FptEntry", "name offset length flags")):
+    """One $FPT partition entry; offset is relative to the ME region"""
+    
+    __slots__ = ()
+    
+    @property
+    def valid(self):
+        return (self.flags >> 24) != 0xFF and self.length not in (0, 0xFFFFFFFF)
+    
+    @property
+    def is_code(self):
+        return (self.flags & 0x7F) == 0
+
+
+class MEInfo(namedtuple("MEInfo", "version sku platform svn fpt partitions code_partitions manifests warnings")):
+    """Compact result of analyze_me_region(); all offsets are region-relative"""
+    
+    __slots__ = ()
+    
+    @property
+    def family(self):
+        if self.version and self.version[0] >= 11:
+            return "CSME"
+        return "ME"
+    
+    @property
+    def version_string(self):
+        return format_version(self.version)
+
+
+class MEParseError(Exception):
+    """Raised when an ME structure is present but malformed"""
+
+
+def find_fpt(data):
+    """Return the offset of $FPT at the start of an ME region, or -1"""
+    for offset in (ROM_BYPASS_SIZE, 0x0):
+        if bytes(data[offset:offset + 4]) == FPT_SIGNATURE:
+            return offset
+    return -1
+
+
+def fpt_header_checksum(data, fpt_offset):
+    """Compute the $FPT header checksum in the form stored in the header
+    
+    Header version 2.1 uses CRC32 over the header (field zeroed); older
+    headers use an 8-bit sum over the ROM bypass vector plus header.
+    """
+    header_version = data[fpt_offset + 8]
+    header_length = data[fpt_offset + 10] or FPT_HEADER_SIZE
+    header = bytearray(data[fpt_offset:fpt_offset + header_length])
+    if header_version == FPT_HEADER_VERSION_21:
+        header[0x14:0x18] = b"\x00\x00\x00\x00"
+        return zlib.crc32(header) & 0xFFFFFFFF
+    
+    header[0x0B] = 0
+    start = fpt_offset - ROM_BYPASS_SIZE if fpt_offset >= ROM_BYPASS_SIZE else fpt_offset
+    total = sum(bytes(data[start:fpt_offset])) + sum(header)
+    return (0x100 - (total & 0xFF)) & 0xFF
+
+
+def parse_fpt_header(data):
+    """Return the FptHeader of an ME region, or None when there is no $FPT"""
+    fpt_offset = find_fpt(data)
+    if fpt_offset < 0:
+        return None
+    if len(data) < fpt_offset + FPT_HEADER_SIZE:
+        raise MEParseError("Truncated $FPT header")
+    
+    entry_count = struct.unpack_from("<I", data, fpt_offset + 4)[0]
+    header_version = data[fpt_offset + 8]
+    header_length = data[fpt_offset + 10] or FPT_HEADER_SIZE
+    if entry_count > FPT_MAX_ENTRIES:
+        raise MEParseError(f"Implausible $FPT entry count {entry_count}")
+    
+    if header_version == FPT_HEADER_VERSION_21:
+        checksum = struct.unpack_from("<I", data, fpt_offset + 0x14)[0]
+    else:
+        checksum = data[fpt_offset + 0x0B]
+    fitc_version = struct.unpack_from("<HHHH", data, fpt_offset + 0x18)
+    return FptHeader(
+        fpt_offset, fpt_offset == ROM_BYPASS_SIZE, entry_count, header_version, header_length,
+        checksum, checksum == fpt_header_checksum(data, fpt_offset), fitc_version
+    )
+
+
+def parse_fpt(data, header=None):
+    """Return the FPT entries of an ME region (data starts at the region)
+    
+    Returns an empty list when there is no $FPT. Entry offsets are
+    relative to the start of the ME region.
+    """
+    if header is None:
+        header = parse_fpt_header(data)
+    if header is None:
+        return []
+    
+    entries = []
+    base = header.offset + header.header_length
+    for index in range(header.entry_count):
+        entry_offset = base + index * FPT_ENTRY_SIZE
+        if entry_offset + FPT_ENTRY_SIZE > len(data):
+            raise MEParseError("Truncated $FPT entry table")
+        name = bytes(data[entry_offset:entry_offset + 4]).rstrip(b"\x00").decode("ascii", "replace")
+        offset, length = struct.unpack_from("<II", data, entry_offset + 8)
+        flags = struct.unpack_from("<I", data, entry_offset + 28)[0]
+        entries.append(FptEntry(name, offset, length, flags))
+    return entries
+
+
+def cpd_checksum(data, offset):
+    """Compute the $CPD checksum (8-bit sum for v1, CRC32 for v2)"""
+    header_version = data[offset + 8]
+    header_length = data[offset + 10]
+    count = struct.unpack_from("<I", data, offset + 4)[0]
+    table = bytearray(data[offset:offset + header_length + count * CPD_ENTRY_SIZE])
+    if header_version >= 2:
+        table[0x0C:0x10] = b"\x00\x00\x00\x00"
+        return zlib.crc32(table) & 0xFFFFFFFF
+    table[0x0B] = 0
+    return (0x100 - (sum(table) & 0xFF)) & 0xFF
+
+
+def parse_cpd(data, offset):
+    """Parse a $CPD code partition directory at data[offset]"""
+    if bytes(data[offset:offset + 4]) != CPD_SIGNATURE:
+        raise MEParseError(f"No $CPD at 0x{offset:X}")
+    count = struct.unpack_from("<I", data, offset + 4)[0]
+    header_version = data[offset + 8]
+    header_length = data[offset + 10]
+    if count > CPD_MAX_ENTRIES or header_length < 0x10:
+        raise MEParseError(f"Invalid $CPD header at 0x{offset:X}")
+    if offset + header_length + count * CPD_ENTRY_SIZE > len(data):
+        raise MEParseError(f"Truncated $CPD at 0x{offset:X}")
+    
+    if header_version >= 2:
+        stored = struct.unpack_from("<I", data, offset + 0x0C)[0]
+        name_offset = 0x10
+    else:
+        stored = data[offset + 0x0B]
+        name_offset = 0x0C
+    name = bytes(data[offset + name_offset:offset + name_offset + 4]).rstrip(b"\x00").decode("ascii", "replace")
+    
+    entries = []
+    for index in range(count):
+        entry_offset = offset + header_length + index * CPD_ENTRY_SIZE
+        entry_name = bytes(data[entry_offset:entry_offset + 12]).split(b"\x00")[0].decode("ascii", "replace")
+        location, length = struct.unpack_from("<II", data, entry_offset + 12)
+        entries.append(CpdEntry(entry_name, location & 0x1FFFFFF, length, bool(location & 0x2000000)))
+    return CodePartition(name, offset, header_version, tuple(entries), stored == cpd_checksum(data, offset))
+
+
+def read_manifest_version(data, mn2_offset):
+    """Return (major, minor, hotfix, build) of the manifest holding $MN2, or None"""
+    header = mn2_offset - MN2_HEADER_OFFSET
+    if header < 0 or header + MANIFEST_HEADER_SIZE > len(data):
+        return None
+    vendor = struct.unpack_from("<I", data, header + 0x10)[0]
+    if vendor != INTEL_VENDOR_ID:
+        return None
+    return struct.unpack_from("<HHHH", data, header + 0x24)
+
+
+def parse_manifest(data, offset, partition=None):
+    """Parse the $MN2 manifest starting at data[offset], or return None"""
+    if offset < 0 or offset + MANIFEST_HEADER_SIZE > len(data):
+        return None
+    if bytes(data[offset + MN2_HEADER_OFFSET:offset + MN2_HEADER_OFFSET + 4]) != MN2_SIGNATURE:
+        return None
+    version = read_manifest_version(data, offset + MN2_HEADER_OFFSET)
+    if version is None:
+        return None
+    
+    header_length = struct.unpack_from("<I", data, offset + 4)[0]
+    size = struct.unpack_from("<I", data, offset + 0x18)[0]
+    svn = struct.unpack_from("<I", data, offset + 0x2C)[0]
+    sku = platform = None
+    
+    # Extensions follow the signed header (CSE manifests only)
+    position = offset + header_length * 4
+    end = min(offset + size * 4, len(data))
+    for _ in range(MAX_EXTENSIONS):
+        if position + 8 > end:
+            break
+        tag, length = struct.unpack_from("<II", data, position)
+        if length < 8:
+            break
+        if tag == EXT_FW_SKU and length >= 0x14 and position + 0x14 <= end:
+            attributes = struct.unpack_from("<Q", data, position + 0x0C)[0]
+            sku_type = (attributes >> 4) & 0xF
+            sku_platform = (attributes >> 11) & 0x3
+            sku = SKU_TYPE_NAMES.get(sku_type, f"Type {sku_type}")
+            platform = SKU_PLATFORM_NAMES.get(sku_platform, f"Platform {sku_platform}")
+            break
+        position += length
+    
+    return Manifest(partition, offset, version, svn, sku, platform)
+
+
+def analyze_me_region(data):
+    """Analyze an ME region (data starts at the region) into an MEInfo
+    
+    Only headers are read, so the cost does not depend on the region
+    size. Problems are reported in warnings rather than raised, so a
+    damaged region still yields whatever could be decoded.
+    """
+    warnings = []
+    partitions = ()
+    try:
+        fpt = parse_fpt_header(data)
+        if fpt is None:
+            warnings.append("No $FPT partition table")
+        else:
+            partitions = tuple(parse_fpt(data, fpt))
+            if not fpt.checksum_valid:
+                warnings.append("$FPT header checksum mismatch")
+    except (MEParseError, struct.error) as e:
+        fpt = None
+        warnings.append(str(e))
+    
+    code_partitions, manifests = [], []
+    for entry in partitions:
+        if not entry.valid or entry.offset + 4 > len(data):
+            continue
+        try:
+            if bytes(data[entry.offset:entry.offset + 4]) == CPD_SIGNATURE:
+                cpd = parse_cpd(data, entry.offset)
+                code_partitions.append(cpd)
+                if not cpd.checksum_valid:
+                    warnings.append(f"{cpd.name} $CPD checksum mismatch")
+                for module in cpd.entries:
+                    if module.name.endswith(".man"):
+                        manifest = parse_manifest(data, entry.offset + module.offset, entry.name)
+                        if manifest:
+                            manifests.append(manifest)
+            else:
+                # Pre-CSE partitions start with the manifest itself
+                manifest = parse_manifest(data, entry.offset, entry.name)
+                if manifest:
+                    manifests.append(manifest)
+        except (MEParseError, struct.error) as e:
+            warnings.append(f"{entry.name}: {e}")
+    
+    # The FTPR (recovery/boot) manifest carries the firmware version
+    main = next((m for m in manifests if m.partition == "FTPR"), None)
+    if main is None and manifests:
+        main = manifests[0]
+    if main is None:
+        main = _scan_for_manifest(data)
+    
+    if main is None:
+        main = Manifest(None, None, None, None, None, None)
+    return MEInfo(
+        main.version, main.sku, main.platform, main.svn, fpt, partitions,
+        tuple(code_partitions), tuple(manifests), tuple(warnings)
+    )
+
+
+def _scan_for_manifest(data):
+    """Fall back to the first valid $MN2 anywhere in the region"""
+    for hit in get_scanner(("MN2",)).scan(data):
+        manifest = parse_manifest(data, hit.offset - MN2_HEADER_OFFSET)
+        if manifest:
+            return manifest
+    return None
+
+
+def get_me_region(image):
+    """Return (base, view) of the ME region of a BiosImage, or None
+    
+    Images without a descriptor are treated as ME region dumps when they
+    start with a $FPT.
+    """
+    try:
+        layout = get_flash_layout(image)
+    except FlashDescriptorError:
+        layout = None
+    if layout is not None:
+        region = layout.region(REGION_ME)
+        if region is None:
+            return None
+        return region.base, image.region(region.base, region.size)
+    view = image.view()
+    if find_fpt(view) >= 0:
+        return 0, view
+    return None
+
+
+def analyze_image_me(image):
+    """Analyze the ME region of a BiosImage; returns (base, MEInfo) or None"""
+    located = get_me_region(image)
+    if located is None:
+        return None
+    base, view = located
+    return base, analyze_me_region(view)
+
+
+def format_version(version):
+    """Format a (major, minor, hotfix, build) tuple"""
+    return ".".join(str(part) for part in version) if version else None
+
+
+def describe_me(info, base=0):
+    """Return report lines for an MEInfo; base turns offsets into image offsets"""
+    if info is None:
+        return ["No ME region found"]
+    lines = []
+    if info.version:
+        lines.append(f"{info.family} version: {info.version_string}")
+    else:
+        lines.append("ME version: unknown (no manifest found)")
+    if info.sku or info.platform:
+        lines.append(f"SKU: {info.sku or 'Unknown'} ({info.platform or '?'})")
+    if info.svn is not None:
+        lines.append(f"SVN: {info.svn}")
+    
+    if info.fpt:
+        fpt = info.fpt
+        checksum = "OK" if fpt.checksum_valid else "BAD"
+        lines.append(
+            f"$FPT at 0x{base + fpt.offset:X}: v{fpt.header_version >> 4}.{fpt.header_version & 0xF}, "
+            f"{fpt.entry_count} entries, checksum {checksum}"
+        )
+        for entry in info.partitions:
+            kind = "code" if entry.is_code else "data"
+            state = "" if entry.valid else " (empty)"
+            lines.append(f"  {entry.name:<4} 0x{base + entry.offset:08X} {entry.length:>9} bytes {kind}{state}")
+    for cpd in info.code_partitions:
+        checksum = "OK" if cpd.checksum_valid else "BAD"
+        lines.append(f"$CPD {cpd.name}: {len(cpd.entries)} modules, checksum {checksum}")
+    for manifest in info.manifests:
+        lines.append(f"$MN2 {manifest.partition}: {format_version(manifest.version)} SVN {manifest.svn}")
+    for warning in info.warnings:
+        lines.append(f"⚠️ {warning}")
+    return lines
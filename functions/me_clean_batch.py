@@ -0,0 +1,232 @@
+"""
+Folder-level ME Clean batches with bounded parallelism and a memory budget
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from constants.app_config import AppConfig
+from functions.bios_image import BiosImage
+from functions.me_analysis import analyze_image_me
+from functions.me_clean_functions import MECleanError, clean_me_image
+from functions.task_engine import CancelToken, TaskCancelled
+
+IMAGE_EXTENSIONS = (".bin",)
+OUTPUT_SUFFIXES = ("_cleaned.bin", "_dmi.bin")
+
+STATE_QUEUED = "Queued"
+STATE_WAITING = "Waiting for memory"
+STATE_ANALYZING = "Analyzing"
+STATE_CLEANING = "Cleaning"
+STATE_DONE = "Done"
+STATE_SKIPPED = "Skipped"
+STATE_FAILED = "Failed"
+STATE_CANCELLED = "Cancelled"
+
+FINISHED_STATES = (STATE_DONE, STATE_SKIPPED, STATE_FAILED, STATE_CANCELLED)
+
+
+class BatchJob:
+    """One image of a batch and its current state"""
+    
+    __slots__ = ("index", "path", "size", "state", "detail", "output_path", "elapsed")
+    
+    def __init__(self, index, path, size):
+        self.index = index
+        self.path = path
+        self.size = size
+        self.state = STATE_QUEUED
+        self.detail = ""
+        self.output_path = None
+        self.elapsed = 0.0
+    
+    @property
+    def filename(self):
+        return os.path.basename(self.path)
+    
+    @property
+    def finished(self):
+        return self.state in FINISHED_STATES
+
+
+def find_images(paths):
+    """Expand files and folders into a sorted list of image paths
+    
+    Folders are walked recursively; outputs of earlier runs
+    ('*_cleaned.bin', '*_dmi.bin') are left out.
+    """
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                found.extend(os.path.join(root, name) for name in sorted(files))
+        else:
+            found.append(path)
+    
+    images = []
+    seen = set()
+    for path in found:
+        lower = path.lower()
+        if not lower.endswith(IMAGE_EXTENSIONS) or lower.endswith(OUTPUT_SUFFIXES):
+            continue
+        key = os.path.abspath(path)
+        if key not in seen and os.path.isfile(key):
+            seen.add(key)
+            images.append(key)
+    return images
+
+
+class MECleanBatch:
+    """Analyzes and cleans many images on a bounded worker pool
+    
+    At most max_workers images are processed at once, and a job only
+    starts while the sizes of the images in flight fit memory_budget
+    (an image larger than the whole budget runs on its own). on_update
+    (job) is called from worker threads whenever a job changes state.
+    """
+    
+    def __init__(self, paths, max_workers=None, memory_budget=None, on_update=None):
+        self.max_workers = max(1, max_workers or AppConfig.BATCH_MAX_WORKERS or os.cpu_count() or 1)
+        self.memory_budget = memory_budget or AppConfig.ME_BATCH_MEMORY_BUDGET
+        self.on_update = on_update
+        self.jobs = []
+        for path in paths:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                size = 0
+            self.jobs.append(BatchJob(len(self.jobs), path, size))
+        
+        self.cancelled = CancelToken()
+        self.condition = threading.Condition()
+        self.bytes_in_flight = 0
+        self.running = 0
+        self.started = None
+        self.elapsed = 0.0
+        self.thread = None
+    
+    def start(self, on_finished=None):
+        """Run the batch on a background thread; on_finished(batch) runs at the end"""
+        def run():
+            self.run()
+            if on_finished:
+                on_finished(self)
+        
+        self.thread = threading.Thread(target=run, name="me-clean-batch", daemon=True)
+        self.thread.start()
+    
+    @property
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+    
+    def run(self):
+        """Process every job, blocking until the batch is finished"""
+        self.started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="me-clean") as pool:
+            for job in self.jobs:
+                if not self.admit(job):
+                    break
+                pool.submit(self.process, job)
+        
+        for job in self.jobs:
+            if not job.finished:
+                self.update(job, STATE_CANCELLED)
+        self.elapsed = time.perf_counter() - self.started
+    
+    def admit(self, job):
+        """Wait until a worker slot and enough of the memory budget are free"""
+        with self.condition:
+            waiting = False
+            while not self.cancelled.is_set():
+                fits = self.bytes_in_flight + job.size <= self.memory_budget or self.running == 0
+                if self.running < self.max_workers and fits:
+                    self.running += 1
+                    self.bytes_in_flight += job.size
+                    return True
+                if not waiting and self.running >= 1 and not fits:
+                    waiting = True
+                    self.update(job, STATE_WAITING)
+                self.condition.wait(0.5)
+        return False
+    
+    def release(self, job):
+        with self.condition:
+            self.running -= 1
+            self.bytes_in_flight -= job.size
+            self.condition.notify_all()
+    
+    def cancel(self):
+        """Stop the batch; running jobs stop at their next chunk and write nothing"""
+        self.cancelled.cancel()
+        with self.condition:
+            self.condition.notify_all()
+    
+    def process(self, job):
+        started = time.perf_counter()
+        try:
+            if self.cancelled.is_set():
+                self.update(job, STATE_CANCELLED)
+                return
+            self.update(job, STATE_ANALYZING)
+            image = BiosImage(job.path)
+            try:
+                found = analyze_image_me(image)
+            finally:
+                image.close()
+            if found is None:
+                self.update(job, STATE_SKIPPED, "No ME region")
+                return
+            base, info = found
+            version = f"{info.family} {info.version_string}" if info.version else "ME (unknown version)"
+            
+            if self.cancelled.is_set():
+                self.update(job, STATE_CANCELLED)
+                return
+            self.update(job, STATE_CLEANING, version)
+            result = clean_me_image(job.path, cancel=self.cancelled)
+            job.output_path = result.write.output_path
+            job.elapsed = time.perf_counter() - started
+            removed = len(result.removed_partitions)
+            self.update(job, STATE_DONE, f"{version}, {removed} partitions removed → "
+                                         f"{os.path.basename(job.output_path)}")
+        except TaskCancelled:
+            job.elapsed = time.perf_counter() - started
+            self.update(job, STATE_CANCELLED)
+        except (MECleanError, OSError, ValueError) as e:
+            job.elapsed = time.perf_counter() - started
+            self.update(job, STATE_FAILED, str(e))
+        except Exception as e:
+            job.elapsed = time.perf_counter() - started
+            self.update(job, STATE_FAILED, f"{type(e).__name__}: {e}")
+        finally:
+            self.release(job)
+    
+    def update(self, job, state, detail=None):
+        job.state = state
+        if detail is not None:
+            job.detail = detail
+        if self.on_update:
+            self.on_update(job)
+    
+    def counts(self):
+        """Return {state: number of jobs}"""
+        counts = {}
+        for job in self.jobs:
+            counts[job.state] = counts.get(job.state, 0) + 1
+        return counts
+
+
+def describe_batch(batch):
+    """Return a one-line summary such as '12/200 finished, 11 done, 1 failed'"""
+    counts = batch.counts()
+    finished = sum(counts.get(state, 0) for state in FINISHED_STATES)
+    parts = [f"{finished}/{len(batch.jobs)} finished"]
+    for state in (STATE_DONE, STATE_SKIPPED, STATE_FAILED, STATE_CANCELLED):
+        if counts.get(state):
+            parts.append(f"{counts[state]} {state.lower()}")
+    if batch.elapsed:
+        parts.append(f"{batch.elapsed:.1f} s")
+    return ", ".join(parts)
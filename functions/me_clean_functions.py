@@ -2,21 +2,216 @@
 ME Clean specific functions
 """
 
-import tkinter as tk
-from tkinter import messagebox
+import os
+import struct
+from collections import namedtuple
+
+from functions.flash_descriptor import REGION_ME, DESCRIPTOR_SIZE, FlashDescriptorError, parse_flash_descriptor
+from functions.me_analysis import (
+    CPD_SIGNATURE, FPT_ENTRY_SIZE, FPT_HEADER_VERSION_21, MEParseError,
+    analyze_image_me, analyze_me_region, cpd_checksum, fpt_header_checksum
+)
+from functions.image_writer import ImageWriteError, PatchedImage, describe_write
+
+# Partitions kept by default; everything else in the FPT is erased
+DEFAULT_KEEP_PARTITIONS = ("FTPR",)
+
+# Modules the CSE bring-up path needs (ME 11+); manifests/metadata are always kept
+ESSENTIAL_CSE_MODULES = ("rbe", "kernel", "syslib", "bup")
+
+ERASED_BYTE = 0xFF
+
+CleanResult = namedtuple(
+    "CleanResult", "write removed_partitions removed_modules bytes_modified dirty_ranges warnings"
+)
+
+
+class MECleanError(Exception):
+    """Raised when an image cannot be cleaned"""
+
+
+class MECleanEngine:
+    """Cleans the ME region of an image on a private copy-on-write mapping
+    
+    Reads come straight from the page cache and only pages that are
+    written get private copies, so memory grows with the bytes modified
+    rather than the image size. The output writer then copies only the
+    dirty blocks on top of a cheap clone of the source.
+    """
+    
+    def __init__(self, source_path, keep_partitions=DEFAULT_KEEP_PARTITIONS, keep_modules=ESSENTIAL_CSE_MODULES,
+                 cancel=None):
+        self.image = PatchedImage(source_path)
+        self.keep_partitions = tuple(keep_partitions)
+        self.keep_modules = tuple(keep_modules)
+        self.cancel = cancel  # Checked per erased block and per written chunk
+    
+    def __enter__(self):
+        try:
+            self.image.open()
+        except ImageWriteError as e:
+            raise MECleanError(str(e)) from None
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.image.close()
+    
+    @property
+    def mapping(self):
+        return self.image.mapping
+    
+    def write(self, offset, data):
+        try:
+            self.image.write(offset, data)
+        except ImageWriteError as e:
+            raise MECleanError(str(e)) from None
+    
+    def erase(self, offset, length):
+        """Fill a range with the erased byte"""
+        self.image.fill(offset, length, ERASED_BYTE, cancel=self.cancel)
+    
+    def locate_me_region(self):
+        """Return (base, size) of the ME region in the mapping"""
+        size = len(self.mapping)
+        with self.image.view() as view:
+            try:
+                layout = parse_flash_descriptor(view[:min(size, DESCRIPTOR_SIZE)], size)
+            except FlashDescriptorError as e:
+                raise MECleanError(f"Invalid flash descriptor: {e}") from None
+        if layout is None:
+            return 0, size  # ME region dump
+        region = layout.region(REGION_ME)
+        if region is None:
+            raise MECleanError("Image has no ME region")
+        return region.base, region.size
+    
+    def clean(self):
+        """Remove non-essential partitions and modules; returns (removed_partitions, removed_modules, warnings)"""
+        base, size = self.locate_me_region()
+        with self.image.view() as view:
+            with view[base:base + size] as region:
+                info = analyze_me_region(region)
+        if info.fpt is None:
+            raise MECleanError("No $FPT partition table in the ME region")
+        
+        removed_partitions, removed_modules = [], []
+        kept = []
+        for index, entry in enumerate(info.partitions):
+            if entry.name in self.keep_partitions and entry.valid:
+                kept.append(index)
+                continue
+            if entry.valid and entry.offset + entry.length <= size:
+                self.erase(base + entry.offset, entry.length)
+            removed_partitions.append(entry.name)
+        
+        for cpd in info.code_partitions:
+            if cpd.name in self.keep_partitions:
+                removed_modules.extend(self._clean_code_partition(base, cpd))
+        
+        self._rewrite_fpt(base, info.fpt, kept)
+        return removed_partitions, removed_modules, list(info.warnings)
+    
+    def _clean_code_partition(self, base, cpd):
+        """Erase the data of non-essential modules inside a kept $CPD"""
+        removed = []
+        partition = base + cpd.offset
+        for module in cpd.entries:
+            name = module.name
+            if name.endswith((".man", ".met")) or name in self.keep_modules:
+                continue
+            if module.length:
+                self.erase(partition + module.offset, module.length)
+            removed.append(name)
+        
+        # The directory itself is unchanged, but re-stamp its checksum so a
+        # table fixed up elsewhere never leaves a stale value behind
+        if bytes(self.mapping[partition:partition + 4]) == CPD_SIGNATURE:
+            with self.image.view() as view:
+                checksum = cpd_checksum(view, partition)
+            if cpd.header_version >= 2:
+                self.write(partition + 0x0C, struct.pack("<I", checksum))
+            else:
+                self.write(partition + 0x0B, bytes([checksum]))
+        return removed
+    
+    def _rewrite_fpt(self, base, fpt, kept):
+        """Compact the $FPT entry table to the kept slots and fix its checksum"""
+        fpt_offset = base + fpt.offset
+        table = fpt_offset + fpt.header_length
+        entries = bytearray()
+        for index in kept:
+            entry_offset = table + index * FPT_ENTRY_SIZE
+            entries += self.mapping[entry_offset:entry_offset + FPT_ENTRY_SIZE]
+        entries += bytes([ERASED_BYTE]) * ((fpt.entry_count - len(kept)) * FPT_ENTRY_SIZE)
+        
+        self.write(table, bytes(entries))
+        self.write(fpt_offset + 4, struct.pack("<I", len(kept)))
+        with self.image.view() as view:
+            checksum = fpt_header_checksum(view, fpt_offset)
+        if fpt.header_version == FPT_HEADER_VERSION_21:
+            self.write(fpt_offset + 0x14, struct.pack("<I", checksum))
+        else:
+            self.write(fpt_offset + 0x0B, bytes([checksum]))
+
+
+def default_output_path(source_path):
+    """Return '<name>_cleaned.bin' next to the source image"""
+    root, ext = os.path.splitext(source_path)
+    return f"{root}_cleaned{ext or '.bin'}"
+
+
+def clean_me_image(source_path, output_path=None, keep_partitions=DEFAULT_KEEP_PARTITIONS,
+                   keep_modules=ESSENTIAL_CSE_MODULES, cancel=None):
+    """Clean the ME region of source_path into output_path; returns a CleanResult
+    
+    Raises TaskCancelled (and writes nothing) once cancel is set.
+    """
+    output_path = output_path or default_output_path(source_path)
+    with MECleanEngine(source_path, keep_partitions, keep_modules, cancel) as engine:
+        try:
+            removed_partitions, removed_modules, warnings = engine.clean()
+        except (MEParseError, struct.error) as e:
+            raise MECleanError(str(e)) from None
+        try:
+            written = engine.image.save(output_path, cancel=cancel)
+        except ImageWriteError as e:
+            raise MECleanError(str(e)) from None
+        return CleanResult(
+            written, removed_partitions, removed_modules,
+            engine.image.bytes_modified, engine.image.dirty_ranges(), warnings
+        )
+
+
+def describe_clean_result(result):
+    """Return console lines for a CleanResult"""
+    lines = []
+    if result.removed_partitions:
+        lines.append(f"Removed partitions: {', '.join(result.removed_partitions)}")
+    else:
+        lines.append("No partitions to remove")
+    if result.removed_modules:
+        lines.append(f"Removed {len(result.removed_modules)} modules: {', '.join(result.removed_modules)}")
+    lines.append("FPT entry table rebuilt, checksums fixed")
+    lines.append(f"Modified {result.bytes_modified / 1024:.0f} KB in {len(result.dirty_ranges)} ranges")
+    for warning in result.warnings:
+        lines.append(f"⚠️ {warning}")
+    lines.append(describe_write(result.write))
+    return lines
+
 
 class MECleanFunctions:
     def __init__(self):
         pass
     
-    def start_me_clean(self):
-        """Start ME cleaning process"""
-        messagebox.showinfo("ME Clean", "Starting Management Engine cleaning process...")
+    def start_me_clean(self, source_path, output_path=None):
+        """Start ME cleaning process; returns a CleanResult"""
+        return clean_me_image(source_path, output_path)
     
-    def check_me_status(self):
-        """Check ME status"""
-        messagebox.showinfo("ME Status", "Checking Management Engine status...")
+    def check_me_status(self, bios_image):
+        """Check ME status; returns (base, MEInfo) or None when there is no ME region"""
+        return analyze_image_me(bios_image)
     
     def backup_me_region(self):
         """Backup ME region"""
-        messagebox.showinfo("ME Backup", "Creating ME region backup...")
\ No newline at end of file
+        from tkinter import messagebox
+        messagebox.showinfo("ME Backup", "Creating ME region backup...")
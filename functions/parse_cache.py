@@ -0,0 +1,123 @@
+"""
+Persistent content-addressed cache of image parse results
+"""
+
+import json
+import os
+import shutil
+import threading
+
+from constants.app_config import AppConfig
+
+
+class ParseCache:
+    """Parse results stored on disk as JSON, keyed by image SHA-256
+    
+    Each parser version gets its own subdirectory, so bumping the version
+    invalidates every old entry at once; stale directories are removed
+    the first time the cache is touched. The total size is capped and
+    the least recently used entries (by file mtime) are deleted first.
+    """
+    
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = cache_dir or os.path.join(AppConfig.CACHE_DIR, "parse")
+        self.max_bytes = max_bytes or AppConfig.PARSE_CACHE_MAX_BYTES
+        self.lock = threading.Lock()
+        self.purged_versions = set()
+    
+    def get(self, digest, version):
+        """Return the cached result for an image hash, or None"""
+        path = self._entry_path(digest, version)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            self._remove(path)  # Corrupt or truncated entry
+            return None
+        if entry.get("digest") != digest or entry.get("version") != version:
+            return None
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        return entry.get("result")
+    
+    def put(self, digest, version, result):
+        """Store a JSON-serialisable result for an image hash"""
+        path = self._entry_path(digest, version)
+        entry = {"digest": digest, "version": version, "result": result}
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, separators=(",", ":"))
+            os.replace(temp_path, path)
+        except (OSError, TypeError, ValueError):
+            self._remove(temp_path)
+            return False  # Caching is best effort
+        self._trim(os.path.dirname(path))
+        return True
+    
+    def invalidate(self, digest, version):
+        """Forget one image"""
+        self._remove(self._entry_path(digest, version))
+    
+    def clear(self):
+        """Delete every cached result for every parser version"""
+        with self.lock:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            self.purged_versions.clear()
+    
+    def _entry_path(self, digest, version):
+        self._purge_other_versions(version)
+        return os.path.join(self.cache_dir, f"v{version}", f"{digest}.json")
+    
+    def _purge_other_versions(self, version):
+        """Remove directories left behind by other parser versions (once)"""
+        with self.lock:
+            if version in self.purged_versions:
+                return
+            self.purged_versions.add(version)
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            if name.startswith("v") and name != f"v{version}":
+                shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+    
+    def _trim(self, directory):
+        """Delete least recently used entries above max_bytes"""
+        try:
+            paths = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".json")]
+            stats = [(os.stat(path), path) for path in paths]
+        except OSError:
+            return
+        total = sum(stat.st_size for stat, _ in stats)
+        for stat, path in sorted(stats, key=lambda item: item[0].st_mtime):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= stat.st_size
+    
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_parse_cache():
+    """Return the process-wide parse-result cache"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ParseCache()
+        return _default_cache
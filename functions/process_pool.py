@@ -0,0 +1,189 @@
+"""
+Process-pool backend for CPU-heavy firmware work (decompression, parsing, scanning)
+"""
+
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from constants.app_config import AppConfig
+from functions.bios_image import BiosImage, BiosImageSession
+from functions.section_cache import get_section_cache
+from functions.task_engine import raise_if_cancelled
+
+# Sent to workers instead of the image bytes; they map the same file (shared page cache)
+ImageRef = namedtuple("ImageRef", "path size mtime content_hash")
+
+# How often a waiting caller forwards its cancel token to the worker
+CANCEL_POLL_SECONDS = 0.05
+
+
+def image_ref(image):
+    """Return the ImageRef a worker process uses to map a BiosImage"""
+    return ImageRef(image.filepath, image.size, image.mtime, image.content_hash)
+
+
+class SharedCancelFlag:
+    """Cancel flag visible to worker processes: one byte of shared memory
+    
+    Pickles by name, so it can be sent with a job; in the worker it is
+    polled like any cancel token (is_set()), so the functions/ engines
+    need nothing process-specific.
+    """
+    
+    def __init__(self, name=None):
+        from multiprocessing import shared_memory
+        
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=1)
+            self.shm.buf[0] = 0
+        else:
+            self.shm = _attach_shared_memory(shared_memory, name)
+        self.closed = False
+    
+    def __reduce__(self):
+        return SharedCancelFlag, (self.shm.name,)
+    
+    def set(self):
+        if not self.closed:
+            self.shm.buf[0] = 1
+    
+    def is_set(self):
+        return not self.closed and self.shm.buf[0] != 0
+    
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _attach_shared_memory(shared_memory, name):
+    """Attach to the caller's block; only the caller unlinks it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        # Pool workers share the caller's resource tracker, which keeps a set of
+        # names: the second registration is dropped again by the caller's unlink()
+        return shared_memory.SharedMemory(name=name)
+
+
+# Worker-process side: one mapping per file, kept between jobs
+_worker_images = None
+
+
+def _init_worker():
+    # Each worker has its own memory tier; the disk tier is what they share
+    get_section_cache().write_through = True
+
+
+def _open_image(ref):
+    global _worker_images
+    if _worker_images is None:
+        _worker_images = BiosImageSession()
+    image = _worker_images.open(ref.path)
+    if image.size != ref.size or image.mtime != ref.mtime:
+        raise OSError(f"{image.filename} changed on disk")
+    if ref.content_hash and image.content_hash is None:
+        image.content_hash = ref.content_hash  # Already hashed by the caller
+    return image
+
+
+def _run_job(fn, args, kwargs, cancel):
+    args = [_open_image(arg) if isinstance(arg, ImageRef) else arg for arg in args]
+    try:
+        if cancel is not None:
+            kwargs = dict(kwargs, cancel=cancel)
+        return fn(*args, **kwargs)
+    finally:
+        if cancel is not None:
+            cancel.close()
+
+
+class ProcessBackend:
+    """Runs module-level functions in a shared pool of worker processes
+    
+    Pure-Python parsing and decompression hold the GIL; running them in
+    another process keeps the Tk thread responsive. BiosImage arguments
+    travel as ImageRef (path, size, mtime, hash) and are re-mapped in the
+    worker, so no image bytes are pickled. The pool is started on first
+    use with the spawn method, which is safe next to Tk and threads.
+    Workers write inflated sections through to the disk tier of the
+    section cache, so whichever worker gets the next job reuses them.
+    """
+    
+    def __init__(self, max_workers=None):
+        self.max_workers = max(1, max_workers or AppConfig.PROCESS_MAX_WORKERS or os.cpu_count() or 1)
+        self.pool = None
+        self.lock = threading.Lock()
+    
+    def get_pool(self):
+        # Deferred: multiprocessing is only needed once a job is offloaded
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        
+        with self.lock:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker
+                )
+            return self.pool
+    
+    def run(self, fn, *args, cancel=None, **kwargs):
+        """Run fn(*args, **kwargs) in a worker process and return its result
+        
+        Blocks the calling thread (a task-engine worker). When cancel is
+        given, fn also receives cancel= a SharedCancelFlag that is set as
+        soon as the caller's token is, so the job stops within one chunk
+        and TaskCancelled comes back from the worker.
+        """
+        from concurrent.futures.process import BrokenProcessPool
+        
+        raise_if_cancelled(cancel)
+        args = tuple(image_ref(arg) if isinstance(arg, BiosImage) else arg for arg in args)
+        flag = SharedCancelFlag() if cancel is not None else None
+        try:
+            future = self.get_pool().submit(_run_job, fn, args, kwargs, flag)
+            while True:
+                try:
+                    return future.result(timeout=CANCEL_POLL_SECONDS if flag else None)
+                except FutureTimeout:
+                    if cancel.is_set():
+                        flag.set()
+        except BrokenProcessPool:
+            with self.lock:
+                self.pool = None  # A worker died; start a fresh pool next time
+            raise
+        finally:
+            if flag is not None:
+                flag.close()
+    
+    def shutdown(self):
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = None
+
+
+_default_backend = None
+_default_backend_lock = threading.Lock()
+
+
+def get_process_backend():
+    """Return the process-wide process backend"""
+    global _default_backend
+    with _default_backend_lock:
+        if _default_backend is None:
+            _default_backend = ProcessBackend()
+        return _default_backend
+
+
+def shutdown_process_backend():
+    """Stop the worker processes, if any were started"""
+    if _default_backend is not None:
+        _default_backend.shutdown()
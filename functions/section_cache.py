@@ -0,0 +1,174 @@
+"""
+Decompressed-section cache with byte-bounded LRU and on-disk spill
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from constants.app_config import AppConfig
+
+
+class SectionCache:
+    """LRU of inflated sections keyed by (image hash, section location)
+    
+    Entries are evicted least-recently-used first once the in-memory total
+    exceeds max_memory_bytes. Evicted entries are written to spill_dir and
+    read back (and promoted) on the next request, so a section is only
+    ever decompressed once per image. With write_through, every new entry
+    is written to spill_dir straight away: worker processes each have
+    their own memory tier and share sections through the disk.
+    """
+    
+    def __init__(self, max_memory_bytes=None, spill_dir=None, max_disk_bytes=None, write_through=False):
+        self.max_memory_bytes = max_memory_bytes or AppConfig.SECTION_CACHE_MEMORY_BYTES
+        self.max_disk_bytes = max_disk_bytes or AppConfig.SECTION_CACHE_DISK_BYTES
+        self.spill_dir = spill_dir or os.path.join(AppConfig.CACHE_DIR, "sections")
+        self.write_through = write_through
+        self.entries = OrderedDict()
+        self.memory_bytes = 0
+        self.lock = threading.Lock()
+        
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+    
+    def get(self, key):
+        """Return cached data for key, or None"""
+        with self.lock:
+            data = self.entries.get(key)
+            if data is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return data
+        
+        data = self._read_spilled(key)
+        if data is not None:
+            with self.lock:
+                self.disk_hits += 1
+            self.put(key, data, spill=False)
+        return data
+    
+    def put(self, key, data, spill=True):
+        """Store data for key, evicting (and spilling) older entries"""
+        data = bytes(data)
+        if spill and (self.write_through or len(data) > self.max_memory_bytes):
+            self._write_spilled(key, data)
+        if len(data) > self.max_memory_bytes:
+            return
+        
+        evicted = []
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.memory_bytes -= len(previous)
+            self.entries[key] = data
+            self.memory_bytes += len(data)
+            while self.memory_bytes > self.max_memory_bytes:
+                old_key, old_data = self.entries.popitem(last=False)
+                self.memory_bytes -= len(old_data)
+                evicted.append((old_key, old_data))
+        
+        for old_key, old_data in evicted:
+            self._write_spilled(old_key, old_data)
+    
+    def get_or_decompress(self, key, decompress):
+        """Return cached data for key, calling decompress() only on a miss"""
+        data = self.get(key)
+        if data is None:
+            with self.lock:
+                self.misses += 1
+            data = bytes(decompress())
+            self.put(key, data)
+        return data
+    
+    def clear(self, include_disk=False):
+        """Drop every in-memory entry (and optionally the spill directory)"""
+        with self.lock:
+            self.entries.clear()
+            self.memory_bytes = 0
+        if include_disk and os.path.isdir(self.spill_dir):
+            for name in os.listdir(self.spill_dir):
+                if name.endswith(".sec"):
+                    self._remove(os.path.join(self.spill_dir, name))
+    
+    def stats(self):
+        """Return a dict of hit/miss counters and memory use"""
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "memory_bytes": self.memory_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
+    
+    def _spill_path(self, key):
+        image_hash, location = key
+        digest = hashlib.sha1(str(location).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.spill_dir, f"{image_hash}-{digest}.sec")
+    
+    def _read_spilled(self, key):
+        path = self._spill_path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)  # Keep recently used spills on disk longer
+        except OSError:
+            pass
+        return data
+    
+    def _write_spilled(self, key, data):
+        path = self._spill_path(key)
+        if os.path.exists(path):
+            return
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            return  # Spilling is best effort; the section is simply decompressed again
+        self._trim_disk()
+    
+    def _trim_disk(self):
+        """Delete the least recently used spill files above max_disk_bytes"""
+        try:
+            files = [
+                os.path.join(self.spill_dir, name)
+                for name in os.listdir(self.spill_dir) if name.endswith(".sec")
+            ]
+            stats = [(os.stat(path), path) for path in files]
+        except OSError:
+            return
+        total = sum(stat.st_size for stat, _ in stats)
+        for stat, path in sorted(stats, key=lambda item: item[0].st_mtime):
+            if total <= self.max_disk_bytes:
+                break
+            self._remove(path)
+            total -= stat.st_size
+    
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_section_cache():
+    """Return the process-wide section cache"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = SectionCache()
+        return _default_cache
@@ -0,0 +1,217 @@
+"""
+Single-pass multi-signature scanner for firmware markers
+"""
+
+import re
+import struct
+from collections import namedtuple
+
+from functions.task_engine import raise_if_cancelled
+
+# Marker name -> byte signature
+FIRMWARE_SIGNATURES = {
+    "IFD": b"\x5a\xa5\xf0\x0f",   # Flash descriptor signature
+    "FPT": b"$FPT",               # ME flash partition table
+    "MN2": b"$MN2",               # ME/CSE manifest
+    "CPD": b"$CPD",               # CSE code partition directory
+    "FVH": b"_FVH",               # UEFI firmware volume header
+    "FIT": b"_FIT_   ",           # Firmware Interface Table
+    "HP_DMI": b"$DMI",            # HP DMI data block
+    "SMBIOS": b"$SMBIOS",         # SMBIOS table anchor (legacy HP/Phoenix)
+    "SM": b"_SM_",                # SMBIOS 2.x entry point
+    "SM3": b"_SM3_",              # SMBIOS 3.x entry point
+}
+
+SCAN_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Number of leading bytes checked by the vectorized prefilter
+PREFILTER_DEPTH = 4
+
+SignatureHit = namedtuple("SignatureHit", "offset name")
+
+_numpy = None
+
+
+def _load_numpy():
+    """Import numpy on first use; returns None when it is not installed"""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+
+class SignatureScanner:
+    """Finds many byte signatures in one pass over an image
+    
+    With numpy, each chunk is walked once by a vectorized prefilter that
+    keeps only offsets whose first bytes can start some signature; the
+    few survivors are then verified exactly. Without numpy, all
+    signatures are compiled into one regex alternation so the regex
+    engine still walks each chunk once (overlapping hits are skipped in
+    that mode). Chunks overlap by the longest signature minus one, so
+    hits on chunk boundaries are reported exactly once.
+    """
+    
+    def __init__(self, signatures=None, chunk_size=SCAN_CHUNK_SIZE):
+        if signatures is None:
+            signatures = FIRMWARE_SIGNATURES
+        if not signatures:
+            raise ValueError("At least one signature is required")
+        
+        self.signatures = dict(signatures)
+        self.names_by_pattern = {}
+        for name, pattern in self.signatures.items():
+            self.names_by_pattern.setdefault(bytes(pattern), []).append(name)
+        
+        # Longest first so a signature that prefixes another never hides it
+        patterns = sorted(self.names_by_pattern, key=len, reverse=True)
+        self.regex = re.compile(b"|".join(re.escape(p) for p in patterns))
+        self.overlap = max(len(p) for p in patterns) - 1
+        self.chunk_size = max(chunk_size, self.overlap + 1)
+        
+        self.patterns_by_first = {}
+        for pattern in patterns:
+            self.patterns_by_first.setdefault(pattern[0], []).append(pattern)
+        
+        self.prefilter = None
+        np = _load_numpy()
+        if np is not None:
+            depth = min(PREFILTER_DEPTH, min(len(p) for p in patterns))
+            tables = np.zeros((depth, 256), dtype=bool)
+            for pattern in patterns:
+                for i in range(depth):
+                    tables[i, pattern[i]] = True
+            self.prefilter = (np, tables, sorted(self.patterns_by_first))
+    
+    def scan(self, data, start=0, end=None, cancel=None):
+        """Yield SignatureHit(offset, name) for every hit in data[start:end]
+        
+        data can be a BiosImage, mmap, memoryview or bytes. Hits are
+        yielded in offset order while the scan is still running; cancel is
+        checked before each chunk.
+        """
+        view = data.view() if hasattr(data, "view") else memoryview(data)
+        if end is None or end > len(view):
+            end = len(view)
+        
+        position = start
+        while position < end:
+            raise_if_cancelled(cancel)
+            chunk_end = min(position + self.chunk_size, end)
+            window = view[position:min(chunk_end + self.overlap, end)]
+            limit = chunk_end - position
+            if self.prefilter is not None:
+                hits = self._scan_window_vectorized(window, limit)
+            else:
+                hits = self._scan_window_regex(window, limit)
+            for offset, name in hits:
+                yield SignatureHit(position + offset, name)
+            window.release()
+            position = chunk_end
+    
+    def _scan_window_regex(self, window, limit):
+        """Yield (offset, name) hits starting before limit using the regex"""
+        for match in self.regex.finditer(window):
+            if match.start() >= limit:
+                break  # Belongs to the next chunk
+            for name in self.names_by_pattern[match.group()]:
+                yield match.start(), name
+    
+    def _scan_window_vectorized(self, window, limit):
+        """Yield (offset, name) hits starting before limit using numpy"""
+        np, tables, first_bytes = self.prefilter
+        data = np.frombuffer(window, dtype=np.uint8)
+        depth = len(tables)
+        span = min(limit, len(data) - depth + 1)
+        if span <= 0:
+            return
+        
+        head = data[:span]
+        mask = head == first_bytes[0]
+        for value in first_bytes[1:]:
+            mask |= head == value
+        candidates = np.flatnonzero(mask)
+        for i in range(1, depth):
+            candidates = candidates[tables[i][data[candidates + i]]]
+        
+        for offset in candidates.tolist():
+            for pattern in self.patterns_by_first[window[offset]]:
+                if window[offset:offset + len(pattern)] == pattern:
+                    for name in self.names_by_pattern[pattern]:
+                        yield offset, name
+    
+    def scan_all(self, data, start=0, end=None, cancel=None):
+        """Return {name: [offsets]} for every signature, including misses"""
+        index = {name: [] for name in self.signatures}
+        for hit in self.scan(data, start, end, cancel):
+            index[hit.name].append(hit.offset)
+        return index
+
+
+_default_scanners = {}
+
+
+def get_scanner(names=None):
+    """Return a shared scanner for a subset of FIRMWARE_SIGNATURES"""
+    key = tuple(sorted(names)) if names else None
+    scanner = _default_scanners.get(key)
+    if scanner is None:
+        if names:
+            signatures = {name: FIRMWARE_SIGNATURES[name] for name in names}
+        else:
+            signatures = FIRMWARE_SIGNATURES
+        scanner = SignatureScanner(signatures)
+        _default_scanners[key] = scanner
+    return scanner
+
+
+def scan_image(data, names=None, start=0, end=None, cancel=None):
+    """Stream SignatureHit tuples for the named firmware markers"""
+    return get_scanner(names).scan(data, start, end, cancel)
+
+
+def read_fit_pointer(data):
+    """Return the image offset of the FIT table, or None
+    
+    The FIT pointer sits at physical address 0xFFFFFFC0, i.e. 0x40 bytes
+    before the end of the image.
+    """
+    view = data.view() if hasattr(data, "view") else memoryview(data)
+    if len(view) < 0x40:
+        return None
+    pointer = struct.unpack_from("<Q", view, len(view) - 0x40)[0]
+    if pointer in (0, 0xFFFFFFFFFFFFFFFF):
+        return None
+    offset = len(view) - (0x100000000 - (pointer & 0xFFFFFFFF))
+    if not 0 <= offset < len(view) - 8:
+        return None
+    if bytes(view[offset:offset + 8]) != FIRMWARE_SIGNATURES["FIT"]:
+        return None
+    return offset
+
+
+def summarize_hits(data, names=None, start=0, end=None, max_offsets=3, cancel=None):
+    """Return console lines summarising where each marker was found"""
+    index = get_scanner(names).scan_all(data, start, end, cancel)
+    lines = []
+    for name, offsets in index.items():
+        label = _marker_label(name)
+        if not offsets:
+            lines.append(f"{label}: not found")
+            continue
+        shown = ", ".join(f"0x{offset:X}" for offset in offsets[:max_offsets])
+        more = f" (+{len(offsets) - max_offsets} more)" if len(offsets) > max_offsets else ""
+        lines.append(f"{label}: {len(offsets)} hit(s) at {shown}{more}")
+    return lines
+
+
+def _marker_label(name):
+    """Return the printable signature for a marker, falling back to its name"""
+    signature = FIRMWARE_SIGNATURES.get(name, b"")
+    if signature and all(0x20 <= b < 0x7F for b in signature):
+        return signature.decode("ascii").strip()
+    return name
@@ -0,0 +1,216 @@
+"""
+Shared task engine: bounded worker pool, cancellation tokens and progress
+"""
+
+import os
+import sys
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from constants.app_config import AppConfig
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task (or an engine it calls) once it was cancelled"""
+
+
+class CancelToken(threading.Event):
+    """Event a task's engines poll between chunks
+    
+    Engines in functions/ take an optional cancel argument (any Event)
+    and call raise_if_cancelled(cancel) once per chunk of CPU or I/O.
+    on_cancel hooks run once, on the thread that cancels, for work that
+    cannot poll (a blocked pipe, a child process).
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.hooks = []
+        self.hooks_lock = threading.Lock()
+    
+    def cancel(self):
+        with self.hooks_lock:
+            if self.is_set():
+                return
+            self.set()
+            hooks, self.hooks = self.hooks, []
+        for hook in hooks:
+            _run_hook(hook)
+    
+    def on_cancel(self, hook):
+        """Call hook() when the token is cancelled (right away if it already is)"""
+        with self.hooks_lock:
+            if not self.is_set():
+                self.hooks.append(hook)
+                return
+        _run_hook(hook)
+    
+    def check(self):
+        if self.is_set():
+            raise TaskCancelled()
+
+
+def raise_if_cancelled(cancel):
+    """Raise TaskCancelled when the optional cancel token is set"""
+    if cancel is not None and cancel.is_set():
+        raise TaskCancelled()
+
+
+def _run_hook(hook):
+    try:
+        hook()
+    except Exception:
+        traceback.print_exc(file=sys.stderr)
+
+
+def _call(callback, *args):
+    callback(*args)
+
+
+class Task:
+    """One submitted job: its cancel token, progress reporting and cleanup hooks"""
+    
+    def __init__(self, name, dispatch=None, on_progress=None):
+        self.name = name
+        self.token = CancelToken()
+        self.dispatch = dispatch or _call
+        self.on_progress = on_progress
+        self.cleanups = []
+        self.future = None
+    
+    @property
+    def cancelled(self):
+        return self.token.is_set()
+    
+    @property
+    def done(self):
+        return self.future is not None and self.future.done()
+    
+    def cancel(self):
+        """Ask the task to stop; engines notice within one chunk"""
+        self.token.cancel()
+    
+    def check(self):
+        """Raise TaskCancelled if the task was cancelled"""
+        self.token.check()
+    
+    def report(self, *values):
+        """Send progress to on_progress(task, *values); dropped once cancelled"""
+        if self.on_progress and not self.cancelled:
+            self.dispatch(self.on_progress, self, *values)
+    
+    def add_cleanup(self, hook):
+        """Run hook() on the worker when the task ends, however it ends"""
+        self.cleanups.append(hook)
+    
+    def run_in_process(self, fn, *args, **kwargs):
+        """Run CPU-heavy fn(*args, cancel=..., **kwargs) in a worker process
+        
+        See ProcessBackend.run; BiosImage arguments are re-mapped in the
+        worker instead of being pickled.
+        """
+        from functions.process_pool import get_process_backend
+        return get_process_backend().run(fn, *args, cancel=self.token, **kwargs)
+
+
+class TaskEngine:
+    """Runs tasks on one bounded worker pool
+    
+    fn(task, *args) runs on a worker and passes task.token to the engines
+    it calls. Progress and the final on_done(task, result, error) go
+    through dispatch: the GUI passes post_to_ui so they run on the Tk
+    thread, the command line leaves it unset and gets direct calls.
+    A cancelled task finishes with error set to TaskCancelled.
+    """
+    
+    def __init__(self, max_workers=None):
+        self.max_workers = max(1, max_workers or AppConfig.TASK_MAX_WORKERS or os.cpu_count() or 1)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="task")
+    
+    def submit(self, fn, *args, name=None, on_progress=None, on_done=None, cleanup=None, dispatch=None):
+        """Queue fn(task, *args); returns the Task"""
+        task = Task(name or getattr(fn, "__name__", "task"), dispatch, on_progress)
+        if cleanup:
+            task.add_cleanup(cleanup)
+        task.future = self.executor.submit(self._run, task, fn, args, on_done)
+        return task
+    
+    def _run(self, task, fn, args, on_done):
+        result = error = None
+        try:
+            task.check()
+            result = fn(task, *args)
+        except Exception as e:
+            error = e
+        finally:
+            for hook in reversed(task.cleanups):
+                _run_hook(hook)
+        if task.cancelled and error is None:
+            result, error = None, TaskCancelled()
+        if on_done:
+            task.dispatch(on_done, task, result, error)
+        return result
+    
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class TaskSlot:
+    """The single current task of a panel
+    
+    Starting a task cancels the one before it, and callbacks of a task
+    that was cancelled or replaced are dropped, so late results never
+    reach the panel. Callbacks get the values without the task:
+    on_progress(*values) and on_done(result, error).
+    """
+    
+    def __init__(self, dispatch=None, engine=None):
+        self.dispatch = dispatch
+        self.engine = engine
+        self.current = None
+    
+    @property
+    def is_running(self):
+        return self.current is not None and not self.current.done
+    
+    def start(self, fn, *args, name=None, on_progress=None, on_done=None, cleanup=None):
+        """Cancel the current task and submit fn(task, *args) in its place"""
+        self.cancel()
+        engine = self.engine or get_task_engine()
+        self.current = engine.submit(
+            fn, *args, name=name, cleanup=cleanup, dispatch=self.dispatch,
+            on_progress=self._guard(on_progress), on_done=self._guard(on_done, finished=True)
+        )
+        return self.current
+    
+    def cancel(self):
+        """Cancel the current task, if any"""
+        if self.current is not None:
+            self.current.cancel()
+            self.current = None
+    
+    def _guard(self, callback, finished=False):
+        if callback is None:
+            return None
+        
+        def guarded(task, *values):
+            if task is not self.current or task.cancelled:
+                return
+            if finished:
+                self.current = None
+            callback(*values)
+        return guarded
+
+
+_default_engine = None
+_default_engine_lock = threading.Lock()
+
+
+def get_task_engine():
+    """Return the process-wide task engine"""
+    global _default_engine
+    with _default_engine_lock:
+        if _default_engine is None:
+            _default_engine = TaskEngine()
+        return _default_engine
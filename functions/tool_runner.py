@@ -0,0 +1,236 @@
+"""
+Streaming runner for external command-line firmware tools (ME Analyzer, UEFIExtract, flashrom)
+"""
+
+import codecs
+import locale
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+
+from constants.app_config import AppConfig
+from functions.task_engine import TaskCancelled
+
+# Bytes per pipe read, and reads buffered before the tool is made to wait
+READ_CHUNK = 64 * 1024
+READ_QUEUE_CHUNKS = 16
+# Seconds between SIGTERM and SIGKILL when a tool is stopped
+KILL_GRACE_SECONDS = 2.0
+
+ToolResult = namedtuple("ToolResult", "returncode line_count elapsed tail")
+
+
+class ToolError(Exception):
+    """An external tool could not be started or did not finish"""
+
+
+class ToolTimeout(ToolError):
+    """The tool ran (or stayed silent) longer than allowed and was killed"""
+
+
+def find_tool(names):
+    """Return the argv prefix for the first tool found, or None
+    
+    TOOLS_DIR is searched before PATH; Python scripts run with the
+    current interpreter.
+    """
+    search = os.pathsep.join([AppConfig.TOOLS_DIR, os.environ.get("PATH", "")])
+    for name in names:
+        path = shutil.which(name, path=search)
+        if path:
+            return [sys.executable, path] if path.lower().endswith(".py") else [path]
+    return None
+
+
+class OutputChannel:
+    """Bounded hand-off of output lines from a worker to the Tk thread
+    
+    put() blocks while max_lines are waiting, which stops the runner
+    reading the pipe, which in turn makes the tool wait: output is
+    throttled to what the console can show. If nobody takes lines for
+    stall_seconds (the window is gone), put() drops the oldest instead,
+    so a worker can never hang on a dead consumer.
+    """
+    
+    def __init__(self, max_lines=None, stall_seconds=5.0):
+        self.max_lines = max_lines or AppConfig.TOOL_MAX_PENDING_LINES
+        self.stall_seconds = stall_seconds
+        self.lines = deque()
+        self.dropped = 0
+        self.condition = threading.Condition()
+    
+    def put(self, lines, cancel=None):
+        with self.condition:
+            deadline = time.monotonic() + self.stall_seconds
+            while self.lines and len(self.lines) + len(lines) > self.max_lines:
+                if cancel is not None and cancel.is_set():
+                    raise TaskCancelled()
+                if time.monotonic() >= deadline:
+                    break
+                self.condition.wait(0.1)
+            self.lines.extend(lines)
+            excess = len(self.lines) - self.max_lines
+            for _ in range(max(0, excess)):
+                self.lines.popleft()
+            self.dropped += max(0, excess)
+    
+    def take(self):
+        """Return and remove every waiting line"""
+        with self.condition:
+            lines = list(self.lines)
+            self.lines.clear()
+            self.condition.notify_all()
+        return lines
+
+
+def _read_pipe(pipe, chunks):
+    try:
+        while True:
+            data = pipe.read(READ_CHUNK)
+            if not data:
+                break
+            chunks.put(data)  # Blocks while the consumer is behind
+    except (OSError, ValueError):
+        pass
+    finally:
+        chunks.put(None)
+
+
+def _popen_kwargs():
+    # Own process group / session, so cancelling also stops the tool's children
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def _kill_group(process):
+    """Stop a tool and everything it started"""
+    try:
+        if os.name == "nt":
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            os.killpg(process.pid, signal.SIGTERM)
+            try:
+                process.wait(KILL_GRACE_SECONDS)
+            except subprocess.TimeoutExpired:
+                os.killpg(process.pid, signal.SIGKILL)
+    except OSError:
+        pass  # Already gone
+    if process.poll() is None:
+        process.kill()
+    process.wait()
+
+
+class _LineSplitter:
+    """Turns byte chunks into decoded lines of bounded length
+    
+    CRLF and LF end a line; text before a bare CR is dropped (progress
+    bars redraw the same line), and lines longer than max_chars are cut.
+    """
+    
+    def __init__(self, encoding, max_chars):
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self.max_chars = max_chars
+        self.partial = ""
+    
+    def feed(self, data, final=False):
+        text = self.partial + self.decoder.decode(data, final)
+        if text.endswith("\r") and not final:
+            text, self.partial = text[:-1], "\r"  # Might be half of a CRLF
+        else:
+            self.partial = ""
+        lines = text.replace("\r\n", "\n").split("\n")
+        tail = lines.pop()
+        if final and tail:
+            lines.append(tail)
+        else:
+            self.partial = tail + self.partial
+        result = [line.rsplit("\r", 1)[-1][:self.max_chars] for line in lines]
+        if len(self.partial) > self.max_chars:
+            result.append(self.partial[:self.max_chars])
+            self.partial = ""
+        return result
+
+
+def run_tool(args, on_lines=None, cancel=None, timeout=None, idle_timeout=None, cwd=None, encoding=None):
+    """Run an external tool and stream its output; returns a ToolResult
+    
+    stdout and stderr are merged and read on a helper thread into a
+    small bounded queue; complete lines reach on_lines(lines) on the
+    calling thread in batches of at most TOOL_BATCH_LINES, at least
+    every TOOL_BATCH_SECONDS. Only the last TOOL_TAIL_LINES are kept, so
+    memory stays flat however much the tool prints. On cancel, timeout
+    or idle_timeout (seconds without output) the whole process group is
+    killed and TaskCancelled or ToolTimeout is raised. A non-zero exit
+    code is returned, not raised.
+    """
+    timeout = timeout if timeout is not None else AppConfig.TOOL_TIMEOUT_SECONDS
+    idle_timeout = idle_timeout if idle_timeout is not None else AppConfig.TOOL_IDLE_TIMEOUT_SECONDS
+    splitter = _LineSplitter(encoding or locale.getpreferredencoding(False), AppConfig.TOOL_MAX_LINE_CHARS)
+    tail = deque(maxlen=AppConfig.TOOL_TAIL_LINES)
+    batch = []
+    line_count = 0
+    
+    try:
+        process = subprocess.Popen(
+            args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            bufsize=0, cwd=cwd, **_popen_kwargs()
+        )
+    except OSError as e:
+        raise ToolError(f"Cannot start {os.path.basename(str(args[0]))}: {e}") from None
+    
+    chunks = queue.Queue(READ_QUEUE_CHUNKS)
+    reader = threading.Thread(target=_read_pipe, args=(process.stdout, chunks), name="tool-output", daemon=True)
+    reader.start()
+    
+    started = last_output = last_flush = time.monotonic()
+    try:
+        while True:
+            if cancel is not None and cancel.is_set():
+                raise TaskCancelled()
+            now = time.monotonic()
+            if timeout and now - started > timeout:
+                raise ToolTimeout(f"Timed out after {timeout:g} s")
+            if idle_timeout and now - last_output > idle_timeout:
+                raise ToolTimeout(f"No output for {idle_timeout:g} s")
+            
+            try:
+                data = chunks.get(timeout=AppConfig.TOOL_BATCH_SECONDS)
+            except queue.Empty:
+                data = b""
+            else:
+                last_output = time.monotonic()
+            lines = splitter.feed(data or b"", final=data is None)
+            batch.extend(lines)
+            tail.extend(lines)
+            line_count += len(lines)
+            
+            if batch and (data is None or len(batch) >= AppConfig.TOOL_BATCH_LINES
+                          or time.monotonic() - last_flush >= AppConfig.TOOL_BATCH_SECONDS):
+                if on_lines:
+                    on_lines(batch)
+                batch = []
+                last_flush = time.monotonic()
+            if data is None:
+                break
+        returncode = process.wait()
+    except BaseException:
+        _kill_group(process)
+        raise
+    finally:
+        # Unblock the reader (it may be waiting on a full queue) and let it see EOF
+        deadline = time.monotonic() + KILL_GRACE_SECONDS
+        while reader.is_alive() and time.monotonic() < deadline:
+            try:
+                chunks.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        process.stdout.close()
+    return ToolResult(returncode, line_count, time.monotonic() - started, list(tail))
@@ -0,0 +1,282 @@
+"""
+EFI 1.1 / Tiano decompression for UEFI compressed sections
+
+Pure Python port of the EDK II UefiDecompressLib algorithm (LZ77 with
+static Huffman blocks). The two formats only differ in the width of the
+position-set length field.
+"""
+
+import struct
+
+EFI_VERSION = 1
+TIANO_VERSION = 2
+
+BITBUFSIZ = 32
+MAXMATCH = 256
+THRESHOLD = 3
+CODE_BIT = 16
+CBIT = 9
+TBIT = 5
+MAXPBIT = 5
+NC = 0xFF + MAXMATCH + 2 - THRESHOLD
+NT = CODE_BIT + 3
+MAXNP = (1 << MAXPBIT) - 1
+NPT = max(NT, MAXNP)
+TREE_SIZE = 2 * NC - 1
+
+_MASK32 = 0xFFFFFFFF
+
+
+class EfiDecompressError(Exception):
+    """Raised when a compressed stream is corrupt"""
+
+
+class _Decoder:
+    """Decoder state (one instance per stream)"""
+    
+    def __init__(self, data, version):
+        if len(data) < 8:
+            raise EfiDecompressError("Compressed data is shorter than its header")
+        self.comp_size, self.orig_size = struct.unpack_from("<II", data, 0)
+        if self.comp_size + 8 > len(data):
+            raise EfiDecompressError("Compressed size exceeds the section")
+        
+        self.src = bytes(data[8:8 + self.comp_size])
+        self.in_pos = 0
+        self.remaining = self.comp_size
+        self.p_bit = 4 if version == EFI_VERSION else 5
+        
+        self.bit_buf = 0
+        self.sub_bit_buf = 0
+        self.bit_count = 0
+        self.block_size = 0
+        
+        self.left = [0] * TREE_SIZE
+        self.right = [0] * TREE_SIZE
+        self.c_len = [0] * NC
+        self.pt_len = [0] * NPT
+        self.c_table = [0] * 4096
+        self.pt_table = [0] * 256
+    
+    def fill_buf(self, bits):
+        self.bit_buf = (self.bit_buf << bits) & _MASK32
+        while bits > self.bit_count:
+            bits -= self.bit_count
+            self.bit_buf |= (self.sub_bit_buf << bits) & _MASK32
+            if self.remaining > 0:
+                self.remaining -= 1
+                self.sub_bit_buf = self.src[self.in_pos]
+                self.in_pos += 1
+            else:
+                self.sub_bit_buf = 0
+            self.bit_count = 8
+        self.bit_count -= bits
+        self.bit_buf |= self.sub_bit_buf >> self.bit_count
+    
+    def get_bits(self, bits):
+        value = self.bit_buf >> (BITBUFSIZ - bits)
+        self.fill_buf(bits)
+        return value
+    
+    def make_table(self, num_chars, bit_len, table_bits, table):
+        count = [0] * 17
+        weight = [0] * 17
+        start = [0] * 18
+        
+        for i in range(num_chars):
+            if bit_len[i] > 16:
+                raise EfiDecompressError("Bad Huffman code length")
+            count[bit_len[i]] += 1
+        
+        for i in range(1, 17):
+            start[i + 1] = (start[i] + (count[i] << (16 - i))) & 0xFFFF
+        if start[17] != 0:
+            raise EfiDecompressError("Bad Huffman table")
+        
+        ju_bits = 16 - table_bits
+        for i in range(1, table_bits + 1):
+            start[i] >>= ju_bits
+            weight[i] = 1 << (table_bits - i)
+        for i in range(table_bits + 1, 17):
+            weight[i] = 1 << (16 - i)
+        
+        index = start[table_bits + 1] >> ju_bits
+        if index != 0:
+            for i in range(index, 1 << table_bits):
+                table[i] = 0
+        
+        avail = num_chars
+        mask = 1 << (15 - table_bits)
+        max_table_length = 1 << table_bits
+        
+        for char in range(num_chars):
+            length = bit_len[char]
+            if length == 0 or length >= 17:
+                continue
+            next_code = start[length] + weight[length]
+            if length <= table_bits:
+                if start[length] >= next_code or next_code > max_table_length:
+                    raise EfiDecompressError("Bad Huffman table")
+                for i in range(start[length], next_code):
+                    table[i] = char
+            else:
+                code = start[length]
+                # (array, index) stands in for the C pointer walk
+                target, slot = table, code >> ju_bits
+                for _ in range(length - table_bits):
+                    if target[slot] == 0 and avail < TREE_SIZE:
+                        self.right[avail] = self.left[avail] = 0
+                        target[slot] = avail
+                        avail += 1
+                    if target[slot] < TREE_SIZE:
+                        node = target[slot]
+                        target, slot = (self.right, node) if code & mask else (self.left, node)
+                    code = (code << 1) & 0xFFFF
+                target[slot] = char
+            start[length] = next_code
+    
+    def read_pt_len(self, nn, nbit, special):
+        number = self.get_bits(nbit)
+        if number == 0:
+            char = self.get_bits(nbit)
+            for i in range(256):
+                self.pt_table[i] = char
+            for i in range(nn):
+                self.pt_len[i] = 0
+            return
+        
+        index = 0
+        while index < number and index < NPT:
+            char = self.bit_buf >> (BITBUFSIZ - 3)
+            if char == 7:
+                mask = 1 << (BITBUFSIZ - 1 - 3)
+                while mask & self.bit_buf:
+                    mask >>= 1
+                    char += 1
+            self.fill_buf(3 if char < 7 else char - 3)
+            self.pt_len[index] = char
+            index += 1
+            if index == special:
+                zeros = self.get_bits(2)
+                while zeros > 0 and index < NPT:
+                    self.pt_len[index] = 0
+                    index += 1
+                    zeros -= 1
+        
+        while index < nn and index < NPT:
+            self.pt_len[index] = 0
+            index += 1
+        self.make_table(nn, self.pt_len, 8, self.pt_table)
+    
+    def read_c_len(self):
+        number = self.get_bits(CBIT)
+        if number == 0:
+            char = self.get_bits(CBIT)
+            for i in range(NC):
+                self.c_len[i] = 0
+            for i in range(4096):
+                self.c_table[i] = char
+            return
+        
+        index = 0
+        while index < number and index < NC:
+            char = self.pt_table[self.bit_buf >> (BITBUFSIZ - 8)]
+            if char >= NT:
+                mask = 1 << (BITBUFSIZ - 1 - 8)
+                while char >= NT:
+                    char = self.right[char] if mask & self.bit_buf else self.left[char]
+                    mask >>= 1
+            self.fill_buf(self.pt_len[char])
+            if char <= 2:
+                if char == 0:
+                    zeros = 1
+                elif char == 1:
+                    zeros = self.get_bits(4) + 3
+                else:
+                    zeros = self.get_bits(CBIT) + 20
+                while zeros > 0 and index < NC:
+                    self.c_len[index] = 0
+                    index += 1
+                    zeros -= 1
+            else:
+                self.c_len[index] = char - 2
+                index += 1
+        
+        for i in range(index, NC):
+            self.c_len[i] = 0
+        self.make_table(NC, self.c_len, 12, self.c_table)
+    
+    def decode_c(self):
+        if self.block_size == 0:
+            self.block_size = self.get_bits(16)
+            self.read_pt_len(NT, TBIT, 3)
+            self.read_c_len()
+            self.read_pt_len(MAXNP, self.p_bit, -1)
+        self.block_size -= 1
+        
+        index = self.c_table[self.bit_buf >> (BITBUFSIZ - 12)]
+        if index >= NC:
+            mask = 1 << (BITBUFSIZ - 1 - 12)
+            while index >= NC:
+                index = self.right[index] if self.bit_buf & mask else self.left[index]
+                mask >>= 1
+        self.fill_buf(self.c_len[index])
+        return index
+    
+    def decode_p(self):
+        value = self.pt_table[self.bit_buf >> (BITBUFSIZ - 8)]
+        if value >= MAXNP:
+            mask = 1 << (BITBUFSIZ - 1 - 8)
+            while value >= MAXNP:
+                value = self.right[value] if self.bit_buf & mask else self.left[value]
+                mask >>= 1
+        self.fill_buf(self.pt_len[value])
+        if value > 1:
+            return (1 << (value - 1)) + self.get_bits(value - 1)
+        return value
+    
+    def decode(self):
+        out = bytearray(self.orig_size)
+        out_pos = 0
+        orig_size = self.orig_size
+        self.fill_buf(BITBUFSIZ)
+        
+        while out_pos < orig_size:
+            char = self.decode_c()
+            if char < 256:
+                out[out_pos] = char
+                out_pos += 1
+                continue
+            
+            length = char - (256 - THRESHOLD)
+            source = out_pos - self.decode_p() - 1
+            if source < 0:
+                raise EfiDecompressError("Match points before the start of the output")
+            length = min(length, orig_size - out_pos)
+            if source + length <= out_pos:
+                out[out_pos:out_pos + length] = out[source:source + length]
+            else:
+                # Overlapping match repeats the pattern byte by byte
+                for i in range(length):
+                    out[out_pos + i] = out[source + i]
+            out_pos += length
+        return bytes(out)
+
+
+def decompressed_size(data):
+    """Return the original size recorded in a compressed stream header"""
+    return struct.unpack_from("<I", data, 4)[0]
+
+
+def efi_decompress(data, version=EFI_VERSION):
+    """Decompress an EFI 1.1 (version 1) or Tiano (version 2) stream"""
+    decoder = _Decoder(data, version)
+    try:
+        return decoder.decode()
+    except IndexError:
+        raise EfiDecompressError("Corrupt Huffman tree") from None
+
+
+def tiano_decompress(data):
+    """Decompress a Tiano custom-compressed stream"""
+    return efi_decompress(data, TIANO_VERSION)
@@ -0,0 +1,542 @@
+"""
+Lazy UEFI firmware volume / FFS file / section tree
+"""
+
+import lzma
+import struct
+import uuid
+from collections import deque
+
+from functions.flash_descriptor import REGION_BIOS, FlashDescriptorError, get_flash_layout
+from functions.section_cache import get_section_cache
+from functions.signature_scanner import scan_image
+from functions.task_engine import raise_if_cancelled
+from functions.uefi_compression import EfiDecompressError, efi_decompress, tiano_decompress
+
+FV_SIGNATURE_OFFSET = 0x28
+FV_HEADER_MIN_SIZE = 0x48
+FFS_HEADER_SIZE = 0x18
+FFS_HEADER2_SIZE = 0x20
+# EFI_GUID_DEFINED_SECTION after the common header: SectionDefinitionGuid, DataOffset, Attributes
+GUID_DEFINED_HEADER_SIZE = 0x14
+
+EFI_FVB2_ERASE_POLARITY = 0x00000800
+FFS_ATTRIB_LARGE_FILE = 0x01
+EFI_GUIDED_SECTION_PROCESSING_REQUIRED = 0x01
+
+# FFS file types
+FFS_TYPE_RAW = 0x01
+FFS_TYPE_FFS_PAD = 0xF0
+
+FFS_TYPE_NAMES = {
+    0x01: "RAW",
+    0x02: "FREEFORM",
+    0x03: "SEC_CORE",
+    0x04: "PEI_CORE",
+    0x05: "DXE_CORE",
+    0x06: "PEIM",
+    0x07: "DRIVER",
+    0x08: "COMBINED_PEIM_DRIVER",
+    0x09: "APPLICATION",
+    0x0A: "MM",
+    0x0B: "FV_IMAGE",
+    0x0C: "COMBINED_MM_DXE",
+    0x0D: "MM_CORE",
+    0x0E: "MM_STANDALONE",
+    0x0F: "MM_CORE_STANDALONE",
+    0xF0: "PAD",
+}
+
+# Section types
+SECTION_COMPRESSION = 0x01
+SECTION_GUID_DEFINED = 0x02
+SECTION_USER_INTERFACE = 0x15
+SECTION_FIRMWARE_VOLUME_IMAGE = 0x17
+
+SECTION_TYPE_NAMES = {
+    0x01: "COMPRESSION",
+    0x02: "GUID_DEFINED",
+    0x03: "DISPOSABLE",
+    0x10: "PE32",
+    0x11: "PIC",
+    0x12: "TE",
+    0x13: "DXE_DEPEX",
+    0x14: "VERSION",
+    0x15: "USER_INTERFACE",
+    0x16: "COMPATIBILITY16",
+    0x17: "FV_IMAGE",
+    0x18: "FREEFORM_SUBTYPE_GUID",
+    0x19: "RAW",
+    0x1B: "PEI_DEPEX",
+    0x1C: "MM_DEPEX",
+}
+
+# EFI_COMPRESSION_SECTION compression types
+COMPRESSION_NONE = 0x00
+COMPRESSION_STANDARD = 0x01
+
+LZMA_CUSTOM_DECOMPRESS_GUID = "EE4E5898-3914-4259-9D6E-DC7BD79403CF"
+TIANO_CUSTOM_DECOMPRESS_GUID = "A31280AD-481E-41B6-95E8-127F4C984779"
+CRC32_GUIDED_SECTION_GUID = "FC1BCDB0-7D31-49AA-936A-A4600D9DD083"
+
+FFS2_GUID = "8C8CE578-8A3D-4F1C-9935-896185C32DD3"
+FFS3_GUID = "5473C07A-3DCB-4DCA-BD6F-1E9689E7349A"
+
+
+class UEFIParseError(Exception):
+    """Raised when a volume, file or section cannot be decoded"""
+
+
+def format_guid(raw):
+    """Format a 16-byte EFI_GUID as a registry-style string"""
+    return str(uuid.UUID(bytes_le=bytes(raw))).upper()
+
+
+def _align(value, alignment):
+    return (value + alignment - 1) & ~(alignment - 1)
+
+
+def _uint24(data, offset):
+    return data[offset] | (data[offset + 1] << 8) | (data[offset + 2] << 16)
+
+
+class FirmwareVolume:
+    """A firmware volume; its FFS files are decoded on first access"""
+    
+    __slots__ = (
+        "data", "offset", "length", "header_length", "fs_guid", "attributes",
+        "revision", "ext_header_offset", "checksum_valid", "parent", "image_key", "error", "_files",
+    )
+    
+    def __init__(self, data, offset, parent=None, image_key=None):
+        """data is a memoryview starting at the volume header
+        
+        image_key (the image's content hash) enables the shared
+        decompressed-section cache for everything below this volume.
+        """
+        if len(data) < FV_HEADER_MIN_SIZE or bytes(data[FV_SIGNATURE_OFFSET:FV_SIGNATURE_OFFSET + 4]) != b"_FVH":
+            raise UEFIParseError(f"No firmware volume header at 0x{offset:X}")
+        
+        fs_guid = data[0x10:0x20]
+        length, _, attributes, header_length, _, ext_header_offset, _, revision = struct.unpack_from(
+            "<QIIHHHBB", data, 0x20
+        )
+        if length < FV_HEADER_MIN_SIZE or length > len(data) or header_length < FV_HEADER_MIN_SIZE or header_length > length:
+            raise UEFIParseError(f"Invalid firmware volume length at 0x{offset:X}")
+        
+        self.data = data[:length]
+        self.offset = offset
+        self.length = length
+        self.header_length = header_length
+        self.fs_guid = format_guid(fs_guid)
+        self.attributes = attributes
+        self.revision = revision
+        self.ext_header_offset = ext_header_offset
+        self.checksum_valid = sum(struct.unpack_from(f"<{header_length // 2}H", data, 0)) & 0xFFFF == 0
+        self.parent = parent
+        self.image_key = image_key
+        self.error = None
+        self._files = None
+    
+    @property
+    def erase_byte(self):
+        return 0xFF if self.attributes & EFI_FVB2_ERASE_POLARITY else 0x00
+    
+    @property
+    def is_ffs(self):
+        return self.fs_guid in (FFS2_GUID, FFS3_GUID)
+    
+    @property
+    def location(self):
+        """Stable position string, also valid for volumes in decompressed data"""
+        if self.offset is not None:
+            return f"{self.offset:X}"
+        return f"{self.parent.location}/fv"
+    
+    @property
+    def files(self):
+        """FFS files in this volume (headers only are decoded)
+        
+        A volume whose extended header points outside it has no files;
+        the reason is left in error.
+        """
+        if self._files is None:
+            self._files = list(self._iter_files()) if self.is_ffs else []
+        return self._files
+    
+    def _iter_files(self):
+        position = self.header_length
+        if self.ext_header_offset:
+            # EFI_FIRMWARE_VOLUME_EXT_HEADER is {FvName guid, ExtHeaderSize u32}
+            if self.ext_header_offset + 0x14 > self.length:
+                self.error = f"Extended header offset 0x{self.ext_header_offset:X} is outside the volume"
+                return
+            ext_size = struct.unpack_from("<I", self.data, self.ext_header_offset + 0x10)[0]
+            position = self.ext_header_offset + ext_size
+            if ext_size < 0x14 or position > self.length:
+                self.error = f"Invalid extended header size 0x{ext_size:X}"
+                return
+        position = _align(position, 8)
+        
+        empty_header = bytes([self.erase_byte]) * FFS_HEADER_SIZE
+        while position + FFS_HEADER_SIZE <= self.length:
+            if self.data[position:position + FFS_HEADER_SIZE] == empty_header:
+                break  # Free space up to the end of the volume
+            ffs_file = FfsFile(self, position)
+            if ffs_file.size < ffs_file.header_size or position + ffs_file.size > self.length:
+                break  # Corrupted file header, stop rather than decode garbage
+            yield ffs_file
+            position = _align(position + ffs_file.size, 8)
+    
+    def __repr__(self):
+        return f"<FirmwareVolume {self.location} {self.fs_guid} 0x{self.length:X} bytes>"
+
+
+class FfsFile:
+    """An FFS file; its sections are decoded on first access"""
+    
+    __slots__ = ("volume", "offset", "size", "header_size", "guid", "type", "attributes", "state", "_sections")
+    
+    def __init__(self, volume, offset):
+        data = volume.data
+        self.volume = volume
+        self.offset = offset
+        self.guid = format_guid(data[offset:offset + 16])
+        self.type = data[offset + 0x12]
+        self.attributes = data[offset + 0x13]
+        self.size = _uint24(data, offset + 0x14)
+        self.state = data[offset + 0x17]
+        self.header_size = FFS_HEADER_SIZE
+        if self.attributes & FFS_ATTRIB_LARGE_FILE and offset + FFS_HEADER2_SIZE <= volume.length:
+            self.size = struct.unpack_from("<Q", data, offset + FFS_HEADER_SIZE)[0]
+            self.header_size = FFS_HEADER2_SIZE
+        self._sections = None
+    
+    @property
+    def absolute_offset(self):
+        """Offset in the image, or None when the file lives in decompressed data"""
+        if self.volume.offset is None:
+            return None
+        return self.volume.offset + self.offset
+    
+    @property
+    def image_key(self):
+        return self.volume.image_key
+    
+    @property
+    def location(self):
+        if self.absolute_offset is not None:
+            return f"{self.absolute_offset:X}"
+        return f"{self.volume.location}+{self.offset:X}"
+    
+    @property
+    def type_name(self):
+        return FFS_TYPE_NAMES.get(self.type, f"0x{self.type:02X}")
+    
+    @property
+    def body(self):
+        return self.volume.data[self.offset + self.header_size:self.offset + self.size]
+    
+    @property
+    def sections(self):
+        """Top-level sections of the file (headers only are decoded)"""
+        if self._sections is None:
+            if self.type in (FFS_TYPE_RAW, FFS_TYPE_FFS_PAD):
+                self._sections = []
+            else:
+                self._sections = parse_sections(self.body, self, self._body_absolute_offset())
+        return self._sections
+    
+    @property
+    def name(self):
+        """UI name from a top-level USER_INTERFACE section, without decompressing"""
+        for section in self.sections:
+            if section.type == SECTION_USER_INTERFACE:
+                return section.user_interface_name()
+        return None
+    
+    def _body_absolute_offset(self):
+        base = self.absolute_offset
+        return None if base is None else base + self.header_size
+    
+    def __repr__(self):
+        return f"<FfsFile {self.guid} {self.type_name} 0x{self.size:X} bytes>"
+
+
+class Section:
+    """A file section; encapsulated children are decoded on first access"""
+    
+    __slots__ = (
+        "data", "offset", "size", "header_size", "type", "owner", "absolute_offset",
+        "guid", "guid_attributes", "_children", "error",
+    )
+    
+    def __init__(self, data, offset, owner, absolute_offset=None):
+        """data is the buffer holding the section list, offset its position
+        
+        Raises UEFIParseError when the header runs past the end of data.
+        """
+        self.data = data
+        self.offset = offset
+        self.owner = owner
+        self.absolute_offset = absolute_offset
+        self.size = _uint24(data, offset)
+        self.type = data[offset + 3]
+        self.header_size = 4
+        if self.size == 0xFFFFFF:
+            if offset + 8 > len(data):
+                raise UEFIParseError(f"Truncated section header at 0x{offset:X}")
+            self.size = struct.unpack_from("<I", data, offset + 4)[0]
+            self.header_size = 8
+        self.guid = None
+        self.guid_attributes = 0
+        self._children = None
+        self.error = None
+        
+        if self.type == SECTION_GUID_DEFINED:
+            header = offset + self.header_size
+            if header + GUID_DEFINED_HEADER_SIZE > len(data):
+                raise UEFIParseError(f"Truncated GUID-defined section header at 0x{offset:X}")
+            self.guid = format_guid(data[header:header + 16])
+            data_offset, self.guid_attributes = struct.unpack_from("<HH", data, header + 16)
+            if data_offset < self.header_size + GUID_DEFINED_HEADER_SIZE:
+                raise UEFIParseError(f"Invalid GUID-defined section data offset at 0x{offset:X}")
+            self.header_size = data_offset
+    
+    @property
+    def image_key(self):
+        return self.owner.image_key
+    
+    @property
+    def location(self):
+        if self.absolute_offset is not None:
+            return f"{self.absolute_offset:X}"
+        return f"{self.owner.location}+{self.offset:X}"
+    
+    @property
+    def type_name(self):
+        return SECTION_TYPE_NAMES.get(self.type, f"0x{self.type:02X}")
+    
+    @property
+    def body(self):
+        """Section contents after the header (zero-copy)"""
+        return self.data[self.offset + self.header_size:self.offset + self.size]
+    
+    @property
+    def is_encapsulation(self):
+        return self.type in (SECTION_COMPRESSION, SECTION_GUID_DEFINED, SECTION_FIRMWARE_VOLUME_IMAGE)
+    
+    @property
+    def is_compressed(self):
+        if self.type == SECTION_COMPRESSION:
+            return self.compression_type() != COMPRESSION_NONE
+        if self.type == SECTION_GUID_DEFINED:
+            return self.guid in (LZMA_CUSTOM_DECOMPRESS_GUID, TIANO_CUSTOM_DECOMPRESS_GUID)
+        return False
+    
+    def compression_type(self):
+        """Return the EFI_COMPRESSION_SECTION compression type"""
+        # Header is {size[3], type, UncompressedLength u32, CompressionType u8}
+        return self.data[self.offset + self.header_size + 4]
+    
+    def user_interface_name(self):
+        """Decode a USER_INTERFACE section as UTF-16"""
+        return bytes(self.body).decode("utf-16-le", errors="replace").split("\x00", 1)[0]
+    
+    @property
+    def children(self):
+        """Encapsulated sections or volumes; compressed data is inflated here"""
+        if self._children is None:
+            self._children = []
+            try:
+                self._children = self._decode_children()
+            except (UEFIParseError, EfiDecompressError, lzma.LZMAError, struct.error, ValueError) as e:
+                self.error = str(e)
+        return self._children
+    
+    def decompressed_body(self):
+        """Return the inflated payload of an encapsulation section"""
+        return self._payload()[0]
+    
+    def _payload(self):
+        """Return (payload, offset in section) or (payload, None) when inflated"""
+        if self.type == SECTION_COMPRESSION:
+            # EFI_COMPRESSION_SECTION carries 5 more header bytes
+            payload_offset = self.header_size + 5
+            payload = self.data[self.offset + payload_offset:self.offset + self.size]
+            compression = self.compression_type()
+            if compression == COMPRESSION_NONE:
+                return payload, payload_offset
+            if compression == COMPRESSION_STANDARD:
+                return memoryview(self._inflate(decompress_standard, payload)), None
+            raise UEFIParseError(f"Unknown compression type {compression}")
+        if self.type == SECTION_GUID_DEFINED:
+            if self.guid == LZMA_CUSTOM_DECOMPRESS_GUID:
+                return memoryview(self._inflate(decompress_lzma, self.body)), None
+            if self.guid == TIANO_CUSTOM_DECOMPRESS_GUID:
+                return memoryview(self._inflate(tiano_decompress, self.body)), None
+            if not self.guid_attributes & EFI_GUIDED_SECTION_PROCESSING_REQUIRED or self.guid == CRC32_GUIDED_SECTION_GUID:
+                return self.body, self.header_size
+            raise UEFIParseError(f"Unknown GUID-defined section {self.guid}")
+        return self.body, self.header_size
+    
+    def _inflate(self, decompress, payload):
+        """Decompress payload through the shared section cache"""
+        image_key = self.image_key
+        if image_key is None:
+            return decompress(payload)
+        return get_section_cache().get_or_decompress((image_key, self.location), lambda: decompress(payload))
+    
+    def _decode_children(self):
+        if self.type == SECTION_FIRMWARE_VOLUME_IMAGE:
+            body_offset = None if self.absolute_offset is None else self.absolute_offset + self.header_size
+            return [FirmwareVolume(self.body, body_offset, parent=self, image_key=self.image_key)]
+        if self.type not in (SECTION_COMPRESSION, SECTION_GUID_DEFINED):
+            return []
+        
+        payload, payload_offset = self._payload()
+        if payload_offset is None or self.absolute_offset is None:
+            return parse_sections(payload, self, None)
+        # Not compressed: children keep their image offsets
+        return parse_sections(payload, self, self.absolute_offset + payload_offset)
+    
+    def __repr__(self):
+        return f"<Section {self.type_name} 0x{self.size:X} bytes>"
+
+
+def decompress_lzma(data):
+    """Inflate a UEFI LZMA section (LZMA 'alone' format with a 13-byte header)"""
+    return lzma.LZMADecompressor(format=lzma.FORMAT_ALONE).decompress(bytes(data))
+
+
+def decompress_standard(data):
+    """Inflate an EFI_COMPRESSION_SECTION; vendors use both EFI 1.1 and Tiano"""
+    try:
+        return efi_decompress(data)
+    except EfiDecompressError:
+        return tiano_decompress(data)
+
+
+def parse_sections(data, owner, absolute_offset=None):
+    """Decode the section headers in a buffer (4-byte aligned list)"""
+    data = memoryview(data)
+    sections = []
+    position = 0
+    while position + 4 <= len(data):
+        try:
+            section = Section(data, position, owner, None if absolute_offset is None else absolute_offset + position)
+        except UEFIParseError:
+            break  # Truncated header, keep the sections before it
+        if section.size < section.header_size or position + section.size > len(data):
+            break
+        sections.append(section)
+        position = _align(position + section.size, 4)
+    return sections
+
+
+def find_firmware_volumes(image, start=0, end=None, cancel=None):
+    """Return the top-level firmware volumes of a BiosImage
+    
+    Uses the single-pass scanner over the BIOS region (or the whole image
+    when there is no descriptor). Volumes nested in another volume are not
+    returned here; they appear as children of FV_IMAGE sections.
+    """
+    if end is None:
+        end = image.size
+        try:
+            layout = get_flash_layout(image)
+        except FlashDescriptorError:
+            layout = None
+        if layout and layout.has_region(REGION_BIOS):
+            region = layout.region(REGION_BIOS)
+            start, end = region.base, region.limit + 1
+    
+    image_key = image.sha256()
+    volumes = []
+    next_free = start
+    for hit in scan_image(image, ["FVH"], start, end, cancel):
+        fv_offset = hit.offset - FV_SIGNATURE_OFFSET
+        if fv_offset < next_free:
+            continue  # Nested inside a volume we already have
+        try:
+            volume = FirmwareVolume(image.region(fv_offset, end - fv_offset), fv_offset, image_key=image_key)
+        except (UEFIParseError, struct.error):
+            continue
+        volumes.append(volume)
+        next_free = fv_offset + volume.length
+    return volumes
+
+
+def get_firmware_volumes(image, cancel=None):
+    """Return the cached top-level volume list for a BiosImage"""
+    if "firmware_volumes" not in image.cache:
+        image.cache["firmware_volumes"] = find_firmware_volumes(image, cancel=cancel)
+    return image.cache["firmware_volumes"]
+
+
+def iter_modules(volumes, cancel=None):
+    """Yield (ffs_file, leaf_sections) for every file, inflating encapsulations
+    
+    Files inside compressed sections and nested volumes are included;
+    decompression goes through the shared section cache. cancel is
+    checked before each file is inflated.
+    """
+    pending = deque(volumes)
+    while pending:
+        volume = pending.popleft()
+        for ffs_file in volume.files:
+            raise_if_cancelled(cancel)
+            leaves = []
+            queued = deque(ffs_file.sections)
+            while queued:
+                section = queued.popleft()
+                if not section.is_encapsulation:
+                    leaves.append(section)
+                    continue
+                for child in section.children:
+                    if isinstance(child, FirmwareVolume):
+                        pending.append(child)
+                    else:
+                        queued.append(child)
+            yield ffs_file, leaves
+
+
+def describe_module_index(image, cancel=None):
+    """Inflate every compressed section once and return console lines counting the modules
+    
+    Mostly pure-Python decompression; the GUI runs it in a worker process.
+    """
+    volumes = get_firmware_volumes(image, cancel)
+    if not volumes:
+        return ["No UEFI firmware volumes found"]
+    before = get_section_cache().stats()
+    modules = 0
+    for ffs_file, sections in iter_modules(volumes, cancel):
+        if sections:
+            modules += 1
+    after = get_section_cache().stats()
+    inflated = after["misses"] - before["misses"]
+    reused = (after["hits"] + after["disk_hits"]) - (before["hits"] + before["disk_hits"])
+    return [
+        f"Found {modules} UEFI modules in {len(volumes)} firmware volume(s)",
+        f"Compressed sections: {inflated} inflated, {reused} from cache",
+    ]
+
+
+def describe_volumes(volumes, max_files=20):
+    """Return console lines listing volumes and their files"""
+    lines = []
+    for volume in volumes:
+        files = volume.files
+        lines.append(
+            f"FV 0x{volume.offset:X} size 0x{volume.length:X} "
+            f"({len(files)} files){'' if volume.checksum_valid else ' [bad checksum]'}"
+        )
+        if volume.error:
+            lines.append(f"  ⚠️ {volume.error}")
+        for ffs_file in files[:max_files]:
+            name = ffs_file.name or ffs_file.guid
+            lines.append(f"  {ffs_file.type_name:<10} {name}")
+        if len(files) > max_files:
+            lines.append(f"  ... {len(files) - max_files} more files")
+    return lines
@@ -2,8 +2,6 @@
 Unlock specific functions
 """
 
-import tkinter as tk
-from tkinter import messagebox
 
 class UnlockFunctions:
     def __init__(self):
@@ -11,12 +9,15 @@ class UnlockFunctions:
     
     def start_unlock(self):
         """Start unlock process"""
+        from tkinter import messagebox
         messagebox.showinfo("Unlock", "Starting device unlock process...")
     
     def check_lock_status(self):
         """Check device lock status"""
+        from tkinter import messagebox
         messagebox.showinfo("Lock Status", "Checking device lock status...")
     
     def bypass_security(self):
         """Bypass security measures"""
+        from tkinter import messagebox
         messagebox.showwarning("Security Bypass", "Attempting security bypass...")
\ No newline at end of file
@@ -2,8 +2,6 @@
 Utility specific functions
 """
 
-import tkinter as tk
-from tkinter import messagebox
 import platform
 import os
 
@@ -20,12 +18,15 @@ Version: {platform.version()}
 Machine: {platform.machine()}
 Processor: {platform.processor()}
         """
+        from tkinter import messagebox
         messagebox.showinfo("System Information", system_info.strip())
     
     def check_disk_space(self):
         """Check available disk space"""
+        from tkinter import messagebox
         messagebox.showinfo("Disk Space", "Checking available disk space...")
     
     def run_diagnostics(self):
         """Run system diagnostics"""
+        from tkinter import messagebox
         messagebox.showinfo("Diagnostics", "Running system diagnostics...")
\ No newline at end of file
@@ -0,0 +1,168 @@
+"""
+ME Clean batch panel with a live per-file state table
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from constants.app_config import AppConfig
+from functions.me_clean_batch import (
+    MECleanBatch, STATE_DONE, STATE_FAILED, STATE_SKIPPED, STATE_CANCELLED, describe_batch
+)
+from gui.ui_dispatcher import get_ui_dispatcher, post_to_ui
+
+STATE_COLORS = {
+    STATE_DONE: "#4caf50",
+    STATE_FAILED: "#f44336",
+    STATE_SKIPPED: "#888888",
+    STATE_CANCELLED: "#888888",
+}
+
+
+class BatchPanel:
+    def __init__(self, parent, on_close=None):
+        self.parent = parent
+        self.on_close = on_close
+        self.batch = None
+        
+        self.create_batch_panel()
+    
+    def create_batch_panel(self):
+        """Create the batch table, summary line and buttons"""
+        # Main container
+        self.container = tk.Frame(
+            self.parent,
+            bg="#e8e8e8",
+            relief=tk.FLAT,
+            bd=0
+        )
+        
+        # Title
+        title_label = tk.Label(
+            self.container,
+            text="ME Clean Batch",
+            font=(AppConfig.FONT_FAMILY, 12, "bold"),
+            bg="#e8e8e8",
+            fg="#333333"
+        )
+        title_label.pack(pady=(10, 5))
+        
+        # Summary line
+        self.summary_label = tk.Label(
+            self.container,
+            text="",
+            font=(AppConfig.FONT_FAMILY, 10),
+            bg="#e8e8e8",
+            fg="#333333"
+        )
+        self.summary_label.pack(pady=(0, 5))
+        
+        # Per-file table
+        table_frame = tk.Frame(self.container, bg="#ffffff", relief=tk.RAISED, bd=1)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        columns = ("size", "state", "detail")
+        self.table = ttk.Treeview(table_frame, columns=columns, height=12)
+        self.table.heading("#0", text="File")
+        self.table.heading("size", text="Size")
+        self.table.heading("state", text="State")
+        self.table.heading("detail", text="Details")
+        self.table.column("#0", width=180, stretch=False)
+        self.table.column("size", width=70, anchor=tk.E, stretch=False)
+        self.table.column("state", width=120, stretch=False)
+        self.table.column("detail", width=260)
+        for state, color in STATE_COLORS.items():
+            self.table.tag_configure(state, foreground=color)
+        
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.table.yview)
+        self.table.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.table.pack(fill=tk.BOTH, expand=True)
+        
+        # Buttons
+        button_frame = tk.Frame(self.container, bg="#e8e8e8")
+        button_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.cancel_button = tk.Button(
+            button_frame,
+            text="Cancel Batch",
+            command=self.cancel,
+            font=(AppConfig.FONT_FAMILY, AppConfig.BUTTON_FONT_SIZE),
+            bg="#f44336",
+            fg="#000000",
+            relief=tk.FLAT,
+            bd=0,
+            highlightthickness=0,
+            padx=15,
+            pady=8,
+            cursor='hand2'
+        )
+        self.cancel_button.pack(side=tk.LEFT)
+        
+        self.close_button = tk.Button(
+            button_frame,
+            text="Close",
+            command=self.close,
+            font=(AppConfig.FONT_FAMILY, AppConfig.BUTTON_FONT_SIZE),
+            bg="#757575",
+            fg="#000000",
+            relief=tk.FLAT,
+            bd=0,
+            highlightthickness=0,
+            padx=15,
+            pady=8,
+            cursor='hand2'
+        )
+        self.close_button.pack(side=tk.RIGHT)
+    
+    def start(self, paths):
+        """Fill the table with paths and start cleaning them"""
+        self.table.delete(*self.table.get_children())
+        
+        self.batch = MECleanBatch(paths, on_update=self.on_job_update)
+        for job in self.batch.jobs:
+            self.table.insert(
+                "", tk.END, iid=str(job.index), text=job.filename,
+                values=(f"{job.size / (1024 * 1024):.1f} MB", job.state, job.detail)
+            )
+        self.cancel_button.configure(state=tk.NORMAL)
+        self.show_summary()
+        
+        batch = self.batch
+        self.batch.start(on_finished=lambda b: post_to_ui(self.on_batch_finished, batch))
+    
+    def on_job_update(self, job):
+        """Called on a worker thread; hands the row update to the Tk thread"""
+        get_ui_dispatcher().post_latest((self, job.index), self.update_row, job)
+    
+    def update_row(self, job):
+        batch = self.batch
+        if batch is None or job.index >= len(batch.jobs) or batch.jobs[job.index] is not job:
+            return  # Row of an earlier batch
+        self.table.item(str(job.index), values=(f"{job.size / (1024 * 1024):.1f} MB", job.state, job.detail),
+                        tags=(job.state,))
+        self.show_summary()
+    
+    def on_batch_finished(self, batch):
+        if batch is not self.batch:
+            return
+        self.cancel_button.configure(state=tk.DISABLED)
+        self.show_summary()
+    
+    def show_summary(self):
+        if self.batch:
+            self.summary_label.configure(text=describe_batch(self.batch))
+    
+    def cancel(self):
+        """Stop the batch; images being cleaned stop at their next chunk"""
+        if self.batch:
+            self.batch.cancel()
+    
+    def close(self):
+        """Cancel any running batch and hand the space back to the caller"""
+        self.cancel()
+        if self.on_close:
+            self.on_close()
+    
+    def get_widget(self):
+        """Return the main container"""
+        return self.container
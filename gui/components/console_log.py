@@ -0,0 +1,103 @@
+"""
+Bounded, batched console log shared by the status and console panels
+"""
+
+import tkinter as tk
+from tkinter import scrolledtext
+from collections import deque
+from constants.app_config import AppConfig
+
+# Message types understood by every console (configured once per widget)
+TAG_STYLES = {
+    "ready": {"foreground": "#4caf50", "font": ("Consolas", 9, "bold")},
+    "error": {"foreground": "#f44336"},
+    "success": {"foreground": "#4caf50"},
+    "info": {"foreground": "#2196F3"},
+}
+
+
+class ConsoleLog:
+    """Read-only terminal-style text area
+    
+    Output is queued and written by one insert per frame (at most every
+    CONSOLE_FLUSH_MS), and only the last CONSOLE_MAX_LINES lines are kept,
+    so tools printing thousands of lines a second do not stall the UI.
+    Call from the Tk thread only.
+    """
+    
+    def __init__(self, parent, height=12, max_lines=None):
+        self.parent = parent
+        self.max_lines = max_lines or AppConfig.CONSOLE_MAX_LINES
+        # Lines beyond the cap would be trimmed right after the insert anyway
+        self.pending = deque(maxlen=self.max_lines)
+        self.flush_job = None
+        
+        self.text = scrolledtext.ScrolledText(
+            parent,
+            height=height,
+            bg="#ffffff",
+            fg="#333333",
+            font=("Consolas", 9),
+            relief=tk.FLAT,
+            bd=0,
+            insertbackground="#333333",
+            state=tk.DISABLED,
+            wrap=tk.WORD
+        )
+        for tag, style in TAG_STYLES.items():
+            self.text.tag_configure(tag, **style)
+    
+    def pack(self, **kwargs):
+        self.text.pack(**kwargs)
+    
+    def write(self, message, tag=None):
+        """Queue one '> message' line"""
+        self.append(f"> {message}\n", tag)
+    
+    def write_lines(self, messages, tag=None):
+        """Queue several '> message' lines"""
+        self.append("".join(f"> {message}\n" for message in messages), tag)
+    
+    def append(self, text, tag=None):
+        """Queue raw text (no prefix or newline added)"""
+        if not text:
+            return
+        self.pending.append((text, tag))
+        if self.flush_job is None:
+            self.flush_job = self.text.after(AppConfig.CONSOLE_FLUSH_MS, self.flush)
+    
+    def clear(self):
+        """Drop queued output and empty the text area"""
+        self.pending.clear()
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete(1.0, tk.END)
+        self.text.configure(state=tk.DISABLED)
+    
+    def flush(self):
+        """Write everything queued with a single insert, then trim to the line cap"""
+        self.flush_job = None
+        if not self.pending:
+            return
+        
+        # Coalesce runs of the same tag into (text, tag, text, tag, ...) for one insert call
+        chunks = []
+        run, run_tag = [], None
+        while self.pending:
+            text, tag = self.pending.popleft()
+            if run and tag != run_tag:
+                chunks += ["".join(run), run_tag or ()]
+                run = []
+            run.append(text)
+            run_tag = tag
+        chunks += ["".join(run), run_tag or ()]
+        
+        # Only follow the output when the view is already at the bottom
+        follow = self.text.yview()[1] >= 1.0
+        self.text.configure(state=tk.NORMAL)
+        self.text.insert(tk.END, *chunks)
+        lines = int(self.text.index("end-1c").split(".")[0])
+        if lines > self.max_lines:
+            self.text.delete(1.0, f"{lines - self.max_lines + 1}.0")
+        self.text.configure(state=tk.DISABLED)
+        if follow:
+            self.text.see(tk.END)
@@ -9,12 +9,14 @@ from constants.app_config import AppConfig
 import tkinterdnd2 as tkdnd
 
 class DMIDragDropWidget:
-    def __init__(self, parent, label_text="Drop File Here", on_file_selected=None):
+    def __init__(self, parent, label_text="Drop File Here", on_file_selected=None, image_session=None):
         self.parent = parent
         self.label_text = label_text
         self.on_file_selected = on_file_selected
+        self.image_session = image_session
         self.selected_file = None
         self.selected_filepath = None
+        self.bios_image = None
         
         self.create_drag_drop_area()
     
@@ -100,6 +102,18 @@ class DMIDragDropWidget:
         )
         self.click_text.pack(pady=(0, 10))
         
+        # Read the image from an SPI programmer instead of a file
+        self.read_text = tk.Label(
+            self.drop_frame,
+            text="Read chip (flashrom)",
+            font=(AppConfig.FONT_FAMILY, 9),
+            bg="#ffffff",
+            fg="#4A90E2",
+            cursor="hand2"
+        )
+        self.read_text.pack(pady=(0, 10))
+        self.read_text.bind("<Button-1>", self.read_chip)
+        
         # Bind click event to all elements
         self.drop_frame.bind("<Button-1>", self.select_file)
         self.file_icon.bind("<Button-1>", self.select_file)
@@ -110,11 +124,11 @@ class DMIDragDropWidget:
     def on_drag_enter(self, event):
         """Handle drag enter event"""
         self.drop_frame.configure(bg="#e3f2fd")
-        
+    
     def on_drag_leave(self, event):
         """Handle drag leave event"""
         self.drop_frame.configure(bg="#ffffff")
-        
+    
     def on_drop(self, event):
         """Handle file drop event"""
         self.drop_frame.configure(bg="#ffffff")
@@ -148,6 +162,12 @@ class DMIDragDropWidget:
         if file_path:
             self.process_file(file_path)
     
+    def read_chip(self, event=None):
+        """Dump the chip several times and load the voted image as if it was dropped"""
+        from gui.components.flash_read_dialog import FlashReadDialog
+        FlashReadDialog(self.container, self.process_file)
+        return "break"  # Keep the click from also opening the file dialog
+    
     def process_file(self, file_path):
         """Process the selected file"""
         # Check if file is .bin
@@ -159,6 +179,21 @@ class DMIDragDropWidget:
             self.path_text.configure(text="")
             return
         
+        # Map the image once; the DMI engine works on this mapping
+        if self.image_session:
+            previous = self.bios_image
+            try:
+                self.bios_image = self.image_session.open(file_path)
+            except (OSError, ValueError) as e:
+                self.file_text.configure(
+                    text=f"❌ Error: {e}",
+                    fg="#f44336"
+                )
+                self.path_text.configure(text="")
+                return
+            if previous is not None:
+                self.image_session.release(previous.filepath)
+        
         # Store file path
         self.selected_file = os.path.basename(file_path)
         self.selected_filepath = file_path
@@ -186,8 +221,11 @@ class DMIDragDropWidget:
     
     def reset_file(self):
         """Reset file selection"""
+        if self.bios_image is not None and self.image_session:
+            self.image_session.release(self.bios_image.filepath)
         self.selected_file = None
         self.selected_filepath = None
+        self.bios_image = None
         
         self.file_icon.configure(
             text="📄",
@@ -205,6 +243,10 @@ class DMIDragDropWidget:
         """Return the selected file path"""
         return self.selected_filepath
     
+    def get_bios_image(self):
+        """Return the mapped BiosImage for the selected file"""
+        return self.bios_image
+    
     def get_widget(self):
         """Return the main container"""
         return self.container
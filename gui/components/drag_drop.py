@@ -9,10 +9,13 @@ from constants.app_config import AppConfig
 import tkinterdnd2 as tkdnd
 
 class DragDropWidget:
-    def __init__(self, parent, on_file_selected=None):
+    def __init__(self, parent, on_file_selected=None, image_session=None, on_files_dropped=None):
         self.parent = parent
         self.on_file_selected = on_file_selected
+        self.on_files_dropped = on_files_dropped
+        self.image_session = image_session
         self.selected_file = None
+        self.bios_image = None
         
         self.create_drag_drop_area()
     
@@ -93,6 +96,23 @@ class DragDropWidget:
         )
         self.status_text.pack(pady=(20, 10))
         
+        # Read the image from an SPI programmer instead of a file
+        self.read_button = tk.Button(
+            self.container,
+            text="Read Chip (flashrom)",
+            command=self.read_chip,
+            font=(AppConfig.FONT_FAMILY, AppConfig.BUTTON_FONT_SIZE),
+            bg="#2196f3",
+            fg="#000000",
+            relief=tk.FLAT,
+            bd=0,
+            highlightthickness=0,
+            padx=15,
+            pady=5,
+            cursor='hand2'
+        )
+        self.read_button.pack(pady=(0, 10))
+        
         # Reset button (initially hidden)
         self.reset_button = tk.Button(
             self.container,
@@ -119,11 +139,11 @@ class DragDropWidget:
     def on_drag_enter(self, event):
         """Handle drag enter event"""
         self.drop_frame.configure(bg="#e3f2fd")  # Light blue highlight
-        
+    
     def on_drag_leave(self, event):
         """Handle drag leave event"""
         self.drop_frame.configure(bg="#ffffff")  # Back to white
-        
+    
     def on_drop(self, event):
         """Handle file drop event"""
         self.drop_frame.configure(bg="#ffffff")  # Reset background
@@ -131,6 +151,13 @@ class DragDropWidget:
         # Get dropped files - handle different formats
         file_data = event.data
         
+        # Several files or a folder go to the batch handler when there is one
+        if self.on_files_dropped:
+            paths = [path for path in self.drop_frame.tk.splitlist(file_data) if path]
+            if len(paths) > 1 or (paths and os.path.isdir(paths[0])):
+                self.on_files_dropped(paths)
+                return
+        
         # Handle different file path formats
         if file_data.startswith('{') and file_data.endswith('}'):
             # Remove braces and split
@@ -159,23 +186,29 @@ class DragDropWidget:
         if file_path:
             self.process_file(file_path)
     
+    def read_chip(self):
+        """Dump the chip several times and load the voted image as if it was dropped"""
+        from gui.components.flash_read_dialog import FlashReadDialog
+        FlashReadDialog(self.container, self.process_file)
+    
     def process_file(self, file_path):
         """Process the selected file"""
         # Check if file is .bin
         if not file_path.lower().endswith('.bin'):
-            # Show error message
-            error_label = tk.Label(
-                self.drop_frame,
-                text="❌ Error: Only .bin files are allowed!",
-                font=(AppConfig.FONT_FAMILY, 10, "bold"),
-                bg="#ffffff",
-                fg="#f44336"
-            )
-            error_label.pack(pady=5)
-            # Remove error after 3 seconds
-            self.drop_frame.after(3000, error_label.destroy)
+            self.show_error("❌ Error: Only .bin files are allowed!")
             return
         
+        # Map the image once; every screen shares this mapping
+        if self.image_session:
+            previous = self.bios_image
+            try:
+                self.bios_image = self.image_session.open(file_path)
+            except (OSError, ValueError) as e:
+                self.show_error(f"❌ Error: {e}")
+                return
+            if previous is not None:
+                self.image_session.release(previous.filepath)
+        
         # Store file path
         self.selected_file = file_path
         
@@ -208,10 +241,26 @@ class DragDropWidget:
         if self.on_file_selected:
             self.on_file_selected(file_path, filename, reset_all=False)
     
+    def show_error(self, message):
+        """Show an error below the drop area for 3 seconds"""
+        error_label = tk.Label(
+            self.drop_frame,
+            text=message,
+            font=(AppConfig.FONT_FAMILY, 10, "bold"),
+            bg="#ffffff",
+            fg="#f44336",
+            wraplength=260
+        )
+        error_label.pack(pady=5)
+        # Remove error after 3 seconds
+        self.drop_frame.after(3000, error_label.destroy)
+    
     def reset_file(self):
         """Master reset - stop all tasks and clear file selection"""
         # Reset file selection
+        previous = self.bios_image
         self.selected_file = None
+        self.bios_image = None
         self.status_text.configure(
             text="No file selected",
             fg="#888888"
@@ -231,6 +280,10 @@ class DragDropWidget:
         # Callback to parent to reset everything
         if self.on_file_selected:
             self.on_file_selected(None, None, reset_all=True)
+        
+        # Unmap the file once the tasks reading it are cancelled
+        if previous is not None and self.image_session:
+            self.image_session.release(previous.filepath)
     
     def get_widget(self):
         """Return the main container"""
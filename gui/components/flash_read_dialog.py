@@ -0,0 +1,163 @@
+"""
+Read SPI chip dialog: multi-read flashrom dumps straight into a drop target
+"""
+
+import os
+import time
+import tkinter as tk
+from constants.app_config import AppConfig
+from functions.flash_reader import FlashReadError, describe_vote, read_flash
+from functions.task_engine import TaskSlot
+from functions.tool_runner import OutputChannel, ToolError
+from gui.components.console_log import ConsoleLog
+from gui.ui_dispatcher import get_ui_dispatcher, post_to_ui
+
+
+class FlashReadDialog:
+    """Reads a chip FLASH_READ_COUNT times, votes a consensus image and hands its path to on_image_ready"""
+    
+    def __init__(self, parent, on_image_ready):
+        self.parent = parent
+        self.on_image_ready = on_image_ready
+        self.task = TaskSlot(dispatch=post_to_ui)
+        self.channel = None
+        
+        self.create_dialog()
+    
+    def create_dialog(self):
+        """Create the settings, output console and buttons"""
+        self.window = tk.Toplevel(self.parent)
+        self.window.title("Read SPI Chip")
+        self.window.configure(bg="#e8e8e8")
+        self.window.transient(self.parent.winfo_toplevel())
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        
+        # Settings
+        settings = tk.Frame(self.window, bg="#e8e8e8")
+        settings.pack(fill=tk.X, padx=10, pady=(10, 5))
+        
+        self.programmer = tk.StringVar(value=AppConfig.FLASHROM_PROGRAMMER)
+        self.chip = tk.StringVar()
+        self.reads = tk.IntVar(value=AppConfig.FLASH_READ_COUNT)
+        fields = (
+            ("Programmer", tk.Entry(settings, textvariable=self.programmer, width=40)),
+            ("Chip (optional)", tk.Entry(settings, textvariable=self.chip, width=40)),
+            ("Reads", tk.Spinbox(settings, from_=1, to=9, textvariable=self.reads, width=5)),
+        )
+        for row, (label, widget) in enumerate(fields):
+            tk.Label(
+                settings,
+                text=label,
+                font=(AppConfig.FONT_FAMILY, AppConfig.FONT_SIZE),
+                bg="#e8e8e8",
+                fg="#333333"
+            ).grid(row=row, column=0, sticky=tk.W, pady=2)
+            widget.grid(row=row, column=1, sticky=tk.W, padx=(10, 0), pady=2)
+        
+        # flashrom output and the vote report
+        console_frame = tk.Frame(self.window, bg="#ffffff", relief=tk.RAISED, bd=1)
+        console_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        self.console = ConsoleLog(console_frame)
+        self.console.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.console.write(f"Images are saved to {AppConfig.FLASH_READ_DIR}", "info")
+        
+        # Buttons
+        button_frame = tk.Frame(self.window, bg="#e8e8e8")
+        button_frame.pack(fill=tk.X, padx=10, pady=(5, 10))
+        
+        self.start_button = tk.Button(
+            button_frame,
+            text="Start Read",
+            command=self.start,
+            font=(AppConfig.FONT_FAMILY, AppConfig.BUTTON_FONT_SIZE),
+            bg="#2196f3",
+            fg="#000000",
+            relief=tk.FLAT,
+            bd=0,
+            highlightthickness=0,
+            padx=15,
+            pady=8,
+            cursor='hand2'
+        )
+        self.start_button.pack(side=tk.LEFT)
+        
+        self.close_button = tk.Button(
+            button_frame,
+            text="Close",
+            command=self.close,
+            font=(AppConfig.FONT_FAMILY, AppConfig.BUTTON_FONT_SIZE),
+            bg="#757575",
+            fg="#000000",
+            relief=tk.FLAT,
+            bd=0,
+            highlightthickness=0,
+            padx=15,
+            pady=8,
+            cursor='hand2'
+        )
+        self.close_button.pack(side=tk.RIGHT)
+    
+    def start(self):
+        """Run the reads and the vote on a worker"""
+        programmer = self.programmer.get().strip()
+        chip = self.chip.get().strip() or None
+        try:
+            reads = max(1, int(self.reads.get()))
+        except (tk.TclError, ValueError):
+            reads = AppConfig.FLASH_READ_COUNT
+        if not programmer:
+            self.console.write("❌ Error: Enter a flashrom programmer", "error")
+            return
+        
+        output_path = os.path.join(AppConfig.FLASH_READ_DIR, f"spi_{time.strftime('%Y%m%d_%H%M%S')}.bin")
+        channel = self.channel = OutputChannel()
+        
+        def drain():
+            if channel is self.channel:
+                self.console.write_lines(channel.take())
+        
+        def run(task):
+            def on_lines(lines):
+                channel.put(lines, task.token)
+                get_ui_dispatcher().post_latest((self, "flashrom"), drain)
+            
+            return read_flash(programmer, output_path, reads, chip, on_lines,
+                              lambda number, total: task.report(number, total), task.token)
+        
+        def finished(result, error):
+            drain()
+            self.finish(result, error)
+        
+        self.console.clear()
+        self.start_button.configure(state=tk.DISABLED)
+        self.close_button.configure(text="Cancel")
+        self.task.start(run, name="SPI read", on_progress=self.show_progress, on_done=finished)
+    
+    def show_progress(self, number, total):
+        self.console.write(f"📖 Read {number}/{total}...", "info")
+    
+    def finish(self, result, error):
+        """Report the vote and load the consensus image into the drop target"""
+        self.channel = None
+        self.start_button.configure(state=tk.NORMAL)
+        self.close_button.configure(text="Close")
+        if isinstance(error, (FlashReadError, ToolError, OSError)):
+            self.console.write(f"❌ {error}", "error")
+            return
+        if error:
+            self.console.write(f"❌ Error: {error}", "error")
+            return
+        
+        self.console.write_lines(describe_vote(result))
+        if result.unresolved:
+            self.console.write("⚠️ Some bytes had no majority; check the programmer clip and read again", "error")
+        self.on_image_ready(result.output_path)
+        self.console.write(f"✅ Loaded {os.path.basename(result.output_path)}", "success")
+    
+    def close(self):
+        """Cancel a running read, or close the dialog"""
+        if self.task.is_running:
+            self.task.cancel()
+            self.finish(None, FlashReadError("Read cancelled"))
+            return
+        self.window.destroy()
@@ -3,18 +3,65 @@ Slideshow component with automatic carousel (no built-in navigation)
 """
 
 import tkinter as tk
-from PIL import Image, ImageTk
+import base64
 import os
 import glob
+import re
+import threading
 from constants.app_config import AppConfig
+from gui.ui_dispatcher import post_to_ui
+
+SLIDE_CACHE_DIR = os.path.join(AppConfig.CACHE_DIR, "slides")
+
+
+def baked_slide_path(source_path, width, height):
+    """Return the cache path of a resized slide, keyed by source mtime/size and target size"""
+    stat = os.stat(source_path)
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(SLIDE_CACHE_DIR, f"{name}-{stat.st_mtime_ns}-{stat.st_size}-{width}x{height}.png")
+
+
+def bake_slide(source_path, width, height):
+    """Return the path of the resized PNG for a slide, resizing it on a cache miss
+    
+    Tk decodes the baked PNG natively, so PIL is only imported when a
+    slide is new or has changed.
+    """
+    baked_path = baked_slide_path(source_path, width, height)
+    if os.path.exists(baked_path):
+        return baked_path
+    
+    from PIL import Image  # Deferred: only needed on a cache miss
+    
+    os.makedirs(SLIDE_CACHE_DIR, exist_ok=True)
+    with Image.open(source_path) as img:
+        img = img.convert("RGB").resize((width, height), Image.Resampling.LANCZOS)
+        temp_path = f"{baked_path}.{os.getpid()}.tmp"
+        img.save(temp_path, "PNG")
+    os.replace(temp_path, baked_path)
+    
+    # Drop bakes of older versions of this slide (not those of "<name>-2.png" and the like)
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    bake_name = re.compile(re.escape(stem) + r"-\d+-\d+-\d+x\d+\.png")
+    for name in os.listdir(SLIDE_CACHE_DIR):
+        stale = os.path.join(SLIDE_CACHE_DIR, name)
+        if bake_name.fullmatch(name) and stale != baked_path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+    return baked_path
+
 
 class Slideshow:
-    def __init__(self, parent):
+    def __init__(self, parent, on_change=None):
         self.parent = parent
+        self.on_change = on_change  # Called after the slide or slide count changes
         self.current_index = 0
         self.images = []
         self.photo_images = []
         self.auto_timer = None
+        self.paused = False
         
         # Load images
         self.load_images()
@@ -26,40 +73,73 @@ class Slideshow:
         self.start_auto_slideshow()
     
     def load_images(self):
-        """Load images from assets/images folder"""
+        """Load the first slide now and the rest on a background thread
+        
+        Slides are resized once into the on-disk cache; afterwards Tk
+        only decodes the baked PNGs.
+        """
         image_folder = "assets/images"
+        image_files = []
         if os.path.exists(image_folder):
             # Get all image files
             image_extensions = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.bmp']
-            image_files = []
             for ext in image_extensions:
                 image_files.extend(glob.glob(os.path.join(image_folder, ext)))
             
             # Sort files for consistent order
             image_files.sort()
-            
-            # Load and resize images
-            for img_path in image_files:
-                try:
-                    # Open and resize image
-                    img = Image.open(img_path)
-                    img = img.resize((AppConfig.SLIDESHOW_WIDTH, AppConfig.SLIDESHOW_HEIGHT), Image.Resampling.LANCZOS)
-                    
-                    # Convert to PhotoImage for tkinter
-                    photo = ImageTk.PhotoImage(img)
-                    self.photo_images.append(photo)
-                    self.images.append(img_path)
-                except Exception as e:
-                    print(f"Error loading image {img_path}: {e}")
+        
+        # First slide synchronously so the window opens with a picture
+        remaining = list(image_files)
+        while remaining and not self.photo_images:
+            img_path = remaining.pop(0)
+            try:
+                baked_path = bake_slide(img_path, AppConfig.SLIDESHOW_WIDTH, AppConfig.SLIDESHOW_HEIGHT)
+                self.photo_images.append(tk.PhotoImage(file=baked_path))
+                self.images.append(img_path)
+            except Exception as e:
+                print(f"Error loading image {img_path}: {e}")
         
         # If no images found, create a placeholder
         if not self.images:
             self.create_placeholder_image()
+        
+        if remaining:
+            thread = threading.Thread(target=self.load_remaining_images, args=(remaining,), daemon=True)
+            thread.start()
+    
+    def load_remaining_images(self, image_files):
+        """Bake and read the other slides off the Tk thread, handing each to Tk"""
+        for img_path in image_files:
+            try:
+                baked_path = bake_slide(img_path, AppConfig.SLIDESHOW_WIDTH, AppConfig.SLIDESHOW_HEIGHT)
+                with open(baked_path, "rb") as f:
+                    data = base64.b64encode(f.read()).decode("ascii")
+            except Exception as e:
+                print(f"Error loading image {img_path}: {e}")
+                continue
+            post_to_ui(self.add_image, img_path, data)
+    
+    def add_image(self, img_path, data):
+        """Append a decoded slide (Tk thread) and start cycling once there are two"""
+        if not self.image_label.winfo_exists():
+            return
+        try:
+            photo = tk.PhotoImage(data=data)
+        except tk.TclError as e:
+            print(f"Error loading image {img_path}: {e}")
+            return
+        self.photo_images.append(photo)
+        self.images.append(img_path)
+        if len(self.photo_images) == 2 and not self.auto_timer:
+            self.start_auto_slideshow()
+        if self.on_change:
+            self.on_change()
     
     def create_placeholder_image(self):
         """Create a placeholder image if no images are found"""
-        img = Image.new('RGB', (AppConfig.SLIDESHOW_WIDTH, AppConfig.SLIDESHOW_HEIGHT), '#e0e0e0')
-        photo = ImageTk.PhotoImage(img)
+        photo = tk.PhotoImage(width=AppConfig.SLIDESHOW_WIDTH, height=AppConfig.SLIDESHOW_HEIGHT)
+        photo.put("#e0e0e0", to=(0, 0, AppConfig.SLIDESHOW_WIDTH, AppConfig.SLIDESHOW_HEIGHT))
         self.photo_images.append(photo)
         self.images.append("placeholder")
     
@@ -97,6 +177,8 @@ class Slideshow:
         """Display the current image"""
         if self.photo_images:
             self.image_label.configure(image=self.photo_images[self.current_index])
+            if self.on_change:
+                self.on_change()
     
     def next_image(self):
         """Show next image"""
@@ -120,11 +202,12 @@ class Slideshow:
     
     def start_auto_slideshow(self):
         """Start automatic slideshow"""
-        if len(self.photo_images) > 1:
+        if len(self.photo_images) > 1 and not self.paused:
             self.auto_timer = self.parent.after(AppConfig.SLIDESHOW_INTERVAL, self.auto_next)
     
     def auto_next(self):
         """Automatically go to next image"""
+        self.auto_timer = None
         self.next_image()
     
     def restart_auto_slideshow(self):
@@ -139,6 +222,17 @@ class Slideshow:
             self.parent.after_cancel(self.auto_timer)
             self.auto_timer = None
     
+    def pause(self):
+        """Stop the timer while the slideshow is hidden; slides stay loaded"""
+        self.paused = True
+        self.stop_auto_slideshow()
+    
+    def resume(self):
+        """Restart the timer when the slideshow is shown again"""
+        if self.paused:
+            self.paused = False
+            self.restart_auto_slideshow()
+    
     def get_frame(self):
         """Return the slideshow frame"""
         return self.slideshow_frame
\ No newline at end of file
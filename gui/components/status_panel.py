@@ -2,25 +2,53 @@
 Status panel component with integrated terminal-style command output
 """
 
+import os
 import tkinter as tk
-from tkinter import scrolledtext
+from tkinter import ttk
 from constants.app_config import AppConfig
-import threading
+from functions.image_analysis import describe_analysis, prepare_image_async
+from functions.image_hashing import format_hash_progress, format_rate
+from functions.job_queue import BUILD_STATION, STATE_RUNNING, get_build_queue
+from functions.me_clean_batch import STATE_CANCELLED, STATE_DONE, STATE_FAILED
+from functions.me_analysis import analyze_image_me, describe_me
+from functions.task_engine import CancelToken, TaskCancelled, TaskSlot
+from functions.tool_runner import OutputChannel, ToolTimeout, find_tool, run_tool
+from gui.components.console_log import ConsoleLog
+from gui.ui_dispatcher import get_ui_dispatcher, post_to_ui
+import time
+
+QUEUE_STATE_COLORS = {
+    STATE_RUNNING: "#2196F3",
+    STATE_DONE: "#4caf50",
+    STATE_FAILED: "#f44336",
+    STATE_CANCELLED: "#888888",
+}
+
 
 class StatusPanel:
-    def __init__(self, parent):
+    def __init__(self, parent, station=BUILD_STATION):
         self.parent = parent
         self.file_info = {
             'filename': None,
             'generation': 'Unknown',
             'file_system': 'Unknown',
+            'sha256': None,
             'status': 'Ready'
         }
+        self.bios_image = None
         self.is_running_command = False
-        self.current_task_thread = None
-        self.task_cancelled = False
+        self.tasks = TaskSlot(dispatch=post_to_ui)  # The command writing to the console
+        self.hashing = None  # Cancel token of the image hash in progress
+        self.tool_channel = None  # Output of the external tool being streamed
+        # BUILD jobs of this station; MainWindow starts the queue, so restored jobs run before the tab opens
+        self.queue = get_build_queue(station)
         
         self.create_status_panel()
+        self.queue.attach(
+            on_change=lambda: get_ui_dispatcher().post_latest((self, "queue"), self.refresh_queue),
+            on_finished=lambda job: post_to_ui(self.show_queued_result, job)
+        )
+        self.refresh_queue()
     
     def create_status_panel(self):
         """Create the status panel with integrated terminal view"""
@@ -52,19 +80,10 @@ class StatusPanel:
         self.status_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
         # Terminal-style text area (initially shows file info, then command output)
-        self.status_text = scrolledtext.ScrolledText(
-            self.status_frame,
-            height=12,
-            bg="#ffffff",
-            fg="#333333",
-            font=("Consolas", 9),
-            relief=tk.FLAT,
-            bd=0,
-            insertbackground="#333333",
-            state=tk.DISABLED,
-            wrap=tk.WORD
-        )
-        self.status_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.console = ConsoleLog(self.status_frame)
+        self.console.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        self.create_queue_view()
         
         # Operations section
         ops_label = tk.Label(
@@ -134,31 +153,133 @@ class StatusPanel:
         # Initialize with default status
         self.show_default_status()
     
+    def create_queue_view(self):
+        """Create the BUILD queue table and its buttons"""
+        self.queue_label = tk.Label(
+            self.container,
+            text="Job Queue",
+            font=(AppConfig.FONT_FAMILY, 12, "bold"),
+            bg="#e8e8e8",
+            fg="#333333"
+        )
+        self.queue_label.pack(pady=(10, 5))
+        
+        queue_frame = tk.Frame(self.container, bg="#ffffff", relief=tk.RAISED, bd=1)
+        queue_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.queue_table = ttk.Treeview(queue_frame, columns=("state", "detail"), height=5, selectmode=tk.BROWSE)
+        self.queue_table.heading("#0", text="File")
+        self.queue_table.heading("state", text="State")
+        self.queue_table.heading("detail", text="Details")
+        self.queue_table.column("#0", width=180, stretch=False)
+        self.queue_table.column("state", width=90, stretch=False)
+        self.queue_table.column("detail", width=200)
+        for state, color in QUEUE_STATE_COLORS.items():
+            self.queue_table.tag_configure(state, foreground=color)
+        
+        scrollbar = ttk.Scrollbar(queue_frame, orient=tk.VERTICAL, command=self.queue_table.yview)
+        self.queue_table.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.queue_table.pack(fill=tk.X, expand=True)
+        
+        # Reorder / remove buttons
+        queue_buttons = tk.Frame(self.container, bg="#e8e8e8")
+        queue_buttons.pack(fill=tk.X, padx=10)
+        for text, command in (("▲ Up", lambda: self.move_selected_job(-1)),
+                              ("▼ Down", lambda: self.move_selected_job(1)),
+                              ("Remove", self.remove_selected_job)):
+            tk.Button(
+                queue_buttons,
+                text=text,
+                command=command,
+                font=(AppConfig.FONT_FAMILY, AppConfig.BUTTON_FONT_SIZE),
+                bg="#e0e0e0",
+                fg="#000000",
+                relief=tk.FLAT,
+                bd=0,
+                highlightthickness=0,
+                padx=10,
+                pady=4,
+                cursor='hand2'
+            ).pack(side=tk.LEFT, padx=(0, 5))
+        tk.Button(
+            queue_buttons,
+            text="Clear Finished",
+            command=self.queue.clear_finished,
+            font=(AppConfig.FONT_FAMILY, AppConfig.BUTTON_FONT_SIZE),
+            bg="#757575",
+            fg="#000000",
+            relief=tk.FLAT,
+            bd=0,
+            highlightthickness=0,
+            padx=10,
+            pady=4,
+            cursor='hand2'
+        ).pack(side=tk.RIGHT)
+    
+    def refresh_queue(self):
+        """Redraw the queue table from the queue (Tk thread)"""
+        jobs = self.queue.snapshot()
+        selected = self.queue_table.selection()
+        self.queue_table.delete(*self.queue_table.get_children())
+        for job in jobs:
+            self.queue_table.insert(
+                "", tk.END, iid=str(job.id), text=job.filename,
+                values=(job.state, job.detail), tags=(job.state,)
+            )
+        selected = [iid for iid in selected if self.queue_table.exists(iid)]
+        if selected:
+            self.queue_table.selection_set(selected)
+        waiting = sum(1 for job in jobs if not job.finished)
+        self.queue_label.configure(text=f"Job Queue ({waiting} pending)" if waiting else "Job Queue")
+    
+    def selected_job_id(self):
+        selected = self.queue_table.selection()
+        return int(selected[0]) if selected else None
+    
+    def move_selected_job(self, offset):
+        """Move the selected waiting job up or down the queue"""
+        job_id = self.selected_job_id()
+        if job_id is not None:
+            self.queue.move(job_id, offset)
+    
+    def remove_selected_job(self):
+        """Remove the selected job (a running one is cancelled)"""
+        job_id = self.selected_job_id()
+        if job_id is not None:
+            self.queue.remove(job_id)
+    
     def show_default_status(self):
         """Show the default file status information"""
-        self.status_text.configure(state=tk.NORMAL)
-        self.status_text.delete(1.0, tk.END)
+        self.console.clear()
         
         # File information
         if self.file_info['filename']:
-            self.status_text.insert(tk.END, f"File: {self.file_info['filename']}\n")
+            self.console.append(f"File: {self.file_info['filename']}\n")
         else:
-            self.status_text.insert(tk.END, "No file selected\n")
+            self.console.append("No file selected\n")
         
-        self.status_text.insert(tk.END, f"Generation: {self.file_info['generation']}\n")
-        self.status_text.insert(tk.END, f"File System: {self.file_info['file_system']}\n\n")
+        self.console.append(f"Generation: {self.file_info['generation']}\n")
+        self.console.append(f"File System: {self.file_info['file_system']}\n")
+        if self.file_info['sha256']:
+            self.console.append(f"SHA-256: {self.file_info['sha256']}\n")
+        self.console.append("\n")
         
-        # Ready status in green
-        self.status_text.insert(tk.END, "Ready", "ready")
-        
-        # Configure green color for "Ready"
-        self.status_text.tag_configure("ready", foreground="#4caf50", font=("Consolas", 9, "bold"))
-        
-        self.status_text.configure(state=tk.DISABLED)
+        # Ready status in green (hashing progress while the image is prepared)
+        if self.file_info['status'] == 'Ready':
+            self.console.append("Ready", "ready")
+        else:
+            self.console.append(self.file_info['status'])
+        self.console.flush()
         self.is_running_command = False
     
-    def update_file_info(self, filepath, filename, reset_all=False):
+    def update_file_info(self, filepath, filename, reset_all=False, bios_image=None):
         """Update file information and refresh status display"""
+        self.cancel_hashing()
+        self.bios_image = bios_image if filepath and not reset_all else None
+        self.file_info['sha256'] = None
+        self.file_info['status'] = 'Ready'
+        
         if reset_all:
             # Master reset - stop all tasks and clear everything
             self.stop_all_tasks()
@@ -167,9 +288,17 @@ class StatusPanel:
             self.file_info['file_system'] = 'Unknown'
         elif filepath:
             self.file_info['filename'] = filename
-            # Simulate file analysis
-            self.file_info['generation'] = 'ME 11.x'
-            self.file_info['file_system'] = 'UEFI'
+            if self.queue.is_busy:
+                # A BUILD is running: queue the new dump behind it instead of replacing it
+                self.enqueue_build(filepath)
+            if bios_image and "analysis" not in bios_image.cache:
+                # Hash and analyze off the Tk thread; the panel fills in when done
+                self.file_info['generation'] = 'Analyzing...'
+                self.file_info['file_system'] = 'Analyzing...'
+                self.start_image_hashing(bios_image)
+            else:
+                self.file_info['generation'], self.file_info['file_system'] = self.describe_image(bios_image)
+                self.file_info['sha256'] = self.describe_hashes(bios_image)
         else:
             self.file_info['filename'] = None
             self.file_info['generation'] = 'Unknown'
@@ -179,19 +308,68 @@ class StatusPanel:
         if not self.is_running_command or reset_all:
             self.show_default_status()
     
+    def describe_image(self, bios_image):
+        """Return (generation, file_system) from the cached image analysis"""
+        if not bios_image or "analysis" not in bios_image.cache:
+            return 'Unknown', 'Unknown'
+        return describe_analysis(bios_image.cache["analysis"])
+    
+    def describe_hashes(self, bios_image):
+        """Return the short SHA-256 line, or None before hashing finished"""
+        hashes = bios_image.cache.get("hashes") if bios_image else None
+        if not hashes:
+            return None
+        return f"{hashes.sha256[:16]}... ({format_rate(hashes.bytes_per_second)})"
+    
+    def start_image_hashing(self, bios_image):
+        """Hash the image on the worker pool and report throughput here"""
+        self.file_info['status'] = format_hash_progress(0, bios_image.size, 0)
+        self.hashing = cancel = CancelToken()
+        
+        def progress(done, total, rate):
+            get_ui_dispatcher().post_latest((self, "hash"), self.show_hash_progress, bios_image, done, total, rate)
+        
+        def finished(analysis, error):
+            post_to_ui(self.on_image_prepared, bios_image, error)
+        
+        prepare_image_async(bios_image, progress, finished, cancel)
+    
+    def cancel_hashing(self):
+        """Stop hashing the previous image (within one chunk)"""
+        if self.hashing is not None:
+            self.hashing.cancel()
+            self.hashing = None
+    
+    def show_hash_progress(self, bios_image, done, total, rate):
+        """Show hashing progress for the current image"""
+        if bios_image is not self.bios_image:
+            return  # A newer file was dropped meanwhile
+        self.file_info['status'] = format_hash_progress(done, total, rate)
+        if not self.is_running_command:
+            self.show_default_status()
+    
+    def on_image_prepared(self, bios_image, error):
+        """Fill in the analysis once hashing has finished"""
+        if bios_image is not self.bios_image or isinstance(error, TaskCancelled):
+            return
+        if error:
+            self.file_info['generation'], self.file_info['file_system'] = 'Unknown', 'Unknown'
+            self.file_info['status'] = f"❌ Analysis failed: {error}"
+        else:
+            self.file_info['generation'], self.file_info['file_system'] = self.describe_image(bios_image)
+            self.file_info['sha256'] = self.describe_hashes(bios_image)
+            self.file_info['status'] = 'Ready'
+        if not self.is_running_command:
+            self.show_default_status()
+    
     def add_command_output(self, message):
         """Add command output to the status area"""
-        self.status_text.configure(state=tk.NORMAL)
-        self.status_text.insert(tk.END, f"> {message}\n")
-        self.status_text.see(tk.END)
-        self.status_text.configure(state=tk.DISABLED)
+        self.console.write(message)
     
     def start_command_mode(self):
         """Switch to command output mode"""
         self.is_running_command = True
-        self.status_text.configure(state=tk.NORMAL)
-        self.status_text.delete(1.0, tk.END)
-        self.status_text.configure(state=tk.DISABLED)
+        self.console.clear()
     
     def clear_status(self):
         """Clear status and return to default file information view"""
@@ -199,17 +377,10 @@ class StatusPanel:
         self.show_default_status()
     
     def stop_all_tasks(self):
-        """Stop all running tasks and reset to ready state"""
-        # Cancel any running tasks
-        self.task_cancelled = True
+        """Cancel the running command; its engines stop within one chunk"""
+        self.tasks.cancel()
+        self.tool_channel = None
         self.is_running_command = False
-        
-        # If there's a running thread, mark it for cancellation
-        if self.current_task_thread and self.current_task_thread.is_alive():
-            self.task_cancelled = True
-        
-        # Reset task state
-        self.current_task_thread = None
     
     def run_build(self):
         """Run build command with output in status area"""
@@ -218,22 +389,38 @@ class StatusPanel:
             self.add_command_output("❌ Error: No file selected!")
             return
         
-        # Stop any existing tasks
-        self.stop_all_tasks()
+        if not self.bios_image:
+            self.start_command_mode()
+            self.add_command_output("❌ Error: Image is not loaded")
+            return
         
         # Switch to command mode
         self.start_command_mode()
-        self.add_command_output("🔨 Starting BUILD (ME Clean) process...")
-        self.add_command_output("Initializing ME cleaning tools...")
-        
-        # Simulate command execution
-        self.simulate_command_output([
-            "Loading BIOS file...",
-            "Analyzing ME region...",
-            "Cleaning ME components...",
-            "Rebuilding BIOS structure...",
-            "✅ BUILD completed successfully!"
-        ], "BUILD")
+        self.enqueue_build(self.bios_image.filepath)
+    
+    def enqueue_build(self, filepath):
+        """Add a BUILD for filepath to this station's queue"""
+        job = self.queue.pending_job(filepath)
+        if job is not None:
+            self.add_command_output(f"🕒 {job.filename} is already in the queue ({job.state})")
+            return
+        job = self.queue.add(filepath)
+        ahead = self.queue.position(job)
+        if ahead:
+            self.add_command_output(f"🕒 {job.filename} queued for BUILD ({ahead} job(s) ahead)")
+        else:
+            self.add_command_output(f"🔨 Starting BUILD (ME Clean) of {job.filename}...")
+    
+    def show_queued_result(self, job):
+        """Write the report of a finished queued BUILD to the console"""
+        if job.state == STATE_CANCELLED:
+            return
+        self.is_running_command = True
+        self.add_command_output(f"📄 {job.filename}")
+        if job.state == STATE_DONE:
+            self.add_command_lines(job.result)
+        else:
+            self.add_command_output(f"❌ BUILD failed: {job.detail}")
     
     def run_analysis(self):
         """Run ME analysis with output in status area"""
@@ -247,33 +434,83 @@ class StatusPanel:
         
         # Switch to command mode
         self.start_command_mode()
+        
+        # Prefer the real ME Analyzer when it is installed
+        analyzer = find_tool(AppConfig.ME_ANALYZER_NAMES)
+        if analyzer and self.bios_image:
+            self.add_command_output(f"🔍 Launching ME Analyzer ({os.path.basename(analyzer[-1])})...")
+            self.run_external_tool("ME Analyzer", analyzer + list(AppConfig.ME_ANALYZER_ARGS) + [self.bios_image.filepath])
+            return
+        
         self.add_command_output("🔍 Starting MEA Analysis...")
         
-        # Simulate command execution
-        self.simulate_command_output([
-            "Launching ME Analyzer...",
-            "Scanning ME firmware...",
-            "Extracting ME modules...",
-            "Generating analysis report...",
-            "✅ Analysis completed successfully!"
-        ], "ANALYSIS")
+        # Parse the ME region on a worker, then render the report at once
+        bios_image = self.bios_image
+        
+        def analyze(task):
+            return self.analyze_me(bios_image)
+        
+        self.tasks.start(analyze, name="MEA Analysis", on_done=self.show_command_result)
+    
+    def run_external_tool(self, title, args):
+        """Run a command-line tool on a worker and stream its output into the console"""
+        channel = self.tool_channel = OutputChannel()
+        
+        def drain():
+            if channel is self.tool_channel:
+                self.add_command_lines(channel.take())
+        
+        def run(task):
+            def on_lines(lines):
+                channel.put(lines, task.token)  # Waits while the console is behind
+                get_ui_dispatcher().post_latest((self, "tool"), drain)
+            return run_tool(args, on_lines, cancel=task.token)
+        
+        def finished(result, error):
+            drain()
+            self.show_tool_result(title, result, error)
+        
+        self.tasks.start(run, name=title, on_done=finished)
+    
+    def show_tool_result(self, title, result, error):
+        """Report how an external tool run ended"""
+        self.tool_channel = None
+        if isinstance(error, ToolTimeout):
+            self.add_command_output(f"❌ {title} stopped: {error}")
+        elif error:
+            self.add_command_output(f"❌ Error: {error}")
+        elif result.returncode:
+            self.add_command_output(f"❌ {title} exited with code {result.returncode}")
+        else:
+            self.add_command_output(f"✅ {title} finished in {result.elapsed:.1f} s ({result.line_count} lines)")
+    
+    def analyze_me(self, bios_image):
+        """Return the ME analysis report lines for an image"""
+        if not bios_image:
+            return ["❌ Error: Image is not loaded"]
+        started = time.perf_counter()
+        try:
+            result = analyze_image_me(bios_image)
+        except (OSError, ValueError) as e:
+            return [f"❌ Analysis failed: {e}"]
+        if result is None:
+            lines = describe_me(None)
+        else:
+            base, info = result
+            lines = [f"ME region at 0x{base:X}"] + describe_me(info, base)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        lines.append(f"✅ Analysis completed in {elapsed_ms:.1f} ms")
+        return lines
+    
+    def add_command_lines(self, messages):
+        """Add several lines of command output with a single insert"""
+        self.console.write_lines(messages)
     
-    def simulate_command_output(self, messages, task_name):
-        """Simulate real-time command output with cancellation support"""
-        def output_messages():
-            self.task_cancelled = False
-            for i, msg in enumerate(messages):
-                if self.task_cancelled:
-                    # Task was cancelled, show cancellation message
-                    self.parent.after(0, lambda: self.add_command_output(f"❌ {task_name} task cancelled by user"))
-                    break
-                
-                # Schedule the message output
-                self.parent.after(i * 1000, lambda m=msg: self.add_command_output(m) if not self.task_cancelled else None)
-        
-        # Start the task thread
-        self.current_task_thread = threading.Thread(target=output_messages, daemon=True)
-        self.current_task_thread.start()
+    def show_command_result(self, lines, error):
+        """Render the report of a finished command (or the error it raised)"""
+        if error:
+            lines = [f"❌ Error: {error}"]
+        self.add_command_lines(lines)
     
     def get_widget(self):
         """Return the main container"""
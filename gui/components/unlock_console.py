@@ -3,10 +3,13 @@ Unlock console component - simplified like ME Clean Auto
 """
 
 import tkinter as tk
-from tkinter import scrolledtext
 from constants.app_config import AppConfig
+from functions.image_analysis import prepare_image_async
+from functions.image_hashing import format_hash_progress, format_rate
+from functions.task_engine import CancelToken, TaskCancelled, TaskSlot
+from gui.components.console_log import ConsoleLog
 from gui.components.modern_button import ModernButton
-import threading
+from gui.ui_dispatcher import get_ui_dispatcher, post_to_ui
 
 class UnlockConsole:
     def __init__(self, parent):
@@ -14,11 +17,14 @@ class UnlockConsole:
         self.file_info = {
             'filename': None,
             'device': 'Unknown',
-            'security': 'Unknown'
+            'security': 'Unknown',
+            'sha256': None,
+            'status': 'Ready'
         }
+        self.bios_image = None
         self.is_running_command = False
-        self.current_task_thread = None
-        self.task_cancelled = False
+        self.tasks = TaskSlot(dispatch=post_to_ui)  # The command writing to the console
+        self.hashing = None  # Cancel token of the image hash in progress
         
         self.create_console_panel()
     
@@ -52,19 +58,8 @@ class UnlockConsole:
         self.console_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
         # Console text area (shows status initially, then command output)
-        self.console_text = scrolledtext.ScrolledText(
-            self.console_frame,
-            height=12,
-            bg="#ffffff",
-            fg="#333333",
-            font=("Consolas", 9),
-            relief=tk.FLAT,
-            bd=0,
-            insertbackground="#333333",
-            state=tk.DISABLED,
-            wrap=tk.WORD
-        )
-        self.console_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.console = ConsoleLog(self.console_frame)
+        self.console.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Operations section
         ops_label = tk.Label(
@@ -149,29 +144,35 @@ class UnlockConsole:
     
     def show_default_status(self):
         """Show the default file status information (like ME Clean)"""
-        self.console_text.configure(state=tk.NORMAL)
-        self.console_text.delete(1.0, tk.END)
+        self.console.clear()
         
         # File information
         if self.file_info['filename']:
-            self.console_text.insert(tk.END, f"File: {self.file_info['filename']}\n")
+            self.console.append(f"File: {self.file_info['filename']}\n")
         else:
-            self.console_text.insert(tk.END, "No file selected\n")
-        
-        self.console_text.insert(tk.END, f"Device: {self.file_info['device']}\n")
-        self.console_text.insert(tk.END, f"Security: {self.file_info['security']}\n\n")
+            self.console.append("No file selected\n")
         
-        # Ready status in green
-        self.console_text.insert(tk.END, "Ready", "ready")
+        self.console.append(f"Device: {self.file_info['device']}\n")
+        self.console.append(f"Security: {self.file_info['security']}\n")
+        if self.file_info['sha256']:
+            self.console.append(f"SHA-256: {self.file_info['sha256']}\n")
+        self.console.append("\n")
         
-        # Configure green color for "Ready"
-        self.console_text.tag_configure("ready", foreground="#4caf50", font=("Consolas", 9, "bold"))
-        
-        self.console_text.configure(state=tk.DISABLED)
+        # Ready status in green (hashing progress while the image is prepared)
+        if self.file_info['status'] == 'Ready':
+            self.console.append("Ready", "ready")
+        else:
+            self.console.append(self.file_info['status'])
+        self.console.flush()
         self.is_running_command = False
     
-    def update_file_info(self, filepath, filename, reset_all=False):
+    def update_file_info(self, filepath, filename, reset_all=False, bios_image=None):
         """Update file information and refresh status display"""
+        self.cancel_hashing()
+        self.bios_image = bios_image if filepath and not reset_all else None
+        self.file_info['sha256'] = None
+        self.file_info['status'] = 'Ready'
+        
         if reset_all:
             self.stop_all_tasks()
             self.file_info['filename'] = None
@@ -182,6 +183,10 @@ class UnlockConsole:
             # Simulate file analysis
             self.file_info['device'] = 'Dell/HP System'
             self.file_info['security'] = 'Locked'
+            if bios_image and "hashes" not in bios_image.cache:
+                self.start_image_hashing(bios_image)
+            else:
+                self.file_info['sha256'] = self.describe_hashes(bios_image)
         else:
             self.file_info['filename'] = None
             self.file_info['device'] = 'Unknown'
@@ -191,19 +196,60 @@ class UnlockConsole:
         if not self.is_running_command or reset_all:
             self.show_default_status()
     
+    def describe_hashes(self, bios_image):
+        """Return the short SHA-256 line, or None before hashing finished"""
+        hashes = bios_image.cache.get("hashes") if bios_image else None
+        if not hashes:
+            return None
+        return f"{hashes.sha256[:16]}... ({format_rate(hashes.bytes_per_second)})"
+    
+    def start_image_hashing(self, bios_image):
+        """Hash the image on the worker pool and report throughput here"""
+        self.file_info['status'] = format_hash_progress(0, bios_image.size, 0)
+        self.hashing = cancel = CancelToken()
+        
+        def progress(done, total, rate):
+            get_ui_dispatcher().post_latest((self, "hash"), self.show_hash_progress, bios_image, done, total, rate)
+        
+        def finished(analysis, error):
+            post_to_ui(self.on_image_prepared, bios_image, error)
+        
+        prepare_image_async(bios_image, progress, finished, cancel)
+    
+    def cancel_hashing(self):
+        """Stop hashing the previous image (within one chunk)"""
+        if self.hashing is not None:
+            self.hashing.cancel()
+            self.hashing = None
+    
+    def show_hash_progress(self, bios_image, done, total, rate):
+        """Show hashing progress for the current image"""
+        if bios_image is not self.bios_image:
+            return  # A newer file was dropped meanwhile
+        self.file_info['status'] = format_hash_progress(done, total, rate)
+        if not self.is_running_command:
+            self.show_default_status()
+    
+    def on_image_prepared(self, bios_image, error):
+        """Fill in the analysis once hashing has finished"""
+        if bios_image is not self.bios_image or isinstance(error, TaskCancelled):
+            return
+        if error:
+            self.file_info['status'] = f"❌ Analysis failed: {error}"
+        else:
+            self.file_info['sha256'] = self.describe_hashes(bios_image)
+            self.file_info['status'] = 'Ready'
+        if not self.is_running_command:
+            self.show_default_status()
+    
     def add_console_output(self, message):
         """Add message to console (read-only)"""
-        self.console_text.configure(state=tk.NORMAL)
-        self.console_text.insert(tk.END, f"> {message}\n")
-        self.console_text.see(tk.END)
-        self.console_text.configure(state=tk.DISABLED)
+        self.console.write(message)
     
     def start_command_mode(self):
         """Switch to command output mode"""
         self.is_running_command = True
-        self.console_text.configure(state=tk.NORMAL)
-        self.console_text.delete(1.0, tk.END)
-        self.console_text.configure(state=tk.DISABLED)
+        self.console.clear()
     
     def clear_console(self):
         """Clear console and return to default status view"""
@@ -211,14 +257,9 @@ class UnlockConsole:
         self.show_default_status()
     
     def stop_all_tasks(self):
-        """Stop all running tasks"""
-        self.task_cancelled = True
+        """Cancel the running command; its engines stop within one chunk"""
+        self.tasks.cancel()
         self.is_running_command = False
-        
-        if self.current_task_thread and self.current_task_thread.is_alive():
-            self.task_cancelled = True
-        
-        self.current_task_thread = None
     
     def run_unlock_operation(self, operation_name, messages):
         """Run an unlock operation with console output"""
@@ -234,18 +275,24 @@ class UnlockConsole:
         self.simulate_command_output(messages, operation_name)
     
     def simulate_command_output(self, messages, task_name):
-        """Simulate real-time command output"""
-        def output_messages():
-            self.task_cancelled = False
+        """Simulate real-time command output with cancellation support
+        
+        Messages are paced on a task-engine worker and handed to the UI one
+        at a time, so cancelling (or starting another task) stops the
+        output at the next message.
+        """
+        def output_messages(task):
             for i, msg in enumerate(messages):
-                if self.task_cancelled:
-                    self.parent.after(0, lambda: self.add_console_output(f"❌ {task_name} cancelled by user"))
-                    break
-                
-                self.parent.after(i * 800, lambda m=msg: self.add_console_output(m) if not self.task_cancelled else None)
+                if i and task.token.wait(0.8):
+                    return
+                task.report(msg)
         
-        self.current_task_thread = threading.Thread(target=output_messages, daemon=True)
-        self.current_task_thread.start()
+        self.tasks.start(output_messages, name=task_name, on_progress=self.add_console_output, on_done=self.on_task_done)
+    
+    def on_task_done(self, result, error):
+        """Report a task that failed outright"""
+        if error:
+            self.add_console_output(f"❌ Error: {error}")
     
     # Operation button handlers
     def dell_st_fix(self):
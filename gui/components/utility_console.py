@@ -3,10 +3,16 @@ Utility console component - similar to unlock console
 """
 
 import tkinter as tk
-from tkinter import scrolledtext
 from constants.app_config import AppConfig
+from functions.image_analysis import describe_regions, prepare_image_async
+from functions.image_hashing import format_hash_progress, format_rate
+from functions.signature_scanner import read_fit_pointer, summarize_hits
+from functions.process_pool import get_process_backend
+from functions.uefi_volume import describe_module_index, describe_volumes, get_firmware_volumes
+from functions.task_engine import CancelToken, TaskCancelled, TaskSlot
+from gui.components.console_log import ConsoleLog
 from gui.components.modern_button import ModernButton
-import threading
+from gui.ui_dispatcher import get_ui_dispatcher, post_to_ui
 
 class UtilityConsole:
     def __init__(self, parent):
@@ -14,11 +20,14 @@ class UtilityConsole:
         self.file_info = {
             'filename': None,
             'size': 'Unknown',
-            'type': 'Unknown'
+            'type': 'Unknown',
+            'sha256': None,
+            'status': 'Ready'
         }
+        self.bios_image = None
         self.is_running_command = False
-        self.current_task_thread = None
-        self.task_cancelled = False
+        self.tasks = TaskSlot(dispatch=post_to_ui)  # The command writing to the console
+        self.hashing = None  # Cancel token of the image hash in progress
         
         self.create_console_panel()
     
@@ -52,19 +61,8 @@ class UtilityConsole:
         self.console_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
         # Console text area
-        self.console_text = scrolledtext.ScrolledText(
-            self.console_frame,
-            height=12,
-            bg="#ffffff",
-            fg="#333333",
-            font=("Consolas", 9),
-            relief=tk.FLAT,
-            bd=0,
-            insertbackground="#333333",
-            state=tk.DISABLED,
-            wrap=tk.WORD
-        )
-        self.console_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.console = ConsoleLog(self.console_frame)
+        self.console.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Operations section
         ops_label = tk.Label(
@@ -92,13 +90,13 @@ class UtilityConsole:
         button_configs = [
             # Row 1
             [
-                ("#f44336", "UEFI Replace", self.uefi_replace, "Replace UEFI modules in BIOS"),
+                ("#f44336", "UEFI Replace", self.uefi_replace, "Index UEFI modules (replacing is not implemented yet)"),
                 ("#9c27b0", "UEFI View", self.uefi_view, "View UEFI modules in BIOS")
             ],
             # Row 2
             [
                 ("#ff9800", "RAM Disable", self.ram_disable, "Disable RAM checks in BIOS"),
-                ("#8bc34a", "Sanitize BIOS", self.sanitize_bios, "Remove sensitive data from BIOS")
+                ("#8bc34a", "Sanitize BIOS", self.sanitize_bios, "Scan for DMI/SMBIOS data (removing is not implemented yet)")
             ],
             # Row 3
             [
@@ -153,29 +151,35 @@ class UtilityConsole:
     
     def show_default_status(self):
         """Show the default file status information"""
-        self.console_text.configure(state=tk.NORMAL)
-        self.console_text.delete(1.0, tk.END)
+        self.console.clear()
         
         # File information
         if self.file_info['filename']:
-            self.console_text.insert(tk.END, f"File: {self.file_info['filename']}\n")
+            self.console.append(f"File: {self.file_info['filename']}\n")
         else:
-            self.console_text.insert(tk.END, "No file selected\n")
-        
-        self.console_text.insert(tk.END, f"Size: {self.file_info['size']}\n")
-        self.console_text.insert(tk.END, f"Type: {self.file_info['type']}\n\n")
-        
-        # Ready status in green
-        self.console_text.insert(tk.END, "Ready", "ready")
+            self.console.append("No file selected\n")
         
-        # Configure green color for "Ready"
-        self.console_text.tag_configure("ready", foreground="#4caf50", font=("Consolas", 9, "bold"))
+        self.console.append(f"Size: {self.file_info['size']}\n")
+        self.console.append(f"Type: {self.file_info['type']}\n")
+        if self.file_info['sha256']:
+            self.console.append(f"SHA-256: {self.file_info['sha256']}\n")
+        self.console.append("\n")
         
-        self.console_text.configure(state=tk.DISABLED)
+        # Ready status in green (hashing progress while the image is prepared)
+        if self.file_info['status'] == 'Ready':
+            self.console.append("Ready", "ready")
+        else:
+            self.console.append(self.file_info['status'])
+        self.console.flush()
         self.is_running_command = False
     
-    def update_file_info(self, filepath, filename, reset_all=False):
+    def update_file_info(self, filepath, filename, reset_all=False, bios_image=None):
         """Update file information and refresh status display"""
+        self.cancel_hashing()
+        self.bios_image = bios_image if filepath and not reset_all else None
+        self.file_info['sha256'] = None
+        self.file_info['status'] = 'Ready'
+        
         if reset_all:
             self.stop_all_tasks()
             self.file_info['filename'] = None
@@ -183,12 +187,21 @@ class UtilityConsole:
             self.file_info['type'] = 'Unknown'
         elif filepath:
             self.file_info['filename'] = filename
-            # Simulate file analysis
-            import os
-            size_bytes = os.path.getsize(filepath)
+            # Size comes from the shared mapping when available
+            if bios_image:
+                size_bytes = bios_image.size
+            else:
+                import os
+                size_bytes = os.path.getsize(filepath)
             size_mb = size_bytes / (1024 * 1024)
             self.file_info['size'] = f"{size_mb:.2f} MB"
-            self.file_info['type'] = 'BIOS Binary'
+            if bios_image and "analysis" not in bios_image.cache:
+                # Hash and analyze off the Tk thread; the type fills in when done
+                self.file_info['type'] = 'Analyzing...'
+                self.start_image_hashing(bios_image)
+            else:
+                self.file_info['type'] = self.describe_type(bios_image)
+                self.file_info['sha256'] = self.describe_hashes(bios_image)
         else:
             self.file_info['filename'] = None
             self.file_info['size'] = 'Unknown'
@@ -198,19 +211,72 @@ class UtilityConsole:
         if not self.is_running_command or reset_all:
             self.show_default_status()
     
+    def describe_type(self, bios_image):
+        """Describe the image type from the cached image analysis"""
+        if not bios_image or "analysis" not in bios_image.cache:
+            return 'BIOS Binary'
+        return describe_regions(bios_image.cache["analysis"])
+    
+    def describe_hashes(self, bios_image):
+        """Return the short SHA-256 line, or None before hashing finished"""
+        hashes = bios_image.cache.get("hashes") if bios_image else None
+        if not hashes:
+            return None
+        return f"{hashes.sha256[:16]}... ({format_rate(hashes.bytes_per_second)})"
+    
+    def start_image_hashing(self, bios_image):
+        """Hash the image on the worker pool and report throughput here"""
+        self.file_info['status'] = format_hash_progress(0, bios_image.size, 0)
+        self.hashing = cancel = CancelToken()
+        
+        def progress(done, total, rate):
+            get_ui_dispatcher().post_latest((self, "hash"), self.show_hash_progress, bios_image, done, total, rate)
+        
+        def finished(analysis, error):
+            post_to_ui(self.on_image_prepared, bios_image, error)
+        
+        prepare_image_async(bios_image, progress, finished, cancel)
+    
+    def cancel_hashing(self):
+        """Stop hashing the previous image (within one chunk)"""
+        if self.hashing is not None:
+            self.hashing.cancel()
+            self.hashing = None
+    
+    def show_hash_progress(self, bios_image, done, total, rate):
+        """Show hashing progress for the current image"""
+        if bios_image is not self.bios_image:
+            return  # A newer file was dropped meanwhile
+        self.file_info['status'] = format_hash_progress(done, total, rate)
+        if not self.is_running_command:
+            self.show_default_status()
+    
+    def on_image_prepared(self, bios_image, error):
+        """Fill in the image type once hashing and analysis have finished"""
+        if bios_image is not self.bios_image or isinstance(error, TaskCancelled):
+            return
+        if error:
+            self.file_info['type'] = 'BIOS Binary'
+            self.file_info['status'] = f"❌ Analysis failed: {error}"
+        else:
+            self.file_info['type'] = self.describe_type(bios_image)
+            self.file_info['sha256'] = self.describe_hashes(bios_image)
+            self.file_info['status'] = 'Ready'
+        if not self.is_running_command:
+            self.show_default_status()
+    
     def add_console_output(self, message):
         """Add message to console (read-only)"""
-        self.console_text.configure(state=tk.NORMAL)
-        self.console_text.insert(tk.END, f"> {message}\n")
-        self.console_text.see(tk.END)
-        self.console_text.configure(state=tk.DISABLED)
+        self.console.write(message)
+    
+    def add_console_lines(self, messages):
+        """Add several messages to the console in one update"""
+        self.console.write_lines(messages)
     
     def start_command_mode(self):
         """Switch to command output mode"""
         self.is_running_command = True
-        self.console_text.configure(state=tk.NORMAL)
-        self.console_text.delete(1.0, tk.END)
-        self.console_text.configure(state=tk.DISABLED)
+        self.console.clear()
     
     def clear_console(self):
         """Clear console and return to default status view"""
@@ -218,16 +284,11 @@ class UtilityConsole:
         self.show_default_status()
     
     def stop_all_tasks(self):
-        """Stop all running tasks"""
-        self.task_cancelled = True
+        """Cancel the running command; its engines stop within one chunk"""
+        self.tasks.cancel()
         self.is_running_command = False
-        
-        if self.current_task_thread and self.current_task_thread.is_alive():
-            self.task_cancelled = True
-        
-        self.current_task_thread = None
     
-    def run_utility_operation(self, operation_name, messages):
+    def run_utility_operation(self, operation_name, messages, prepare=None):
         """Run a utility operation with console output"""
         if not self.file_info['filename']:
             self.start_command_mode()
@@ -238,44 +299,77 @@ class UtilityConsole:
         self.start_command_mode()
         self.add_console_output(f"🔧 Starting {operation_name}...")
         
-        self.simulate_command_output(messages, operation_name)
+        self.simulate_command_output(messages, operation_name, prepare)
     
-    def simulate_command_output(self, messages, task_name):
-        """Simulate real-time command output"""
-        def output_messages():
-            self.task_cancelled = False
+    def simulate_command_output(self, messages, task_name, prepare=None):
+        """Simulate real-time command output with cancellation support
+        
+        Messages are paced on a task-engine worker and handed to the UI one
+        at a time, so cancelling (or starting another task) stops the
+        output at the next message.
+        
+        prepare is an optional callable run on the worker with the task's
+        cancel token; its returned lines are shown at once, before the
+        messages, without the pacing.
+        """
+        def output_messages(task):
+            if prepare:
+                task.report(prepare(task.token))
             for i, msg in enumerate(messages):
-                if self.task_cancelled:
-                    self.parent.after(0, lambda: self.add_console_output(f"❌ {task_name} cancelled by user"))
-                    break
-                
-                self.parent.after(i * 800, lambda m=msg: self.add_console_output(m) if not self.task_cancelled else None)
+                if i and task.token.wait(0.8):
+                    return
+                task.report([msg])
         
-        self.current_task_thread = threading.Thread(target=output_messages, daemon=True)
-        self.current_task_thread.start()
+        self.tasks.start(output_messages, name=task_name, on_progress=self.add_console_lines, on_done=self.on_task_done)
+    
+    def on_task_done(self, result, error):
+        """Report a task that failed outright"""
+        if error:
+            self.add_console_output(f"❌ Error: {error}")
+    
+    def scan_markers(self, names, cancel=None):
+        """Find the named firmware markers in a single pass over the image"""
+        if not self.bios_image:
+            return []
+        return get_process_backend().run(summarize_hits, self.bios_image, names, cancel=cancel)
+    
+    def list_firmware_volumes(self, cancel=None):
+        """List firmware volumes and their FFS files (headers only)"""
+        if not self.bios_image:
+            return []
+        lines = ["Reading BIOS structure..."]
+        volumes = get_firmware_volumes(self.bios_image, cancel)
+        if not volumes:
+            lines.append("No UEFI firmware volumes found")
+            return lines
+        fit_offset = read_fit_pointer(self.bios_image)
+        if fit_offset is not None:
+            lines.append(f"FIT table at 0x{fit_offset:X}")
+        lines.extend(describe_volumes(volumes))
+        return lines
+    
+    def index_modules(self, cancel=None):
+        """Inflate every compressed section once and count the UEFI modules"""
+        if not self.bios_image:
+            return []
+        # Decompression holds the GIL; a worker process keeps the window responsive
+        return get_process_backend().run(describe_module_index, self.bios_image, cancel=cancel)
     
     # Operation button handlers
     def uefi_replace(self):
-        """UEFI Replace operation"""
+        """UEFI Replace operation (module index only; nothing is replaced yet)"""
         messages = [
-            "Initializing UEFI Replace...",
-            "Scanning BIOS structure...",
-            "Identifying UEFI modules...",
-            "Replacing UEFI modules...",
-            "✅ UEFI Replace completed successfully!"
+            "✅ UEFI module index completed",
+            "Module replacement is not implemented yet; the image was not changed"
         ]
-        self.run_utility_operation("UEFI Replace", messages)
+        self.run_utility_operation("UEFI module index", messages, self.index_modules)
     
     def uefi_view(self):
         """UEFI View operation"""
         messages = [
-            "Starting UEFI View...",
-            "Reading BIOS structure...",
-            "Extracting UEFI modules...",
-            "Listing UEFI components...",
             "✅ UEFI View completed!"
         ]
-        self.run_utility_operation("UEFI View", messages)
+        self.run_utility_operation("UEFI View", messages, self.list_firmware_volumes)
     
     def ram_disable(self):
         """RAM Disable operation"""
@@ -289,15 +383,12 @@ class UtilityConsole:
         self.run_utility_operation("RAM Disable", messages)
     
     def sanitize_bios(self):
-        """Sanitize BIOS operation"""
+        """Sanitize BIOS operation (scan only; nothing is removed yet)"""
         messages = [
-            "Starting BIOS Sanitization...",
-            "Scanning for sensitive data...",
-            "Removing serial numbers...",
-            "Clearing identifiers...",
-            "✅ BIOS Sanitization completed!"
+            "✅ Sensitive data scan completed",
+            "Removing serial numbers and identifiers is not implemented yet; the image was not changed"
         ]
-        self.run_utility_operation("Sanitize BIOS", messages)
+        self.run_utility_operation("Sanitize scan", messages, lambda cancel: self.scan_markers(["HP_DMI", "SMBIOS", "SM", "SM3"], cancel))
     
     def me_analyzer(self):
         """ME Analyzer operation"""
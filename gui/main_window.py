@@ -2,27 +2,47 @@
 Main window GUI implementation using tkinter with modern design
 """
 
+import importlib
+import os
+import sys
+import time
 import tkinter as tk
 import tkinterdnd2 as tkdnd
 from constants.app_config import AppConfig
 from functions.app_functions import AppFunctions
+from functions.bios_image import BiosImageSession
+from functions.process_pool import shutdown_process_backend
 from gui.components.modern_button import ModernButton
 from gui.components.modern_frame import ModernFrame
-from gui.screens.home_screen import HomeScreen
-from gui.screens.me_clean_screen import MECleanScreen
-from gui.screens.unlock_screen import UnlockScreen
-from gui.screens.utility_screen import UtilityScreen
-from gui.screens.hp_dmi_screen import HPDMIScreen
+from gui.ui_dispatcher import get_ui_dispatcher
+
+# Screens are imported and constructed on first visit:
+# screen id -> (module, class, takes the shared image session)
+SCREEN_CLASSES = {
+    "home": ("gui.screens.home_screen", "HomeScreen", False),
+    "me_clean": ("gui.screens.me_clean_screen", "MECleanScreen", True),
+    "unlock": ("gui.screens.unlock_screen", "UnlockScreen", True),
+    "utility": ("gui.screens.utility_screen", "UtilityScreen", True),
+    "hp_dmi": ("gui.screens.hp_dmi_screen", "HPDMIScreen", True),
+}
 
 class MainWindow:
-    def __init__(self):
+    def __init__(self, started=None):
+        self.started = started if started is not None else time.perf_counter()
         self.root = tkdnd.Tk()  # Use tkinterdnd2 Tk for drag & drop support
+        get_ui_dispatcher().start(self.root)  # Worker threads reach Tk only through this
         self.functions = AppFunctions()
+        self.image_session = BiosImageSession()  # One mapping per BIOS file, shared by all screens
+        self.screens = {}
         self.current_screen = None
+        self.current_screen_id = None
         self.active_button = None
+        self.startup_ms = None
         self.setup_window()
         self.create_widgets()
         self.show_screen("home")  # Show home screen by default
+        self.root.after_idle(self.on_first_paint)
+        self.root.after_idle(self.start_job_queues)
     
     def setup_window(self):
         """Configure the main window"""
@@ -33,6 +53,9 @@ class MainWindow:
         
         # Center the window
         self.root.eval('tk::PlaceWindow . center')
+        
+        # Release mapped BIOS images on exit
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
     
     def create_widgets(self):
         """Create and place GUI widgets with modern design"""
@@ -80,29 +103,40 @@ class MainWindow:
         # Content area
         self.content_frame = ModernFrame(main_container)
         self.content_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=15)
-        
-        # Initialize screens
-        self.screens = {
-            "home": HomeScreen(self.content_frame),
-            "me_clean": MECleanScreen(self.content_frame),
-            "unlock": UnlockScreen(self.content_frame),
-            "utility": UtilityScreen(self.content_frame),
-            "hp_dmi": HPDMIScreen(self.content_frame)
-        }
+    
+    def get_screen(self, screen_id):
+        """Return the screen object, importing and constructing it on first use"""
+        screen = self.screens.get(screen_id)
+        if screen is None:
+            module_name, class_name, uses_session = SCREEN_CLASSES[screen_id]
+            screen_class = getattr(importlib.import_module(module_name), class_name)
+            if uses_session:
+                screen = screen_class(self.content_frame, self.image_session)
+            else:
+                screen = screen_class(self.content_frame)
+            self.screens[screen_id] = screen
+        return screen
     
     def show_screen(self, screen_id):
         """Switch to the specified screen with modern transitions"""
-        # Hide current screen
+        # Hide current screen (screens with on_hide pause their timers)
         if self.current_screen:
             self.current_screen.pack_forget()
+            previous = self.screens.get(self.current_screen_id)
+            if previous is not None and hasattr(previous, "on_hide"):
+                previous.on_hide()
         
         # Reset ALL buttons to inactive first
         for btn_id, btn in self.nav_buttons.items():
             btn.set_active(False)
         
         # Show new screen
-        self.current_screen = self.screens[screen_id].create_screen()
+        screen = self.get_screen(screen_id)
+        self.current_screen = screen.create_screen()
         self.current_screen.pack(fill=tk.BOTH, expand=True)
+        self.current_screen_id = screen_id
+        if hasattr(screen, "on_show"):
+            screen.on_show()
         
         # Set active button
         self.active_button = self.nav_buttons[screen_id]
@@ -111,6 +145,28 @@ class MainWindow:
         # Force update the display
         self.root.update_idletasks()
     
+    def on_first_paint(self):
+        """Record the cold start time once the first screen is drawn
+        
+        Set BIOS_TOOLKIT_TIMING=1 to print it.
+        """
+        self.startup_ms = (time.perf_counter() - self.started) * 1000
+        if os.environ.get(AppConfig.STARTUP_TIMING_ENV):
+            print(f"Startup: {self.startup_ms:.0f} ms to first paint", file=sys.stderr)
+    
+    def start_job_queues(self):
+        """Resume the BUILD jobs restored from the journal, whichever screen is open"""
+        from functions.job_queue import get_build_queue  # Loads the ME Clean engine: after first paint
+        
+        get_build_queue().start()
+    
+    def on_close(self):
+        """Release shared resources and close the window"""
+        get_ui_dispatcher().stop()
+        shutdown_process_backend()
+        self.image_session.close_all()
+        self.root.destroy()
+    
     def run(self):
         """Start the GUI application"""
         self.root.mainloop()
\ No newline at end of file
@@ -19,10 +19,7 @@ class HomeScreen:
     def create_screen(self):
         """Create the home screen with full-screen slideshow"""
         if self.frame:
-            # Stop previous slideshow if exists
-            if self.slideshow:
-                self.slideshow.stop_auto_slideshow()
-            self.frame.destroy()
+            return self.frame  # Slides and PhotoImages are kept; show_screen resumes the timer
         
         self.frame = ModernFrame(self.parent)
         
@@ -35,7 +32,7 @@ class HomeScreen:
         slideshow_container.pack(fill=tk.BOTH, expand=True)
         
         # Create slideshow
-        self.slideshow = Slideshow(slideshow_container)
+        self.slideshow = Slideshow(slideshow_container, on_change=self.update_counter)
         slideshow_frame = self.slideshow.get_frame()
         slideshow_frame.pack(fill=tk.BOTH, expand=True)
         
@@ -115,9 +112,8 @@ class HomeScreen:
         spacer_frame.pack(fill=tk.X, side=tk.BOTTOM)
         spacer_frame.pack_propagate(False)
         
-        # Update counter initially and set up periodic updates
+        # Counter follows the slideshow through its on_change callback
         self.update_counter()
-        self.schedule_counter_update()
         
         return self.frame
     
@@ -125,13 +121,11 @@ class HomeScreen:
         """Navigate to previous slide"""
         if self.slideshow:
             self.slideshow.previous_image()
-            self.update_counter()
     
     def next_slide(self):
         """Navigate to next slide"""
         if self.slideshow:
             self.slideshow.next_image()
-            self.update_counter()
     
     def update_counter(self):
         """Update the slide counter"""
@@ -139,9 +133,12 @@ class HomeScreen:
             counter_text = self.slideshow.get_current_info()
             self.counter_label.configure(text=counter_text)
     
-    def schedule_counter_update(self):
-        """Schedule periodic counter updates for auto-slideshow"""
-        if self.frame and self.frame.winfo_exists():
-            self.update_counter()
-            # Schedule next update
-            self.frame.after(100, self.schedule_counter_update)
\ No newline at end of file
+    def on_show(self):
+        """Resume the slideshow when Home becomes visible"""
+        if self.slideshow:
+            self.slideshow.resume()
+    
+    def on_hide(self):
+        """Pause the slideshow timer while another screen is shown"""
+        if self.slideshow:
+            self.slideshow.pause()
\ No newline at end of file
@@ -3,22 +3,30 @@ HP DMI screen implementation with source/target drag & drop
 """
 
 import tkinter as tk
-from tkinter import scrolledtext
+from tkinter import filedialog
 from constants.app_config import AppConfig
-from functions.hp_dmi_functions import HPDMIFunctions
+from functions.hp_dmi_functions import (
+    BatchItem, DMIError, HPDMIFunctions, describe_batch_outcome, describe_copy_result, read_batch_csv
+)
+from gui.components.console_log import ConsoleLog
+from functions.task_engine import TaskSlot
 from gui.components.modern_button import ModernButton
 from gui.components.modern_frame import ModernFrame
 from gui.components.dmi_drag_drop import DMIDragDropWidget
-import threading
+from gui.ui_dispatcher import post_to_ui
+import time
 
 class HPDMIScreen:
-    def __init__(self, parent):
+    def __init__(self, parent, image_session=None):
         self.parent = parent
+        self.image_session = image_session
         self.functions = HPDMIFunctions()
         self.frame = None
         self.source_drag_drop = None
         self.target_drag_drop = None
-        self.console_text = None
+        self.console = None
+        self.copy_task = TaskSlot(dispatch=post_to_ui)
+        self.batch_task = TaskSlot(dispatch=post_to_ui)
     
     def create_screen(self):
         """Create the HP DMI screen"""
@@ -38,7 +46,8 @@ class HPDMIScreen:
         self.source_drag_drop = DMIDragDropWidget(
             source_container,
             label_text="Source File",
-            on_file_selected=self.on_source_selected
+            on_file_selected=self.on_source_selected,
+            image_session=self.image_session
         )
         source_widget = self.source_drag_drop.get_widget()
         source_widget.pack(fill=tk.BOTH, expand=True)
@@ -50,7 +59,8 @@ class HPDMIScreen:
         self.target_drag_drop = DMIDragDropWidget(
             target_container,
             label_text="Target File",
-            on_file_selected=self.on_target_selected
+            on_file_selected=self.on_target_selected,
+            image_session=self.image_session
         )
         target_widget = self.target_drag_drop.get_widget()
         target_widget.pack(fill=tk.BOTH, expand=True)
@@ -95,6 +105,33 @@ class HPDMIScreen:
         )
         self.copy_button.pack(pady=10)
         
+        # Batch buttons
+        self.batch_button = ModernButton(
+            buttons_container,
+            text="Batch Targets",
+            command=self.batch_copy_targets,
+            tooltip="Copy the Source DMI data into several target files",
+            bg="#8bc34a",
+            fg="#000000",
+            padx=20,
+            pady=10,
+            width=15
+        )
+        self.batch_button.pack(pady=10)
+        
+        self.csv_button = ModernButton(
+            buttons_container,
+            text="Batch CSV",
+            command=self.batch_copy_csv,
+            tooltip="Copy DMI data for source,target pairs listed in a CSV file",
+            bg="#8bc34a",
+            fg="#000000",
+            padx=20,
+            pady=10,
+            width=15
+        )
+        self.csv_button.pack(pady=10)
+        
         # Clear button
         self.clear_button = ModernButton(
             buttons_container,
@@ -134,19 +171,8 @@ class HPDMIScreen:
         console_display.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Console text area
-        self.console_text = scrolledtext.ScrolledText(
-            console_display,
-            height=10,
-            bg="#ffffff",
-            fg="#333333",
-            font=("Consolas", 9),
-            relief=tk.FLAT,
-            bd=0,
-            insertbackground="#333333",
-            state=tk.DISABLED,
-            wrap=tk.WORD
-        )
-        self.console_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.console = ConsoleLog(console_display, height=10)
+        self.console.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Initialize console
         self.add_console_message("Ready", "ready")
@@ -155,34 +181,26 @@ class HPDMIScreen:
     
     def on_source_selected(self, filepath, filename):
         """Handle source file selection"""
-        self.add_console_message(f"Source file selected: {filename}", "info")
+        self.add_console_message(f"Source file selected: {filename}{self.describe_image(self.source_drag_drop)}", "info")
     
     def on_target_selected(self, filepath, filename):
         """Handle target file selection"""
-        self.add_console_message(f"Target file selected: {filename}", "info")
+        self.add_console_message(f"Target file selected: {filename}{self.describe_image(self.target_drag_drop)}", "info")
+    
+    def describe_image(self, drag_drop):
+        """Return a short size suffix for a mapped image"""
+        image = drag_drop.get_bios_image() if drag_drop else None
+        if not image:
+            return ""
+        return f" ({image.size / (1024 * 1024):.2f} MB)"
     
     def add_console_message(self, message, msg_type="normal"):
         """Add message to console"""
-        self.console_text.configure(state=tk.NORMAL)
-        
         if msg_type == "ready":
-            self.console_text.delete(1.0, tk.END)
-            self.console_text.insert(tk.END, message, "ready")
-            self.console_text.tag_configure("ready", foreground="#4caf50", font=("Consolas", 9, "bold"))
-        elif msg_type == "error":
-            self.console_text.insert(tk.END, f"> {message}\n", "error")
-            self.console_text.tag_configure("error", foreground="#f44336")
-        elif msg_type == "success":
-            self.console_text.insert(tk.END, f"> {message}\n", "success")
-            self.console_text.tag_configure("success", foreground="#4caf50")
-        elif msg_type == "info":
-            self.console_text.insert(tk.END, f"> {message}\n", "info")
-            self.console_text.tag_configure("info", foreground="#2196F3")
+            self.console.clear()
+            self.console.append(message, "ready")
         else:
-            self.console_text.insert(tk.END, f"> {message}\n")
-        
-        self.console_text.see(tk.END)
-        self.console_text.configure(state=tk.DISABLED)
+            self.console.write(message, msg_type)
     
     def dmi_copy(self):
         """Perform DMI copy operation"""
@@ -198,32 +216,97 @@ class HPDMIScreen:
             return
         
         # Clear console for operation
-        self.console_text.configure(state=tk.NORMAL)
-        self.console_text.delete(1.0, tk.END)
-        self.console_text.configure(state=tk.DISABLED)
+        self.console.clear()
         
         # Start DMI copy operation
         self.add_console_message("🔄 Starting DMI Copy...", "info")
         
-        # Simulate operation with threading
-        def run_copy():
-            messages = [
-                ("Reading source DMI data...", "normal"),
-                ("Extracting DMI information...", "normal"),
-                ("Validating target file...", "normal"),
-                ("Writing DMI to target...", "normal"),
-                ("Verifying DMI copy...", "success"),
-                ("✅ DMI Copy completed successfully!", "success")
-            ]
-            
-            for i, (msg, msg_type) in enumerate(messages):
-                self.frame.after(i * 800, lambda m=msg, t=msg_type: self.add_console_message(m, t))
-        
-        thread = threading.Thread(target=run_copy, daemon=True)
-        thread.start()
+        source_image = self.source_drag_drop.get_bios_image()
+        target_image = self.target_drag_drop.get_bios_image()
+        
+        if not source_image or not target_image:
+            self.add_console_message("❌ Error: Could not open the selected images", "error")
+            return
+        
+        # Locate and splice the DMI block off the UI thread
+        def run_copy(task):
+            return describe_copy_result(self.functions.write_dmi_data(source_image, target_image))
+        
+        self.copy_task.start(run_copy, name="DMI Copy", on_done=self.show_copy_result)
+    
+    def show_copy_result(self, messages, error):
+        if error:
+            messages = [(f"❌ Error: {error}", "error")]
+        self.show_messages(messages)
+    
+    def batch_copy_targets(self):
+        """Stamp the source DMI data onto several selected target files"""
+        source_file = self.source_drag_drop.get_selected_filepath()
+        if not source_file:
+            self.add_console_message("❌ Error: No source file selected!", "error")
+            return
+        
+        target_files = filedialog.askopenfilenames(
+            title="Select Target Files",
+            filetypes=[("Binary files", "*.bin"), ("All files", "*.*")]
+        )
+        if target_files:
+            self.run_batch([BatchItem(source_file, target, None) for target in target_files])
+    
+    def batch_copy_csv(self):
+        """Run the source,target pairs listed in a CSV file"""
+        csv_file = filedialog.askopenfilename(
+            title="Select Batch CSV",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not csv_file:
+            return
+        try:
+            items = read_batch_csv(csv_file)
+        except (DMIError, OSError, UnicodeDecodeError) as e:
+            self.add_console_message(f"❌ Error: {e}", "error")
+            return
+        if not items:
+            self.add_console_message("❌ Error: The CSV file lists no source/target pairs", "error")
+            return
+        self.run_batch(items)
+    
+    def run_batch(self, items):
+        """Run a DMI batch on the process pool, streaming results to the console"""
+        if self.batch_task.is_running:
+            self.add_console_message("A batch is already running", "info")
+            return
+        
+        self.console.clear()
+        self.add_console_message(f"🔄 Starting batch DMI Copy ({len(items)} files)...", "info")
+        
+        def run(task):
+            started = time.perf_counter()
+            outcomes = self.functions.batch_copy(
+                items, lambda outcome: task.report(*describe_batch_outcome(outcome)), cancel=task.token
+            )
+            failed = sum(1 for outcome in outcomes if outcome.error)
+            return (f"Batch finished: {len(outcomes) - failed} copied, {failed} failed "
+                    f"in {time.perf_counter() - started:.1f} s", "error" if failed else "success")
+        
+        self.batch_task.start(run, name="DMI batch", on_progress=self.add_console_message, on_done=self.finish_batch)
+    
+    def finish_batch(self, summary, error):
+        if error:
+            summary = (f"❌ Batch failed: {error}", "error")
+        self.add_console_message(*summary)
+    
+    def show_messages(self, messages):
+        """Add (message, type) pairs to the console"""
+        for message, msg_type in messages:
+            self.add_console_message(message, msg_type)
     
     def clear_all(self):
         """Clear all selections and reset"""
+        # Stop running copies; targets not yet written are left untouched
+        self.copy_task.cancel()
+        self.batch_task.cancel()
+        
         # Reset drag & drop widgets
         if self.source_drag_drop:
             self.source_drag_drop.reset_file()
@@ -232,9 +315,7 @@ class HPDMIScreen:
             self.target_drag_drop.reset_file()
         
         # Clear console
-        self.console_text.configure(state=tk.NORMAL)
-        self.console_text.delete(1.0, tk.END)
-        self.console_text.configure(state=tk.DISABLED)
+        self.console.clear()
         
         # Show ready message
         self.add_console_message("Ready", "ready")
@@ -3,16 +3,16 @@ ME Clean screen implementation with instant tab switching using top navigation s
 """
 
 import tkinter as tk
+from tkinter import filedialog
 from constants.app_config import AppConfig
 from functions.me_clean_functions import MECleanFunctions
 from gui.components.modern_frame import ModernFrame
 from gui.components.modern_button import ModernButton
-from gui.components.drag_drop import DragDropWidget
-from gui.components.status_panel import StatusPanel
 
 class MECleanScreen:
-    def __init__(self, parent):
+    def __init__(self, parent, image_session=None):
         self.parent = parent
+        self.image_session = image_session
         self.functions = MECleanFunctions()
         self.frame = None
         self.current_tab = None
@@ -20,7 +20,9 @@ class MECleanScreen:
         self.tab_buttons = {}
         self.tab_screens = {}
         self.content_frame = None
+        self.tab_builders = {}
         self.status_panel = None
+        self.batch_panel = None
     
     def create_screen(self):
         """Create the ME Clean screen with instant tab switching"""
@@ -45,7 +47,7 @@ class MECleanScreen:
         self.content_frame = ModernFrame(self.frame)
         self.content_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=15)
         
-        # Initialize all tab screens immediately
+        # Tab screens are built on first visit
         self.initialize_tab_screens()
         
         # Show default tab (Auto)
@@ -81,18 +83,24 @@ class MECleanScreen:
             self.tab_buttons[tab_id] = btn
     
     def initialize_tab_screens(self):
-        """Initialize all tab screens immediately for instant switching"""
-        # Auto tab screen
-        self.tab_screens["auto"] = self.create_auto_screen()
-        
-        # FITC tab screen
-        self.tab_screens["fitc"] = self.create_fitc_screen()
-        
-        # Manual tab screen
-        self.tab_screens["manual"] = self.create_manual_screen()
+        """Register the tab builders; each tab is created the first time it is shown"""
+        self.tab_builders = {
+            "auto": self.create_auto_screen,
+            "fitc": self.create_fitc_screen,
+            "manual": self.create_manual_screen
+        }
+    
+    def get_tab_screen(self, tab_id):
+        """Return the tab's frame, building it on first use"""
+        if tab_id not in self.tab_screens and tab_id in self.tab_builders:
+            self.tab_screens[tab_id] = self.tab_builders[tab_id]()
+        return self.tab_screens.get(tab_id)
     
     def create_auto_screen(self):
         """Create the AUTO tab screen"""
+        from gui.components.drag_drop import DragDropWidget
+        from gui.components.status_panel import StatusPanel
+        
         auto_frame = ModernFrame(self.content_frame)
         
         # Title
@@ -124,17 +132,32 @@ class MECleanScreen:
         )
         left_title.pack(pady=(0, 10))
         
-        # Drag & Drop widget
-        self.drag_drop = DragDropWidget(left_section, self.on_file_selected)
+        # Drag & Drop widget (several files or a folder start a batch)
+        self.drag_drop = DragDropWidget(
+            left_section, self.on_file_selected, self.image_session, on_files_dropped=self.start_batch
+        )
         drag_drop_widget = self.drag_drop.get_widget()
         drag_drop_widget.pack(fill=tk.BOTH, expand=True)
         
+        # Batch folder button
+        batch_button = ModernButton(
+            left_section,
+            text="Batch Folder",
+            command=self.select_batch_folder,
+            tooltip="Analyze and clean every .bin file in a folder",
+            bg="#2196f3",
+            fg="#000000",
+            padx=15,
+            pady=8
+        )
+        batch_button.pack(pady=(10, 0))
+        
         # Right section - Status Panel (takes remaining space)
-        right_section = ModernFrame(content_area)
-        right_section.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(10, 0))
+        self.auto_right_section = ModernFrame(content_area)
+        self.auto_right_section.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(10, 0))
         
         # Status panel
-        self.status_panel = StatusPanel(right_section)
+        self.status_panel = StatusPanel(self.auto_right_section, station="me_clean_auto")
         status_widget = self.status_panel.get_widget()
         status_widget.pack(fill=tk.BOTH, expand=True)
         
@@ -142,6 +165,8 @@ class MECleanScreen:
     
     def create_fitc_screen(self):
         """Create the FITC tab screen"""
+        from gui.components.drag_drop import DragDropWidget
+        
         fitc_frame = ModernFrame(self.content_frame)
         
         # Main content area (horizontal layout like Auto)
@@ -164,7 +189,7 @@ class MECleanScreen:
         left_title.pack(pady=(0, 10))
         
         # Drag & Drop widget (same as Auto)
-        self.fitc_drag_drop = DragDropWidget(left_section, self.on_fitc_file_selected)
+        self.fitc_drag_drop = DragDropWidget(left_section, self.on_fitc_file_selected, self.image_session)
         fitc_drag_drop_widget = self.fitc_drag_drop.get_widget()
         fitc_drag_drop_widget.pack(fill=tk.BOTH, expand=True)
         
@@ -290,9 +315,10 @@ class MECleanScreen:
         for btn_id, btn in self.tab_buttons.items():
             btn.set_active(False)
         
-        # Show new tab
-        if tab_id in self.tab_screens:
-            self.tab_screens[tab_id].pack(fill=tk.BOTH, expand=True)
+        # Show new tab (built on first visit)
+        tab_screen = self.get_tab_screen(tab_id)
+        if tab_screen is not None:
+            tab_screen.pack(fill=tk.BOTH, expand=True)
             
             # Set active button
             self.active_tab_button = self.tab_buttons[tab_id]
@@ -302,7 +328,38 @@ class MECleanScreen:
         # Force update the display
         self.frame.update_idletasks()
     
+    def select_batch_folder(self):
+        """Pick a folder of dumps for a batch clean"""
+        folder = filedialog.askdirectory(title="Select Folder with BIOS Files")
+        if folder:
+            self.start_batch([folder])
+    
+    def start_batch(self, paths):
+        """Show the batch table in place of the status panel and start cleaning"""
+        from functions.me_clean_batch import find_images
+        from gui.components.batch_panel import BatchPanel
+        
+        images = find_images(paths)
+        if not images:
+            self.drag_drop.show_error("❌ Error: No .bin files found!")
+            return
+        
+        if self.batch_panel is None:
+            self.batch_panel = BatchPanel(self.auto_right_section, on_close=self.close_batch)
+        elif self.batch_panel.batch and self.batch_panel.batch.is_running \
+                and not self.batch_panel.batch.cancelled.is_set():
+            self.drag_drop.show_error("❌ Error: A batch is already running!")
+            return
+        self.status_panel.get_widget().pack_forget()
+        self.batch_panel.get_widget().pack(fill=tk.BOTH, expand=True)
+        self.batch_panel.start(images)
+    
+    def close_batch(self):
+        """Return from the batch table to the status panel"""
+        self.batch_panel.get_widget().pack_forget()
+        self.status_panel.get_widget().pack(fill=tk.BOTH, expand=True)
+    
     def on_file_selected(self, filepath, filename, reset_all=False):
         """Handle file selection from drag & drop"""
         if self.status_panel:
-            self.status_panel.update_file_info(filepath, filename, reset_all)
\ No newline at end of file
+            self.status_panel.update_file_info(filepath, filename, reset_all, self.drag_drop.bios_image)
\ No newline at end of file
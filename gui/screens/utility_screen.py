@@ -10,8 +10,9 @@ from gui.components.drag_drop import DragDropWidget
 from gui.components.utility_console import UtilityConsole
 
 class UtilityScreen:
-    def __init__(self, parent):
+    def __init__(self, parent, image_session=None):
         self.parent = parent
+        self.image_session = image_session
         self.functions = UtilityFunctions()
         self.frame = None
         self.utility_console = None
@@ -43,7 +44,7 @@ class UtilityScreen:
         left_title.pack(pady=(0, 10))
         
         # Drag & Drop widget
-        self.drag_drop = DragDropWidget(left_section, self.on_file_selected)
+        self.drag_drop = DragDropWidget(left_section, self.on_file_selected, self.image_session)
         drag_drop_widget = self.drag_drop.get_widget()
         drag_drop_widget.pack(fill=tk.BOTH, expand=True)
         
@@ -61,4 +62,4 @@ class UtilityScreen:
     def on_file_selected(self, filepath, filename, reset_all=False):
         """Handle file selection from drag & drop"""
         if self.utility_console:
-            self.utility_console.update_file_info(filepath, filename, reset_all)
+            self.utility_console.update_file_info(filepath, filename, reset_all, self.drag_drop.bios_image)
@@ -0,0 +1,89 @@
+"""
+Thread-safe hand-off of worker results to the Tk thread
+"""
+
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from constants.app_config import AppConfig
+
+
+class UIDispatcher:
+    """Runs callbacks posted from any thread on the Tk thread
+    
+    Workers call post() (or post_latest() for progress updates where only
+    the newest value matters); nothing on a worker thread touches Tk.
+    The Tk loop drains the queue every UI_DISPATCH_MS, spending at most
+    UI_DISPATCH_BUDGET_MS per drain so a flood of results cannot freeze
+    the window. Callbacks posted before start() wait until the loop runs.
+    """
+    
+    def __init__(self):
+        self.root = None
+        self.timer = None
+        self.callbacks = deque()  # append/popleft are atomic, no lock needed
+        self.latest = {}  # key -> (callback, args); newer posts replace older ones
+    
+    def start(self, root):
+        """Begin draining on root's event loop"""
+        self.root = root
+        self.schedule(AppConfig.UI_DISPATCH_MS)
+    
+    def stop(self):
+        """Stop draining and drop anything still queued (window closing)"""
+        if self.root and self.timer:
+            self.root.after_cancel(self.timer)
+        self.root = None
+        self.timer = None
+        self.callbacks.clear()
+        self.latest.clear()
+    
+    def post(self, callback, *args):
+        """Queue callback(*args) for the Tk thread; safe from any thread"""
+        self.callbacks.append((callback, args))
+    
+    def post_latest(self, key, callback, *args):
+        """Like post(), but only the newest callback for key runs"""
+        self.latest[key] = (callback, args)
+    
+    def schedule(self, delay_ms):
+        if self.root:
+            self.timer = self.root.after(delay_ms, self.drain)
+    
+    def drain(self):
+        """Run queued callbacks on the Tk thread within the time budget"""
+        deadline = time.perf_counter() + AppConfig.UI_DISPATCH_BUDGET_MS / 1000
+        # Progress updates run first, so a 'finished' callback posted later always wins
+        latest = [item for item in (self.latest.pop(key, None) for key in list(self.latest)) if item]
+        self.callbacks.extendleft(reversed(latest))
+        
+        while self.callbacks and time.perf_counter() < deadline:
+            callback, args = self.callbacks.popleft()
+            try:
+                callback(*args)
+            except Exception:
+                # One broken callback must not stop the rest of the UI updates
+                traceback.print_exc(file=sys.stderr)
+        
+        # Come straight back when work was left over, else wait for the next tick
+        self.schedule(1 if self.callbacks else AppConfig.UI_DISPATCH_MS)
+
+
+_default_dispatcher = None
+_default_dispatcher_lock = threading.Lock()
+
+
+def get_ui_dispatcher():
+    """Return the process-wide UI dispatcher"""
+    global _default_dispatcher
+    with _default_dispatcher_lock:
+        if _default_dispatcher is None:
+            _default_dispatcher = UIDispatcher()
+        return _default_dispatcher
+
+
+def post_to_ui(callback, *args):
+    """Run callback(*args) on the Tk thread (shortcut for get_ui_dispatcher().post)"""
+    get_ui_dispatcher().post(callback, *args)
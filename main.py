@@ -1,14 +1,23 @@
 #!/usr/bin/env python3
 """
 Main entry point for the Python GUI application
+
+With arguments (analyze, clean, dmi-copy, hash) it runs the headless
+command line instead and never imports the GUI.
 """
 
-from gui.main_window import MainWindow
-from constants.app_config import AppConfig
+import sys
+import time
 
 def main():
     """Initialize and run the application"""
-    app = MainWindow()
+    started = time.perf_counter()
+    if len(sys.argv) > 1:
+        from cli import run
+        sys.exit(run(sys.argv[1:]))
+    
+    from gui.main_window import MainWindow
+    app = MainWindow(started)
     app.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check for the startup modules
+
+Runs `python -X importtime -c "import <module>"` a few times for every
+module in scripts/import_budget.json, takes the median cumulative time
+and fails when a module goes over its budget or imports one of its
+forbidden modules (for example PIL from gui.main_window, or tkinter
+from the CLI).
+
+    python scripts/check_import_time.py            # check, exit 1 on regression
+    python scripts/check_import_time.py --update   # rewrite budgets from this machine
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_FILE = os.path.join(ROOT, "scripts", "import_budget.json")
+
+
+def measure_import(module):
+    """Return (cumulative_ms, imported module names) for one cold import"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip()}")
+    
+    cumulative = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # Column header
+        name = parts[2].strip()
+        imported.add(name)
+        if name == module:
+            cumulative = int(parts[1]) / 1000
+    if cumulative is None:
+        raise RuntimeError(f"No import time reported for {module}")
+    return cumulative, imported
+
+
+def check_module(module, spec, runs):
+    """Return (median_ms, forbidden modules that were imported)"""
+    timings = []
+    imported = set()
+    for _ in range(runs):
+        elapsed, names = measure_import(module)
+        timings.append(elapsed)
+        imported |= names
+    forbidden = sorted(name for name in spec.get("forbidden", [])
+                       if name in imported or any(other.startswith(name + ".") for other in imported))
+    return statistics.median(timings), forbidden
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--update", action="store_true", help="Rewrite the budgets from this machine's timings")
+    parser.add_argument("--runs", type=int, help="Imports per module (median is used)")
+    args = parser.parse_args(argv)
+    
+    with open(BUDGET_FILE, encoding="utf-8") as f:
+        config = json.load(f)
+    runs = args.runs or config.get("runs", 5)
+    headroom = config.get("headroom", 2.0)
+    
+    failures = 0
+    for module, spec in config["modules"].items():
+        try:
+            median_ms, forbidden = check_module(module, spec, runs)
+        except RuntimeError as e:
+            print(f"FAIL  {module}: {e}")
+            failures += 1
+            continue
+        
+        budget = spec["budget_ms"]
+        if args.update:
+            spec["budget_ms"] = round(median_ms * headroom)
+            budget = spec["budget_ms"]
+        failed = median_ms > budget or bool(forbidden)
+        failures += failed
+        status = "FAIL" if failed else "ok"
+        print(f"{status:4}  {module}: {median_ms:.1f} ms (budget {budget} ms)")
+        if forbidden:
+            print(f"      imports forbidden modules: {', '.join(forbidden)}")
+    
+    if args.update:
+        with open(BUDGET_FILE, "w", encoding="utf-8") as f:
+            json.dump(config, f, indent=2)
+            f.write("\n")
+        print(f"Budgets written to {os.path.relpath(BUDGET_FILE, ROOT)}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
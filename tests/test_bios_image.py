@@ -0,0 +1,59 @@
+"""
+Tests for the shared BIOS image session
+"""
+
+from functions.bios_image import BiosImageSession
+
+
+def dump(tmp_path, name="bios.bin"):
+    path = tmp_path / name
+    path.write_bytes(bytes(range(256)) * 16)
+    return str(path)
+
+
+def test_file_stays_mapped_until_every_holder_releases_it(tmp_path):
+    path = dump(tmp_path)
+    session = BiosImageSession()
+    image = session.open(path)
+    assert session.open(path) is image  # A second screen shares the mapping
+    
+    session.release(path)
+    assert session.get(path) is image and not image.closed
+    session.release(path)
+    
+    assert image.closed
+    assert session.get(path) is None
+    assert session.holders == {}
+
+
+def test_slices_outlive_the_release(tmp_path):
+    path = dump(tmp_path)
+    session = BiosImageSession()
+    region = session.open(path).region(0x10, 4)
+    
+    session.release(path)
+    
+    assert bytes(region) == b"\x10\x11\x12\x13"
+
+
+def test_changed_file_is_mapped_again(tmp_path):
+    path = dump(tmp_path)
+    session = BiosImageSession()
+    image = session.open(path)
+    with open(path, "ab") as f:
+        f.write(b"\xFF" * 16)
+    
+    reopened = session.open(path)
+    
+    assert reopened is not image and image.closed
+    assert reopened.size == 0x1010
+    session.release(path)
+    session.release(path)
+    assert reopened.closed
+
+
+def test_release_of_an_unknown_file_is_ignored(tmp_path):
+    session = BiosImageSession()
+    session.release(str(tmp_path / "missing.bin"))
+    
+    assert session.images == {} and session.holders == {}
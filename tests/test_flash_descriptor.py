@@ -0,0 +1,96 @@
+"""
+Tests for the Intel Flash Descriptor parser
+"""
+
+import struct
+
+import pytest
+
+from functions.bios_image import BiosImage
+from functions.flash_descriptor import (
+    DESCRIPTOR_SIZE, FLASH_DESCRIPTOR_SIGNATURE, REGION_BIOS, REGION_DESCRIPTOR, REGION_GBE, REGION_ME,
+    FlashDescriptorError, get_flash_layout, get_region_view, parse_flash_descriptor
+)
+
+FCBA, FRBA, FMBA, FPSBA = 0x30, 0x40, 0x80, 0x100
+
+
+def flreg(base, limit):
+    return ((limit >> 12) << 16) | (base >> 12)
+
+
+def descriptor(regions, version=2, density=0x6):
+    """A 4 KB descriptor; regions maps FLREG index to (base, inclusive limit)"""
+    data = bytearray(b"\xFF" * DESCRIPTOR_SIZE)
+    struct.pack_into("<IIII", data, 0x10, FLASH_DESCRIPTOR_SIGNATURE,
+                     (FCBA >> 4) | ((FRBA >> 4) << 16) | (4 << 24), (FMBA >> 4) | ((FPSBA >> 4) << 16), 0)
+    read_frequency = 0 if version == 1 else 6
+    struct.pack_into("<I", data, FCBA, density | (read_frequency << 17))
+    for index in range((FMBA - FRBA) // 4):
+        struct.pack_into("<I", data, FRBA + index * 4, 0x00007FFF)  # Unused: base above limit
+    for index, (base, limit) in regions.items():
+        struct.pack_into("<I", data, FRBA + index * 4, flreg(base, limit))
+    return bytes(data)
+
+
+FULL_IMAGE_REGIONS = {
+    REGION_DESCRIPTOR: (0, 0xFFF),
+    REGION_GBE: (0x1000, 0x2FFF),
+    REGION_ME: (0x3000, 0x7FFF),
+    REGION_BIOS: (0x8000, 0xFFFF),
+}
+
+
+def test_parses_the_region_map():
+    layout = parse_flash_descriptor(descriptor(FULL_IMAGE_REGIONS), 0x10000)
+    
+    assert layout.version == 2
+    assert layout.descriptor_offset == 0x10
+    assert [(r.name, r.base, r.limit) for r in layout.used_regions()] == [
+        ("Descriptor", 0, 0xFFF), ("GbE", 0x1000, 0x2FFF), ("ME", 0x3000, 0x7FFF), ("BIOS", 0x8000, 0xFFFF),
+    ]
+    assert layout.region("me") is layout.region(REGION_ME)
+    assert layout.total_flash_size() == 32 * 1024 * 1024
+
+
+def test_ifd_v1_is_detected_from_the_read_frequency():
+    layout = parse_flash_descriptor(descriptor(FULL_IMAGE_REGIONS, version=1, density=0x4), 0x10000)
+    
+    assert layout.version == 1
+    assert layout.component_sizes == (8 * 1024 * 1024,)
+
+
+def test_regions_of_a_truncated_dump_are_clipped():
+    layout = parse_flash_descriptor(descriptor(FULL_IMAGE_REGIONS), 0x6000)
+    
+    assert layout.region(REGION_ME).limit == 0x5FFF
+    assert not layout.has_region(REGION_BIOS)
+
+
+def test_image_without_descriptor_has_no_layout():
+    assert parse_flash_descriptor(b"\xFF" * DESCRIPTOR_SIZE) is None
+
+
+def test_invalid_flmap_is_rejected():
+    data = bytearray(descriptor(FULL_IMAGE_REGIONS))
+    struct.pack_into("<I", data, 0x14, 0)
+    
+    with pytest.raises(FlashDescriptorError):
+        parse_flash_descriptor(bytes(data))
+
+
+def test_layout_lookup_does_not_hash_the_image(tmp_path, monkeypatch):
+    path = tmp_path / "image.bin"
+    path.write_bytes(descriptor(FULL_IMAGE_REGIONS) + bytes(range(256)) * 0xF0)
+    
+    def no_full_hash(self):
+        raise AssertionError("get_flash_layout hashed the whole image")
+    
+    monkeypatch.setattr(BiosImage, "sha256", no_full_hash)
+    first, second = BiosImage(str(path)), BiosImage(str(path))
+    try:
+        assert get_flash_layout(first) is get_flash_layout(second)
+        assert bytes(get_region_view(first, REGION_GBE)[:4]) == bytes(range(4))
+    finally:
+        first.close()
+        second.close()
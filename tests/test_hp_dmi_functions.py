@@ -0,0 +1,114 @@
+"""
+Tests for the HP DMI copy engine
+"""
+
+import struct
+import uuid
+
+import pytest
+
+from constants.app_config import AppConfig
+from functions.bios_image import BiosImage
+from functions.hp_dmi_functions import (
+    DMI_HEADER, DMI_SIGNATURE, BatchItem, DMIError, SMBIOSStructure, copy_dmi, read_batch_csv, read_dmi_block,
+    run_dmi_batch, table_checksum
+)
+from functions.image_writer import WRITE_MODE_PATCH
+
+
+def system_info(serial, sku, family, share_sku_and_family=False):
+    """Type 1 structure; SKU (0x19) and Family (0x1A) may point at the same string"""
+    formatted = bytearray(0x1B)
+    formatted[0:4] = struct.pack("<BBH", 1, 0x1B, 1)
+    formatted[0x04:0x08] = bytes((1, 2, 3, 4))  # Manufacturer, product, version, serial
+    formatted[0x08:0x18] = uuid.uuid4().bytes_le
+    formatted[0x19] = 5
+    formatted[0x1A] = 5 if share_sku_and_family else 6
+    strings = ["HP", "EliteBook", "1.0", serial, sku]
+    if not share_sku_and_family:
+        strings.append(family)
+    return SMBIOSStructure(bytes(formatted), strings)
+
+
+def write_image(path, structure):
+    table = structure.to_bytes() + bytes((127, 4, 2, 0, 0, 0))
+    header = DMI_HEADER.pack(DMI_SIGNATURE, len(table), 0, 1)
+    header = DMI_HEADER.pack(DMI_SIGNATURE, len(table), table_checksum(header, table), 1)
+    data = b"\xFF" * 0x1000 + header + table + b"\xFF" * 0x400
+    path.write_bytes(data.ljust(0x4000, b"\xFF"))
+    return str(path)
+
+
+def load_system_info(path):
+    image = BiosImage(path)
+    try:
+        data = bytes(image.view())
+    finally:
+        image.close()
+    block = read_dmi_block(data, [0x1000])
+    return next(s for s in block.structures if s.type == 1)
+
+
+def test_set_string_keeps_other_fields_sharing_the_index():
+    structure = system_info("SER1", "SKU-SHARED", None, share_sku_and_family=True)
+    structure.set_string(0x19, "NEW-SKU")
+    assert structure.get_string(0x19) == "NEW-SKU"
+    assert structure.get_string(0x1A) == "SKU-SHARED"
+
+
+def test_set_string_rewrites_an_unshared_string_in_place():
+    structure = system_info("SER1", "SKU-1", "Family-1")
+    structure.set_string(0x19, "SKU-2")
+    assert structure.strings == ["HP", "EliteBook", "1.0", "SER1", "SKU-2", "Family-1"]
+
+
+def test_copy_dmi_does_not_touch_a_field_sharing_the_copied_string(tmp_path):
+    source = write_image(tmp_path / "source.bin", system_info("SRC123", "SRC-SKU", "Source Family"))
+    target = write_image(tmp_path / "target.bin", system_info("TGT999", "TGT-SKU", None, share_sku_and_family=True))
+    output = str(tmp_path / "out.bin")
+    
+    source_image, target_image = BiosImage(source), BiosImage(target)
+    try:
+        copy_dmi(source_image, target_image, output)
+    finally:
+        source_image.close()
+        target_image.close()
+    
+    result = load_system_info(output)
+    assert result.get_string(0x07) == "SRC123"
+    assert result.get_string(0x19) == "SRC-SKU"
+    assert result.get_string(0x1A) == "TGT-SKU"  # Family keeps its original value
+
+
+def test_read_batch_csv_rejects_rows_writing_the_same_output(tmp_path):
+    csv_path = tmp_path / "batch.csv"
+    csv_path.write_text("source,target,output\nsrc.bin,a.bin,\nsrc.bin,b.bin,a_dmi.bin\n")
+    with pytest.raises(DMIError, match="line 2"):
+        read_batch_csv(str(csv_path))
+
+
+def test_run_dmi_batch_fails_a_repeated_target_instead_of_racing_it(tmp_path):
+    source = write_image(tmp_path / "source.bin", system_info("SRC123", "SRC-SKU", "Source Family"))
+    target = write_image(tmp_path / "target.bin", system_info("TGT999", "TGT-SKU", "Target Family"))
+    items = [BatchItem(source, target, None), BatchItem(source, target, None)]
+    
+    outcomes = run_dmi_batch(items, max_workers=1)
+    
+    assert sorted(outcome.error is None for outcome in outcomes) == [False, True]
+    assert load_system_info(str(tmp_path / "target_dmi.bin")).get_string(0x07) == "SRC123"
+
+
+def test_patch_mode_does_not_write_under_the_image_name(tmp_path, monkeypatch):
+    monkeypatch.setattr(AppConfig, "OUTPUT_WRITE_MODE", WRITE_MODE_PATCH)
+    source = write_image(tmp_path / "source.bin", system_info("SRC123", "SRC-SKU", "Source Family"))
+    target = write_image(tmp_path / "target.bin", system_info("TGT999", "TGT-SKU", "Target Family"))
+    
+    source_image, target_image = BiosImage(source), BiosImage(target)
+    try:
+        result = copy_dmi(source_image, target_image)
+    finally:
+        source_image.close()
+        target_image.close()
+    
+    assert result.write.output_path == str(tmp_path / "target_dmi.bin.bpatch")
+    assert not (tmp_path / "target_dmi.bin").exists()
@@ -0,0 +1,112 @@
+"""
+Tests for patched output images and binary patches
+"""
+
+import pytest
+
+from functions.image_writer import (
+    WRITE_MODE_COPY, WRITE_MODE_PATCH, ImageWriteError, PatchedImage, apply_patch, describe_write
+)
+from functions.task_engine import CancelToken, TaskCancelled
+
+
+def source_image(tmp_path, size=0x10000):
+    path = tmp_path / "source.bin"
+    path.write_bytes(bytes(range(256)) * (size // 256))
+    return path
+
+
+def test_patch_mode_never_writes_under_the_image_name(tmp_path):
+    source = source_image(tmp_path)
+    output = tmp_path / "source_cleaned.bin"
+    
+    with PatchedImage(str(source)) as image:
+        image.write(0x1234, b"\xAA" * 16)
+        result = image.save(str(output), mode=WRITE_MODE_PATCH)
+    
+    assert result.output_path == str(output) + ".bpatch"
+    assert not output.exists()
+    assert "source_cleaned.bin.bpatch" in describe_write(result)
+    assert apply_patch(str(source), result.output_path, str(output)) == str(output)
+    assert output.read_bytes()[0x1234:0x1244] == b"\xAA" * 16
+
+
+def patched_copy(image_bytes, writes):
+    data = bytearray(image_bytes)
+    for offset, payload in writes:
+        data[offset:offset + len(payload)] = payload
+    return bytes(data)
+
+
+WRITES = [(0x10, b"\x01\x02"), (0x0FFE, b"\xEE" * 4), (0x9000, b"\x55" * 0x2000), (0xFFFF, b"\x77")]
+
+
+def test_dirty_ranges_merge_adjacent_blocks_and_skip_unchanged_writes(tmp_path):
+    source = source_image(tmp_path)
+    
+    with PatchedImage(str(source)) as image:
+        image.write(0x20, source.read_bytes()[0x20:0x30])  # Same bytes: not dirty
+        for offset, payload in WRITES:
+            image.write(offset, payload)
+        
+        assert image.dirty_ranges() == [(0x0, 0x2000), (0x9000, 0x2000), (0xF000, 0x1000)]
+        assert image.bytes_modified == sum(len(payload) for _, payload in WRITES)
+
+
+def test_copy_and_patch_round_trip_to_the_same_image(tmp_path):
+    source = source_image(tmp_path)
+    expected = patched_copy(source.read_bytes(), WRITES)
+    
+    with PatchedImage(str(source)) as image:
+        for offset, payload in WRITES:
+            image.write(offset, payload)
+        copy = image.save(str(tmp_path / "copy.bin"), mode=WRITE_MODE_COPY)
+        patch = image.save_patch(str(tmp_path / "changes.bpatch"))
+    
+    assert (tmp_path / "copy.bin").read_bytes() == expected
+    assert copy.bytes_written == 0x5000
+    assert patch.bytes_written < len(expected) // 2
+    apply_patch(str(source), patch.output_path, str(tmp_path / "rebuilt.bin"))
+    assert (tmp_path / "rebuilt.bin").read_bytes() == expected
+    assert source.read_bytes() == bytes(range(256)) * 0x100
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_patch_is_refused_for_another_source(tmp_path):
+    source = source_image(tmp_path)
+    with PatchedImage(str(source)) as image:
+        image.write(0x100, b"\xAA")
+        patch = image.save_patch(str(tmp_path / "changes.bpatch"))
+    other = tmp_path / "other.bin"
+    other.write_bytes(b"\x00" * 0x10000)
+    
+    with pytest.raises(ImageWriteError, match="different source"):
+        apply_patch(str(other), patch.output_path, str(tmp_path / "rebuilt.bin"))
+    assert not (tmp_path / "rebuilt.bin").exists()
+
+
+def test_corrupt_patch_leaves_no_output(tmp_path):
+    source = source_image(tmp_path)
+    with PatchedImage(str(source)) as image:
+        image.write(0x100, b"\xAA" * 8)
+        patch = image.save_patch(str(tmp_path / "changes.bpatch"))
+    data = bytearray((tmp_path / "changes.bpatch").read_bytes())
+    data[-1] ^= 0xFF
+    (tmp_path / "changes.bpatch").write_bytes(bytes(data))
+    
+    with pytest.raises(ImageWriteError, match="expected hash"):
+        apply_patch(str(source), patch.output_path, str(tmp_path / "rebuilt.bin"))
+    assert not list(tmp_path.glob("rebuilt.bin*"))
+
+
+def test_cancelled_save_removes_its_temp_file(tmp_path):
+    source = source_image(tmp_path)
+    cancel = CancelToken()
+    cancel.cancel()
+    
+    with PatchedImage(str(source)) as image:
+        image.write(0x100, b"\xAA")
+        with pytest.raises(TaskCancelled):
+            image.save(str(tmp_path / "out.bin"), mode=WRITE_MODE_COPY, cancel=cancel)
+    
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["source.bin"]
@@ -0,0 +1,128 @@
+"""
+Tests for the persistent job queue and its journal
+"""
+
+import json
+import os
+import threading
+
+from constants.app_config import AppConfig
+from functions.job_queue import JOURNAL_VERSION, STATE_RUNNING, JobQueue
+from functions.me_clean_batch import STATE_CANCELLED, STATE_DONE, STATE_FAILED, STATE_QUEUED
+from functions.task_engine import raise_if_cancelled
+
+
+def no_run(job, cancel):
+    raise AssertionError("the queue was not started")
+
+
+def write_journal(tmp_path, jobs, version=JOURNAL_VERSION, name="station"):
+    with open(tmp_path / f"{name}.json", "w", encoding="utf-8") as f:
+        json.dump({"version": version, "jobs": jobs}, f)
+
+
+def states(queue):
+    return [(job.id, os.path.basename(job.path), job.state) for job in queue.snapshot()]
+
+
+def test_added_jobs_are_restored_in_order(tmp_path):
+    queue = JobQueue("station", no_run, journal_dir=str(tmp_path))
+    queue.add(str(tmp_path / "a.bin"))
+    queue.add(str(tmp_path / "b.bin"))
+    queue.move(2, -1)
+    
+    restored = JobQueue("station", no_run, journal_dir=str(tmp_path))
+    
+    assert states(restored) == [(2, "b.bin", STATE_QUEUED), (1, "a.bin", STATE_QUEUED)]
+    assert restored.add(str(tmp_path / "c.bin")).id == 3
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_interrupted_jobs_are_queued_again_and_finished_ones_kept(tmp_path):
+    write_journal(tmp_path, [
+        {"id": 4, "path": "/images/done.bin", "state": STATE_DONE, "detail": "1.2 s"},
+        {"id": 5, "path": "/images/running.bin", "state": STATE_RUNNING, "detail": "50%"},
+        {"id": 6, "path": "/images/waiting.bin", "state": STATE_QUEUED},
+        {"id": "bad", "path": "/images/bad.bin"},
+        {"path": "/images/no_id.bin"},
+    ])
+    
+    queue = JobQueue("station", no_run, journal_dir=str(tmp_path))
+    
+    assert states(queue) == [(4, "done.bin", STATE_DONE), (5, "running.bin", STATE_QUEUED),
+                             (6, "waiting.bin", STATE_QUEUED)]
+    assert queue.snapshot()[0].detail == "1.2 s"
+    assert queue.snapshot()[1].detail == ""
+    assert queue.pending_job("/images/running.bin").id == 5
+    assert queue.pending_job("/images/done.bin") is None
+
+
+def test_unknown_version_and_corrupt_journals_are_ignored(tmp_path):
+    write_journal(tmp_path, [{"id": 1, "path": "/images/a.bin"}], version=JOURNAL_VERSION + 1)
+    assert JobQueue("station", no_run, journal_dir=str(tmp_path)).snapshot() == []
+    
+    (tmp_path / "station.json").write_text('{"version": 1, "jobs": [', encoding="utf-8")
+    queue = JobQueue("station", no_run, journal_dir=str(tmp_path))
+    assert queue.snapshot() == []
+    assert queue.add("/images/a.bin").id == 1
+
+
+def test_started_queue_runs_restored_jobs_and_trims_history(tmp_path, monkeypatch):
+    monkeypatch.setattr(AppConfig, "JOB_QUEUE_HISTORY", 2)
+    write_journal(tmp_path, [
+        {"id": 1, "path": "/images/old.bin", "state": STATE_DONE},
+        {"id": 2, "path": "/images/ok.bin", "state": STATE_RUNNING},
+        {"id": 3, "path": "/images/broken.bin", "state": STATE_QUEUED},
+    ])
+    finished = []
+    all_finished = threading.Event()
+    
+    def run_job(job, cancel):
+        if job.filename == "broken.bin":
+            raise ValueError("no $FPT")
+        return [f"cleaned {job.filename}"]
+    
+    def on_finished(job):
+        finished.append(job)
+        if len(finished) == 2:
+            all_finished.set()
+    
+    queue = JobQueue("station", run_job, max_parallel=1, journal_dir=str(tmp_path), on_finished=on_finished)
+    queue.start()
+    
+    assert all_finished.wait(10)
+    assert [job.result for job in finished] == [["cleaned ok.bin"], None]
+    assert states(queue) == [(2, "ok.bin", STATE_DONE), (3, "broken.bin", STATE_FAILED)]
+    assert queue.snapshot()[1].detail == "no $FPT"
+    assert states(JobQueue("station", no_run, journal_dir=str(tmp_path))) == states(queue)
+
+
+def test_removing_a_running_job_cancels_it(tmp_path):
+    started, finished = threading.Event(), threading.Event()
+    
+    def run_job(job, cancel):
+        started.set()
+        cancel.wait(10)
+        raise_if_cancelled(cancel)
+    
+    queue = JobQueue("station", run_job, journal_dir=str(tmp_path), on_finished=lambda job: finished.set())
+    queue.start()
+    job = queue.add("/images/a.bin")
+    assert started.wait(10)
+    
+    assert queue.remove(job.id)
+    assert finished.wait(10)
+    assert job.state == STATE_CANCELLED
+
+
+def test_view_attached_after_start_sees_later_changes(tmp_path):
+    finished = threading.Event()
+    queue = JobQueue("station", lambda job, cancel: ["ok"], journal_dir=str(tmp_path))
+    queue.start()
+    changes = []
+    
+    queue.attach(on_change=lambda: changes.append(len(queue.snapshot())), on_finished=lambda job: finished.set())
+    queue.add("/images/a.bin")
+    
+    assert finished.wait(10)
+    assert changes and changes[-1] == 1
@@ -0,0 +1,148 @@
+"""
+Tests for the ME Clean engine on synthetic ME regions
+"""
+
+import struct
+import zlib
+
+import pytest
+
+from constants.app_config import AppConfig
+from functions.flash_descriptor import FLASH_DESCRIPTOR_SIGNATURE
+from functions.image_writer import WRITE_MODE_PATCH, apply_patch
+from functions.me_analysis import analyze_me_region
+from functions.me_clean_functions import MECleanError, clean_me_image
+
+REGION_SIZE = 0x8000
+FPT_OFFSET = 0x10
+FTPR, NFTP, MFS = (0x1000, 0x3000), (0x4000, 0x2000), (0x6000, 0x1000)
+# FTPR modules: (name, offset in the partition, length)
+MODULES = (("FTPR.man", 0x100, 0x100), ("rbe", 0x200, 0x200), ("pm", 0x400, 0x400))
+
+
+def sum8(data):
+    return (0x100 - (sum(data) & 0xFF)) & 0xFF
+
+
+def code_partition(cpd_version):
+    """$CPD for FTPR followed by the module data (0x11 * module number)"""
+    data = bytearray(FTPR[1])
+    header_length = 0x14 if cpd_version >= 2 else 0x10
+    struct.pack_into("<4sIBBB", data, 0, b"$CPD", len(MODULES), cpd_version, 1, header_length)
+    name_offset = 0x10 if cpd_version >= 2 else 0x0C
+    data[name_offset:name_offset + 4] = b"FTPR"
+    for index, (name, offset, length) in enumerate(MODULES):
+        struct.pack_into("<12sII4x", data, header_length + index * 0x18, name.encode(), offset, length)
+        data[offset:offset + length] = bytes([0x11 * (index + 1)]) * length
+    table = data[:header_length + len(MODULES) * 0x18]
+    if cpd_version >= 2:
+        struct.pack_into("<I", data, 0x0C, zlib.crc32(table) & 0xFFFFFFFF)
+    else:
+        data[0x0B] = sum8(table)
+    return data
+
+
+def me_region(fpt_version=0x21, cpd_version=2):
+    """ROM bypass + $FPT (FTPR, NFTP, MFS) + partition data"""
+    region = bytearray(b"\xFF" * REGION_SIZE)
+    region[:FPT_OFFSET] = bytes(FPT_OFFSET)
+    header = bytearray(0x20)
+    struct.pack_into("<4sIBBBB", header, 0, b"$FPT", 3, fpt_version, 0x10, 0x20, 0)
+    entries = b"".join(
+        struct.pack("<4s4xII12xI", name, offset, length, flags)
+        for name, (offset, length), flags in ((b"FTPR", FTPR, 0), (b"NFTP", NFTP, 0), (b"MFS", MFS, 5))
+    )
+    if fpt_version == 0x21:
+        struct.pack_into("<I", header, 0x14, zlib.crc32(header) & 0xFFFFFFFF)
+    else:
+        header[0x0B] = sum8(region[:FPT_OFFSET] + header)
+    region[FPT_OFFSET:FPT_OFFSET + 0x20] = header
+    region[FPT_OFFSET + 0x20:FPT_OFFSET + 0x20 + len(entries)] = entries
+    region[FTPR[0]:sum(FTPR)] = code_partition(cpd_version)
+    region[NFTP[0]:sum(NFTP)] = b"\xA5" * NFTP[1]
+    region[MFS[0]:sum(MFS)] = b"\x5A" * MFS[1]
+    return bytes(region)
+
+
+def full_image(region, me_base=0x1000):
+    """4 KB descriptor whose ME region is at me_base, then the region"""
+    descriptor = bytearray(b"\xFF" * 0x1000)
+    struct.pack_into("<IIII", descriptor, 0x10, FLASH_DESCRIPTOR_SIGNATURE, 0x03 | (0x04 << 16), 0x08 | (0x10 << 16), 0)
+    struct.pack_into("<I", descriptor, 0x30, 6 << 17)
+    for index in range(16):
+        struct.pack_into("<I", descriptor, 0x40 + index * 4, 0x00007FFF)
+    struct.pack_into("<I", descriptor, 0x40, 0)
+    struct.pack_into("<I", descriptor, 0x48, (((me_base + len(region) - 1) >> 12) << 16) | (me_base >> 12))
+    return bytes(descriptor) + region
+
+
+@pytest.mark.parametrize("fpt_version, cpd_version", [(0x21, 2), (0x20, 1)])
+def test_clean_keeps_ftpr_and_fixes_every_checksum(tmp_path, fpt_version, cpd_version):
+    source = tmp_path / "me.bin"
+    source.write_bytes(me_region(fpt_version, cpd_version))
+    output = tmp_path / "me_cleaned.bin"
+    
+    result = clean_me_image(str(source), str(output))
+    
+    assert result.removed_partitions == ["NFTP", "MFS"]
+    assert result.removed_modules == ["pm"]
+    cleaned = output.read_bytes()
+    info = analyze_me_region(cleaned)
+    assert info.warnings == ()
+    assert info.fpt.checksum_valid and info.fpt.entry_count == 1
+    assert [entry.name for entry in info.partitions] == ["FTPR"]
+    assert [cpd.checksum_valid for cpd in info.code_partitions] == [True]
+    if fpt_version == 0x20:
+        assert sum(cleaned[:FPT_OFFSET + 0x20]) & 0xFF == 0  # Bypass vector + header sum to zero
+    assert source.read_bytes() == me_region(fpt_version, cpd_version)
+
+
+def test_clean_erases_removed_data_and_keeps_essential_modules(tmp_path):
+    source = tmp_path / "me.bin"
+    source.write_bytes(me_region())
+    
+    cleaned = (tmp_path / "out.bin")
+    clean_me_image(str(source), str(cleaned))
+    cleaned = cleaned.read_bytes()
+    
+    assert cleaned[NFTP[0]:sum(NFTP)] == b"\xFF" * NFTP[1]
+    assert cleaned[MFS[0]:sum(MFS)] == b"\xFF" * MFS[1]
+    (_, man_offset, man_length), (_, rbe_offset, rbe_length), (_, pm_offset, pm_length) = MODULES
+    assert cleaned[FTPR[0] + man_offset:FTPR[0] + man_offset + man_length] == b"\x11" * man_length
+    assert cleaned[FTPR[0] + rbe_offset:FTPR[0] + rbe_offset + rbe_length] == b"\x22" * rbe_length
+    assert cleaned[FTPR[0] + pm_offset:FTPR[0] + pm_offset + pm_length] == b"\xFF" * pm_length
+
+
+def test_clean_finds_the_me_region_through_the_descriptor(tmp_path):
+    source = tmp_path / "full.bin"
+    source.write_bytes(full_image(me_region()))
+    output = tmp_path / "full_cleaned.bin"
+    
+    result = clean_me_image(str(source), str(output))
+    
+    cleaned = output.read_bytes()
+    assert result.removed_partitions == ["NFTP", "MFS"]
+    assert cleaned[:0x1000] == source.read_bytes()[:0x1000]
+    assert analyze_me_region(cleaned[0x1000:]).fpt.checksum_valid
+
+
+def test_region_without_fpt_is_rejected(tmp_path):
+    source = tmp_path / "blank.bin"
+    source.write_bytes(b"\xFF" * REGION_SIZE)
+    
+    with pytest.raises(MECleanError, match="FPT"):
+        clean_me_image(str(source), str(tmp_path / "out.bin"))
+    assert not (tmp_path / "out.bin").exists()
+
+
+def test_patch_mode_writes_a_bpatch_next_to_the_image_name(tmp_path, monkeypatch):
+    monkeypatch.setattr(AppConfig, "OUTPUT_WRITE_MODE", WRITE_MODE_PATCH)
+    source = tmp_path / "me.bin"
+    source.write_bytes(me_region())
+    
+    result = clean_me_image(str(source))
+    
+    assert result.write.output_path == str(tmp_path / "me_cleaned.bin.bpatch")
+    assert not (tmp_path / "me_cleaned.bin").exists()
+    apply_patch(str(source), result.write.output_path, str(tmp_path / "rebuilt.bin"))
+    assert analyze_me_region((tmp_path / "rebuilt.bin").read_bytes()).fpt.entry_count == 1
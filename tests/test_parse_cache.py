@@ -0,0 +1,77 @@
+"""
+Tests for the persistent parse-result cache
+"""
+
+import os
+
+from functions.parse_cache import ParseCache
+
+DIGEST_A, DIGEST_B, DIGEST_C = "a" * 64, "b" * 64, "c" * 64
+
+
+def entry_path(cache, digest, version):
+    return os.path.join(cache.cache_dir, f"v{version}", f"{digest}.json")
+
+
+def set_mtime(path, mtime):
+    os.utime(path, (mtime, mtime))
+
+
+def test_result_round_trips_through_disk(tmp_path):
+    ParseCache(str(tmp_path)).put(DIGEST_A, 3, {"volumes": [[0, "guid", 16, 1, None]]})
+    
+    assert ParseCache(str(tmp_path)).get(DIGEST_A, 3) == {"volumes": [[0, "guid", 16, 1, None]]}
+    assert ParseCache(str(tmp_path)).get(DIGEST_B, 3) is None
+
+
+def test_new_parser_version_drops_old_entries(tmp_path):
+    ParseCache(str(tmp_path)).put(DIGEST_A, 2, {"old": True})
+    
+    cache = ParseCache(str(tmp_path))
+    assert cache.get(DIGEST_A, 3) is None
+    assert sorted(os.listdir(tmp_path)) == []
+    cache.put(DIGEST_A, 3, {"old": False})
+    assert sorted(os.listdir(tmp_path)) == ["v3"]
+
+
+def test_corrupt_entry_is_removed(tmp_path):
+    cache = ParseCache(str(tmp_path))
+    cache.put(DIGEST_A, 3, {"size": 1})
+    path = entry_path(cache, DIGEST_A, 3)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"digest": "trunc')
+    
+    assert cache.get(DIGEST_A, 3) is None
+    assert not os.path.exists(path)
+
+
+def test_entry_for_another_digest_is_ignored(tmp_path):
+    cache = ParseCache(str(tmp_path))
+    cache.put(DIGEST_A, 3, {"size": 1})
+    os.replace(entry_path(cache, DIGEST_A, 3), entry_path(cache, DIGEST_B, 3))
+    
+    assert cache.get(DIGEST_B, 3) is None
+
+
+def test_trim_drops_least_recently_used_entries(tmp_path):
+    result = {"padding": "x" * 300}  # About 400 bytes on disk: two entries fit
+    cache = ParseCache(str(tmp_path), max_bytes=1000)
+    cache.put(DIGEST_A, 3, result)
+    cache.put(DIGEST_B, 3, result)
+    set_mtime(entry_path(cache, DIGEST_A, 3), 1000)
+    set_mtime(entry_path(cache, DIGEST_B, 3), 2000)
+    assert cache.get(DIGEST_A, 3) == result  # Reading marks it as recently used
+    
+    cache.put(DIGEST_C, 3, result)
+    
+    assert cache.get(DIGEST_A, 3) == result
+    assert cache.get(DIGEST_B, 3) is None
+    assert cache.get(DIGEST_C, 3) == result
+
+
+def test_unserialisable_result_is_not_cached(tmp_path):
+    cache = ParseCache(str(tmp_path))
+    
+    assert cache.put(DIGEST_A, 3, {"bad": object()}) is False
+    assert cache.get(DIGEST_A, 3) is None
+    assert not [name for name in os.listdir(tmp_path / "v3") if name.endswith(".tmp")]
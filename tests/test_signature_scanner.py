@@ -0,0 +1,100 @@
+"""
+Tests for the single-pass signature scanner, checked against bytes.find
+"""
+
+import random
+
+import pytest
+
+from functions.signature_scanner import FIRMWARE_SIGNATURES, SignatureScanner, read_fit_pointer
+
+CHUNK_SIZE = 64
+
+
+def naive_hits(data, signatures, start=0, end=None):
+    """Every (offset, name) a scan of data[start:end] should report, overlaps included"""
+    end = len(data) if end is None else end
+    hits = []
+    for name, pattern in signatures.items():
+        offset = data.find(pattern, start)
+        while offset != -1 and offset + len(pattern) <= end:
+            hits.append((offset, name))
+            offset = data.find(pattern, offset + 1)
+    return sorted(hits)
+
+
+def planted_image(seed=3, size=CHUNK_SIZE * 40):
+    """Random bytes with signatures planted across every chunk boundary"""
+    rng = random.Random(seed)
+    alphabet = b"$_SMFVHDIPTN\x5a\xa5\xf0\x0f \x00\xff"  # Signature bytes, so near-misses are common
+    data = bytearray(rng.choice(alphabet) for _ in range(size))
+    patterns = list(FIRMWARE_SIGNATURES.values())
+    for index, boundary in enumerate(range(CHUNK_SIZE, size - CHUNK_SIZE, CHUNK_SIZE)):
+        pattern = patterns[index % len(patterns)]
+        offset = boundary - index % len(pattern)  # Straddles the boundary by 0..len-1 bytes
+        data[offset:offset + len(pattern)] = pattern
+    return bytes(data)
+
+
+@pytest.fixture(params=["vectorized", "regex"])
+def scanner(request):
+    scanner = SignatureScanner(chunk_size=CHUNK_SIZE)
+    if request.param == "regex":
+        scanner.prefilter = None
+    elif scanner.prefilter is None:
+        pytest.skip("numpy is not installed")
+    return scanner
+
+
+def test_hits_match_bytes_find_across_chunk_boundaries(scanner):
+    data = planted_image()
+    expected = naive_hits(data, FIRMWARE_SIGNATURES)
+    hits = [tuple(hit) for hit in scanner.scan(data)]
+    
+    assert len(expected) >= 38
+    assert sorted(hits) == expected
+    assert [offset for offset, _ in hits] == sorted(offset for offset, _ in hits)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_vectorized_scan_matches_bytes_find_on_random_data(seed):
+    scanner = SignatureScanner(chunk_size=CHUNK_SIZE)
+    if scanner.prefilter is None:
+        pytest.skip("numpy is not installed")
+    data = planted_image(seed, size=CHUNK_SIZE * 17 + seed)
+    
+    assert sorted(tuple(hit) for hit in scanner.scan(data)) == naive_hits(data, FIRMWARE_SIGNATURES)
+
+
+def test_vectorized_scan_reports_overlapping_hits():
+    scanner = SignatureScanner({"REPEAT": b"ABAB"}, chunk_size=CHUNK_SIZE)
+    if scanner.prefilter is None:
+        pytest.skip("numpy is not installed")
+    data = b"x" * 60 + b"ABABAB" + b"x" * 60  # Second hit straddles the chunk boundary
+    
+    assert [tuple(hit) for hit in scanner.scan(data)] == naive_hits(data, scanner.signatures)
+
+
+def test_start_and_end_limit_the_scan(scanner):
+    data = planted_image()
+    start, end = CHUNK_SIZE * 3 + 5, CHUNK_SIZE * 20 - 3
+    
+    hits = sorted(tuple(hit) for hit in scanner.scan(data, start, end))
+    
+    assert hits == naive_hits(data, FIRMWARE_SIGNATURES, start, end)
+
+
+def test_scan_all_lists_every_signature():
+    data = b"\x00" * 100 + b"$DMI" + b"\x00" * 100 + b"$DMI"
+    index = SignatureScanner({"HP_DMI": b"$DMI", "FPT": b"$FPT"}, chunk_size=CHUNK_SIZE).scan_all(data)
+    
+    assert index == {"HP_DMI": [100, 204], "FPT": []}
+
+
+def test_fit_pointer_is_followed_from_the_reset_vector_area():
+    data = bytearray(0x1000)
+    data[0x800:0x808] = FIRMWARE_SIGNATURES["FIT"]
+    pointer = 0x100000000 - (len(data) - 0x800)
+    data[-0x40:-0x38] = pointer.to_bytes(8, "little")
+    
+    assert read_fit_pointer(bytes(data)) == 0x800
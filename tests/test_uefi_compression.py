@@ -0,0 +1,91 @@
+"""
+Tests for EFI 1.1 / Tiano decompression
+
+The vectors were produced by the EDK II reference compressor
+(EfiCompress / TianoCompress from BaseTools).
+"""
+
+import os
+import random
+
+import pytest
+
+from functions.uefi_compression import EfiDecompressError, decompressed_size, efi_decompress, tiano_decompress
+from functions.uefi_volume import decompress_standard
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+TEXT = b"EFI compression test vector. " * 40
+TEXT_EFI = bytes.fromhex(
+    "2d000000880400000022436a6d7f8066b480259100be6a0d05ecffc46ea20302df190cfbec199d3f0519a1e2d4f160b162c59fc000"
+)
+TEXT_TIANO = bytes.fromhex(
+    "2d000000880400000022436a6d7f8066b480259100be6a0d05ecffc46ea20300b7c6433efb06674fc1466878b53c582c58b167f000"
+)
+ZEROS = bytes(70000)
+ZEROS_EFI = bytes.fromhex(
+    "2e00000070110100011328044bfdaaf8f900400000000000000000000000000000000000000000000000000000000000000000000c00"
+)
+ZEROS_TIANO = bytes.fromhex(
+    "2e00000070110100011328044bfdaaf8f900100000000000000000000000000000000000000000000000000000000000000000000300"
+)
+
+
+def words(count):
+    """The input of the words.efi / words.tiano vectors (several Huffman blocks)"""
+    vocab = b"Dxe Pei Smm Setup Variable Boot Option Driver Protocol Guid Handle Image Memory Table Event Timer".split()
+    seed, out = 7, []
+    for _ in range(count):
+        seed = (seed * 1103515245 + 12345) & 0x7FFFFFFF
+        out.append(vocab[(seed >> 16) & 0xF])
+    return b" ".join(out)
+
+
+def read_vector(name):
+    with open(os.path.join(DATA_DIR, name), "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("decompress, compressed, expected", [
+    (efi_decompress, TEXT_EFI, TEXT),
+    (tiano_decompress, TEXT_TIANO, TEXT),
+    (efi_decompress, ZEROS_EFI, ZEROS),
+    (tiano_decompress, ZEROS_TIANO, ZEROS),
+])
+def test_reference_vectors(decompress, compressed, expected):
+    assert decompressed_size(compressed) == len(expected)
+    assert decompress(compressed) == expected
+
+
+@pytest.mark.parametrize("decompress, name", [(efi_decompress, "words.efi"), (tiano_decompress, "words.tiano")])
+def test_multi_block_vectors(decompress, name):
+    assert decompress(read_vector(name)) == words(12000)
+
+
+def test_standard_compression_accepts_both_formats():
+    assert decompress_standard(TEXT_EFI) == TEXT
+    assert decompress_standard(read_vector("words.tiano")) == words(12000)
+
+
+def test_tiano_stream_is_not_valid_efi():
+    with pytest.raises(EfiDecompressError):
+        efi_decompress(read_vector("words.tiano"))
+
+
+@pytest.mark.parametrize("length", [0, 5, 40])
+def test_truncated_stream_raises(length):
+    with pytest.raises(EfiDecompressError):
+        tiano_decompress(read_vector("words.tiano")[:length])
+
+
+def test_corrupt_streams_only_raise_decompress_errors():
+    compressed = read_vector("words.efi")
+    rng = random.Random(5)
+    for _ in range(50):
+        data = bytearray(compressed)
+        for _ in range(4):
+            data[rng.randrange(8, len(data))] ^= 1 << rng.randrange(8)
+        try:
+            efi_decompress(bytes(data))
+        except EfiDecompressError:
+            pass
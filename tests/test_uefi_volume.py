@@ -0,0 +1,149 @@
+"""
+Tests for the UEFI volume / FFS file / section tree
+"""
+
+import lzma
+import struct
+import uuid
+
+from constants.app_config import AppConfig
+from functions.bios_image import BiosImage
+from functions.image_analysis import analyze_image
+from functions.process_pool import ProcessBackend
+from functions.uefi_volume import (
+    FFS2_GUID, FV_HEADER_MIN_SIZE, LZMA_CUSTOM_DECOMPRESS_GUID, SECTION_GUID_DEFINED, SECTION_USER_INTERFACE,
+    FirmwareVolume, describe_module_index, iter_modules, parse_sections
+)
+
+FFS_TYPE_DRIVER = 0x07
+
+
+def section(section_type, body):
+    return struct.pack("<I", (len(body) + 4) | (section_type << 24)) + body
+
+
+def ui_section(name):
+    return section(SECTION_USER_INTERFACE, (name + "\0").encode("utf-16-le"))
+
+
+def lzma_section(sections):
+    """GUID-defined section holding LZMA-compressed child sections"""
+    payload = lzma.compress(b"".join(sections), format=lzma.FORMAT_ALONE)
+    header = uuid.UUID(LZMA_CUSTOM_DECOMPRESS_GUID).bytes_le + struct.pack("<HH", 0x18, 1)
+    return section(SECTION_GUID_DEFINED, header + payload)
+
+
+def ffs_file(sections, file_type=FFS_TYPE_DRIVER):
+    body = b"".join(sections)
+    size = 0x18 + len(body)
+    header = uuid.uuid4().bytes_le + bytes((0, 0, file_type, 0)) + size.to_bytes(3, "little") + b"\xF8"
+    return header + body
+
+
+def volume(files, ext_header_offset=0, ext_size=None):
+    """An FFSv2 volume; an extended header is appended when ext_size is given"""
+    header = bytearray(FV_HEADER_MIN_SIZE)
+    header[0x10:0x20] = uuid.UUID(FFS2_GUID).bytes_le
+    header[0x28:0x2C] = b"_FVH"
+    body = bytearray()
+    if ext_size is not None:
+        body += uuid.uuid4().bytes_le + struct.pack("<I", ext_size)
+    for data in files:
+        body += b"\xFF" * (-(len(header) + len(body)) % 8) + data
+    length = len(header) + len(body)
+    length += -length % 8
+    struct.pack_into("<QIIHHHBB", header, 0x20, length, struct.unpack_from("<I", b"_FVH")[0], 0x800,
+                     FV_HEADER_MIN_SIZE, 0, ext_header_offset, 0, 2)
+    struct.pack_into("<H", header, 0x32, -sum(struct.unpack_from("<36H", header)) & 0xFFFF)
+    return bytes(header + body).ljust(length, b"\xFF")
+
+
+def test_volume_lists_files_and_their_names():
+    fv = FirmwareVolume(memoryview(volume([ffs_file([ui_section("Alpha")]), ffs_file([ui_section("Beta")])])), 0)
+    
+    assert fv.checksum_valid
+    assert [ffs_file.name for ffs_file in fv.files] == ["Alpha", "Beta"]
+    assert fv.error is None
+
+
+def test_extended_header_is_skipped():
+    fv = FirmwareVolume(memoryview(volume([ffs_file([ui_section("Alpha")])], FV_HEADER_MIN_SIZE, 0x14)), 0)
+    
+    assert [ffs_file.name for ffs_file in fv.files] == ["Alpha"]
+
+
+def test_garbage_extended_header_offset_yields_no_files():
+    fv = FirmwareVolume(memoryview(volume([ffs_file([ui_section("Alpha")])], 0xFFF0)), 0)
+    
+    assert fv.files == []
+    assert "outside the volume" in fv.error
+
+
+def test_extended_header_size_past_the_volume_yields_no_files():
+    fv = FirmwareVolume(memoryview(volume([ffs_file([ui_section("Alpha")])], FV_HEADER_MIN_SIZE, 0x7FFFFFFF)), 0)
+    
+    assert fv.files == []
+    assert "extended header size" in fv.error
+
+
+def test_truncated_guid_defined_section_ends_the_section_list():
+    data = ui_section("Alpha") + b"\0\0" + section(SECTION_GUID_DEFINED, b"\x11" * 8)
+    
+    sections = parse_sections(data, None)
+    
+    assert [s.type for s in sections] == [SECTION_USER_INTERFACE]
+
+
+def test_nested_volume_repr_uses_its_location():
+    outer = FirmwareVolume(memoryview(volume([ffs_file([ui_section("Alpha")])])), 0x1000)
+    nested = FirmwareVolume(memoryview(volume([])), None, parent=outer.files[0].sections[0])
+    
+    assert "1060/fv" in repr(nested)
+
+
+def test_iter_modules_visits_every_file_in_order():
+    fv = FirmwareVolume(memoryview(volume([ffs_file([ui_section(name)]) for name in "ABC"])), 0)
+    
+    names = [ffs_file.name for ffs_file, leaves in iter_modules([fv])]
+    
+    assert names == ["A", "B", "C"]
+
+
+def test_analysis_keeps_other_results_when_a_volume_is_corrupt(tmp_path):
+    good = volume([ffs_file([ui_section("Alpha")])])
+    bad = volume([ffs_file([ui_section("Beta")])], 0xFFF0)
+    path = tmp_path / "image.bin"
+    path.write_bytes(b"\xFF" * 0x1000 + good + b"$DMI" + b"\xFF" * 0x1000 + bad + b"\xFF" * 0x1000)
+    
+    image = BiosImage(str(path))
+    try:
+        analysis = analyze_image(image)
+    finally:
+        image.close()
+    
+    assert [entry[3] for entry in analysis["volumes"]] == [1, 0]
+    assert analysis["volumes"][0][4] is None
+    assert "outside the volume" in analysis["volumes"][1][4]
+    assert analysis["dmi"]
+
+
+def test_module_index_reuses_sections_inflated_by_another_worker(tmp_path, monkeypatch):
+    # Workers re-import AppConfig, so the cache directory follows HOME into tmp_path
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("USERPROFILE", str(tmp_path))
+    monkeypatch.setattr(AppConfig, "CACHE_DIR", str(tmp_path / ".bios_toolkit" / "cache"))
+    files = [ffs_file([lzma_section([ui_section(name)])]) for name in ("Alpha", "Beta", "Gamma")]
+    path = tmp_path / "image.bin"
+    path.write_bytes(b"\xFF" * 0x1000 + volume(files) + b"\xFF" * 0x1000)
+    
+    def index_in_new_worker():
+        backend = ProcessBackend(max_workers=1)
+        image = BiosImage(str(path))
+        try:
+            return backend.run(describe_module_index, image)
+        finally:
+            image.close()
+            backend.shutdown()
+    
+    assert index_in_new_worker()[1] == "Compressed sections: 3 inflated, 0 from cache"
+    assert index_in_new_worker()[1] == "Compressed sections: 0 inflated, 3 from cache"